@@ -0,0 +1,9 @@
+"""
+County land cover proportions from the National Land Cover Database (NLCD).
+
+The modules are meant to be run through the ``nlcd-county`` command (see
+cli.py) or as ``python -m nlcd_county.<module>``. Importing the package
+itself loads nothing heavy; each module pulls in its own dependencies.
+"""
+
+__version__ = '0.1.0'
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Comprehensive analysis of county land cover proportions from NLCD data.
+
+The report and the state and regional summary CSVs are written to the
+reports directory of the config file (config.py) unless --output-dir is
+given; conversion hot-spots are read from the transition cube of
+process_county_landcover.py --transitions when it exists.
+
+Usage:
+    python -m nlcd_county.analyze_landcover [--output-dir DIR] [--transitions PATH]
+"""
+
+import argparse
+import os
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+import seaborn as sns
+from pathlib import Path
+from .config import PATHS
+from .count_cube import cube_to_proportions, load_count_cube
+from .landcover_dataset import read_landcover
+from .nlcd_classes import NLCD_RECLASSIFICATION, PIXEL_AREA_KM2
+from .rollup import COUNT_CUBE_PATH, REGIONS, STATE_NAMES, level_keys, rollup_counts
+
+parser = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--output-dir', default=PATHS['reports'],
+                    help="Directory for the report and summary CSVs (default: %(default)s)")
+parser.add_argument('--transitions', default=PATHS['transitions'],
+                    help="Transition cube for conversion hot-spots (default: %(default)s)")
+args = parser.parse_args()
+os.makedirs(args.output_dir, exist_ok=True)
+report_path = os.path.join(args.output_dir, 'landcover_analysis_report.txt')
+state_summary_path = os.path.join(args.output_dir, 'state_landcover_summary.csv')
+regional_summary_path = os.path.join(args.output_dir, 'regional_landcover_summary.csv')
+
+# Set up plotting style
+plt.style.use('seaborn-v0_8-darkgrid')
+sns.set_palette("husl")
+
+# Load the data (Parquet dataset if present, else the CSV; county_fips and
+# state_fips come back as zero-padded strings)
+df = read_landcover(columns=['forest_proportion', 'agriculture_proportion', 'developed_proportion',
+                             'wetland_proportion', 'other_proportion', 'valid_pixel_count'])
+
+# Filter out counties with no data
+df_valid = df[(df[['forest_proportion', 'agriculture_proportion', 'developed_proportion', 
+                   'wetland_proportion', 'other_proportion']].sum(axis=1) > 0)].copy()
+
+print("=" * 80)
+print("LAND COVER ANALYSIS REPORT")
+print("=" * 80)
+print(f"\nTotal counties in dataset: {len(df):,}")
+print(f"Counties with valid data: {len(df_valid):,}")
+print(f"Counties with no data: {len(df) - len(df_valid):,}")
+
+# Basic statistics
+print("\n" + "=" * 80)
+print("NATIONAL SUMMARY STATISTICS")
+print("=" * 80)
+
+land_cover_cols = ['forest_proportion', 'agriculture_proportion', 'developed_proportion', 
+                   'wetland_proportion', 'other_proportion']
+
+# Weight each county by its valid (non-nodata) pixels. State and region
+# figures are rolled up from the exact pixel counts of the count cube when it
+# holds the same counties and results as the table loaded above (rollup.py);
+# otherwise class pixels are rebuilt from each county's proportions and
+# valid_pixel_count, and results files written before the pipeline carried
+# pixel counts fall back to equal county weights
+count_cube_path = Path(COUNT_CUBE_PATH)
+
+def cube_matches_results(geoids, codes, counts):
+    """True when a count cube reproduces the loaded results (same run and year)."""
+    if 'valid_pixel_count' not in df.columns or set(geoids) != set(df['county_fips']):
+        return False
+    derived = cube_to_proportions(geoids, codes, counts, NLCD_RECLASSIFICATION)
+    derived = derived.set_index('county_fips').loc[df['county_fips']]
+    # The Parquet dataset stores proportions as float32 and whole pixel counts
+    return (np.allclose(derived[land_cover_cols].to_numpy(), df[land_cover_cols].to_numpy(),
+                        rtol=0, atol=1e-5)
+            and np.allclose(derived['valid_pixel_count'].to_numpy(dtype=np.float64),
+                            df['valid_pixel_count'].to_numpy(dtype=np.float64), rtol=0, atol=0.5))
+
+use_count_cube = False
+if count_cube_path.exists():
+    cube_geoids, cube_codes, cube_counts = load_count_cube(count_cube_path)
+    use_count_cube = cube_matches_results(cube_geoids, cube_codes, cube_counts)
+    if not use_count_cube:
+        print(f"\nWarning: {count_cube_path} does not match the loaded results (another "
+              "run or year); aggregating state and regional figures from the county table")
+
+if 'valid_pixel_count' in df_valid.columns:
+    weights = df_valid['valid_pixel_count'].astype(float)
+    weighting = 'pixel-weighted'
+else:
+    print("\nWarning: no valid_pixel_count column; weighting counties equally "
+          "(re-run process_county_landcover.py or derive_proportions.py for pixel weights)")
+    weights = pd.Series(1.0, index=df_valid.index)
+    weighting = 'equal county weights'
+
+# Valid pixels of each class per county; every aggregate below is a sum of these
+class_pixels = df_valid[land_cover_cols].mul(weights, axis=0)
+
+def weighted_summary(key, level):
+    """Land cover proportions per group: summed class pixels over summed valid pixels."""
+    groups = df_valid[key]
+    if use_count_cube:
+        labels, rolled = rollup_counts(cube_counts, level_keys(cube_geoids, level))
+        summary = cube_to_proportions(labels, cube_codes, rolled, NLCD_RECLASSIFICATION,
+                                      id_column=key).set_index(key)
+        # Keep the same rows as the county-based version (zones with valid data)
+        summary = summary[summary['valid_pixel_count'] > 0]
+    else:
+        valid_pixels = weights.groupby(groups).sum()
+        summary = class_pixels.groupby(groups).sum().div(valid_pixels, axis=0)
+        if weighting == 'pixel-weighted':
+            summary['valid_pixel_count'] = valid_pixels.astype(np.int64)
+            summary['area_km2'] = valid_pixels * PIXEL_AREA_KM2
+    summary['county_count'] = groups.value_counts()
+    return summary
+
+stats_df = df_valid[land_cover_cols].describe()
+stats_df.loc['sum'] = df_valid[land_cover_cols].sum()
+stats_df.loc['weighted_mean'] = class_pixels.sum() / weights.sum()
+stats_df.columns = ['Forest', 'Agriculture', 'Developed', 'Wetland', 'Other']
+
+print("\nLand Cover Proportions Statistics (across all counties):")
+print(stats_df.round(4))
+
+print(f"\nNational Land Cover ({weighting}):")
+for name, proportion in stats_df.loc['weighted_mean'].items():
+    print(f"  {name:12} : {proportion*100:5.1f}%")
+if weighting == 'pixel-weighted':
+    print(f"  Valid area   : {weights.sum() * PIXEL_AREA_KM2:,.0f} km2")
+
+print("\n" + "-" * 60)
+print("DOMINANT LAND COVER TYPES")
+print("-" * 60)
+
+# Find dominant land cover for each county
+df_valid['dominant_cover'] = df_valid[land_cover_cols].idxmax(axis=1).str.replace('_proportion', '')
+dominant_counts = df_valid['dominant_cover'].value_counts()
+
+print("\nCounties by Dominant Land Cover Type:")
+for cover, count in dominant_counts.items():
+    percentage = (count / len(df_valid)) * 100
+    print(f"  {cover.capitalize():12} : {count:4} counties ({percentage:5.1f}%)")
+
+# Extreme values analysis
+print("\n" + "=" * 80)
+print("COUNTIES WITH EXTREME VALUES")
+print("=" * 80)
+
+def get_top_counties(df, column, n=5, ascending=False):
+    """Get top n counties for a given column."""
+    sorted_df = df.nlargest(n, column) if not ascending else df.nsmallest(n, column)
+    return sorted_df[['county_fips', column]]
+
+# Most forested counties
+print("\nMost Forested Counties:")
+top_forest = get_top_counties(df_valid, 'forest_proportion')
+for idx, row in top_forest.iterrows():
+    print(f"  {row['county_fips']:5} : {row['forest_proportion']*100:5.1f}%")
+
+# Most agricultural counties
+print("\nMost Agricultural Counties:")
+top_ag = get_top_counties(df_valid, 'agriculture_proportion')
+for idx, row in top_ag.iterrows():
+    print(f"  {row['county_fips']:5} : {row['agriculture_proportion']*100:5.1f}%")
+
+# Most developed counties
+print("\nMost Developed Counties:")
+top_dev = get_top_counties(df_valid, 'developed_proportion')
+for idx, row in top_dev.iterrows():
+    print(f"  {row['county_fips']:5} : {row['developed_proportion']*100:5.1f}%")
+
+# Most wetland counties
+print("\nCounties with Most Wetlands:")
+top_wet = get_top_counties(df_valid, 'wetland_proportion')
+for idx, row in top_wet.iterrows():
+    print(f"  {row['county_fips']:5} : {row['wetland_proportion']*100:5.1f}%")
+
+# State-level analysis
+print("\n" + "=" * 80)
+print("STATE-LEVEL ANALYSIS")
+print("=" * 80)
+
+state_names = STATE_NAMES
+
+# Calculate state land cover
+if use_count_cube:
+    print(f"\nState and regional figures summed from pixel counts in {count_cube_path}")
+state_summary = weighted_summary('state_fips', 'state')
+
+# Add state names
+state_summary['state_name'] = state_summary.index.map(state_names).fillna('Unknown')
+
+# Most forested states
+print(f"\nMost Forested States ({weighting}):")
+top_forest_states = state_summary.nlargest(10, 'forest_proportion')[['state_name', 'forest_proportion', 'county_count']]
+for idx, row in top_forest_states.iterrows():
+    print(f"  {row['state_name']:20} : {row['forest_proportion']*100:5.1f}% ({int(row['county_count'])} counties)")
+
+# Most agricultural states
+print(f"\nMost Agricultural States ({weighting}):")
+top_ag_states = state_summary.nlargest(10, 'agriculture_proportion')[['state_name', 'agriculture_proportion', 'county_count']]
+for idx, row in top_ag_states.iterrows():
+    print(f"  {row['state_name']:20} : {row['agriculture_proportion']*100:5.1f}% ({int(row['county_count'])} counties)")
+
+# Most developed states
+print(f"\nMost Developed States ({weighting}):")
+top_dev_states = state_summary.nlargest(10, 'developed_proportion')[['state_name', 'developed_proportion', 'county_count']]
+for idx, row in top_dev_states.iterrows():
+    print(f"  {row['state_name']:20} : {row['developed_proportion']*100:5.1f}% ({int(row['county_count'])} counties)")
+
+# Distribution analysis
+print("\n" + "=" * 80)
+print("DISTRIBUTION CHARACTERISTICS")
+print("=" * 80)
+
+# Calculate skewness and kurtosis
+from scipy import stats
+
+print("\nDistribution Skewness (0 = normal, >0 = right-skewed, <0 = left-skewed):")
+for col in land_cover_cols:
+    skew = stats.skew(df_valid[col])
+    print(f"  {col.replace('_proportion', '').capitalize():12} : {skew:6.2f}")
+
+print("\nDistribution Kurtosis (3 = normal, >3 = heavy-tailed, <3 = light-tailed):")
+for col in land_cover_cols:
+    kurt = stats.kurtosis(df_valid[col], fisher=False)
+    print(f"  {col.replace('_proportion', '').capitalize():12} : {kurt:6.2f}")
+
+# Correlation analysis
+print("\n" + "=" * 80)
+print("CORRELATION ANALYSIS")
+print("=" * 80)
+
+corr_matrix = df_valid[land_cover_cols].corr()
+print("\nCorrelation Matrix (strong negative = land uses compete for space):")
+print(corr_matrix.round(3))
+
+# Find strongest correlations
+print("\nStrongest Correlations:")
+corr_pairs = []
+for i in range(len(land_cover_cols)):
+    for j in range(i+1, len(land_cover_cols)):
+        corr_pairs.append((land_cover_cols[i].replace('_proportion', ''),
+                          land_cover_cols[j].replace('_proportion', ''),
+                          corr_matrix.iloc[i, j]))
+
+corr_pairs.sort(key=lambda x: abs(x[2]), reverse=True)
+for cover1, cover2, corr in corr_pairs[:5]:
+    print(f"  {cover1:12} vs {cover2:12} : {corr:6.3f}")
+
+# Regional patterns
+print("\n" + "=" * 80)
+print("REGIONAL PATTERNS")
+print("=" * 80)
+
+# Create region mapping (state FIPS -> region)
+region_states = pd.Series(REGIONS).explode()
+region_map = pd.Series(region_states.index, index=region_states.values)
+
+df_valid['region'] = df_valid['state_fips'].map(region_map).fillna('Other')
+
+# Regional summaries
+regional_summary = weighted_summary('region', 'region')
+print(f"\nRegional Land Cover ({weighting}):")
+print(regional_summary.round(3))
+
+# Land cover change hot-spots (requires process_county_landcover.py --transitions)
+transitions_path = Path(args.transitions)
+conversion_summary = None
+if transitions_path.exists():
+    from .count_cube import collapse_transitions, load_transition_cube
+
+    print("\n" + "=" * 80)
+    print("LAND COVER CONVERSION HOT-SPOTS")
+    print("=" * 80)
+
+    geoids, codes, transitions, (from_year, to_year) = load_transition_cube(transitions_path)
+    class_names, class_transitions = collapse_transitions(codes, transitions, NLCD_RECLASSIFICATION)
+
+    # National from -> to table, excluding the nodata class
+    keep = [i for i, name in enumerate(class_names) if name != 'nodata']
+    national = class_transitions.sum(axis=0)[np.ix_(keep, keep)]
+    conversion_summary = pd.DataFrame(national * PIXEL_AREA_KM2,
+                                      index=[f'from_{class_names[i]}' for i in keep],
+                                      columns=[f'to_{class_names[i]}' for i in keep])
+    print(f"\nNational conversions {from_year} -> {to_year} (km2):")
+    print(conversion_summary.round(1))
+
+    conversions = [('forest', 'developed'), ('agriculture', 'developed'),
+                   ('forest', 'agriculture'), ('wetland', 'developed')]
+    for from_class, to_class in conversions:
+        converted = class_transitions[:, class_names.index(from_class), class_names.index(to_class)]
+        hot_spots = pd.DataFrame({'county_fips': geoids, 'km2': converted * PIXEL_AREA_KM2})
+        hot_spots = hot_spots[hot_spots['km2'] > 0].nlargest(5, 'km2')
+        print(f"\nTop {from_class} -> {to_class} conversion counties:")
+        for idx, row in hot_spots.iterrows():
+            print(f"  {row['county_fips']:5} : {row['km2']:8.1f} km2")
+
+# Save summary statistics to file
+print("\n" + "=" * 80)
+print("SAVING ANALYSIS RESULTS")
+print("=" * 80)
+
+# Save detailed statistics
+with open(report_path, 'w') as f:
+    f.write("LAND COVER ANALYSIS DETAILED REPORT\n")
+    f.write("="*80 + "\n\n")
+    
+    f.write("Summary Statistics:\n")
+    f.write(stats_df.to_string() + "\n\n")
+    
+    f.write("State-Level Summary:\n")
+    f.write(state_summary.to_string() + "\n\n")
+    
+    f.write("Regional Summary:\n")
+    f.write(regional_summary.to_string() + "\n\n")
+    
+    f.write("Correlation Matrix:\n")
+    f.write(corr_matrix.to_string() + "\n")
+
+    if conversion_summary is not None:
+        f.write(f"\nLand Cover Conversions {from_year} -> {to_year} (km2):\n")
+        f.write(conversion_summary.to_string() + "\n")
+
+print(f"Detailed analysis saved to: {report_path}")
+
+# Export key summaries to CSV
+state_summary.to_csv(state_summary_path)
+regional_summary.to_csv(regional_summary_path)
+print(f"State summary saved to: {state_summary_path}")
+print(f"Regional summary saved to: {regional_summary_path}")
+
+print("\n" + "=" * 80)
+print("ANALYSIS COMPLETE")
+print("=" * 80)
\ No newline at end of file
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Check the chunked engine's peak memory against its budget.
+
+By default the engine runs over the synthetic NLCD raster and counties of
+benchmark_pipeline.py, so the check needs no real data; --raster and
+--counties point it at the real CONUS files instead. The process's peak RSS
+is reset (Linux /proc/self/clear_refs) after the counties are loaded, so
+the reported peak is the engine's own: blocks, count matrices and GDAL's
+block cache, which the engine caps at a share of the budget. Exits with
+status 1 when the peak exceeds the budget.
+
+Usage:
+    python -m nlcd_county.benchmark_chunked_memory [--budget-mb 64] [--workers 1]
+        [--size 2048] [--grid 8] [--raster PATH --counties PATH] [--states 51]
+
+Dependencies: geopandas, rasterio, shapely, numpy
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from .benchmark_pipeline import generate_data
+from .chunked_engine import iter_chunked_zone_counts
+
+# Default budget: small enough that the synthetic raster needs several blocks
+DEFAULT_BUDGET_MB = 64
+
+def reset_peak_rss():
+    """Reset this process's peak RSS to its current RSS; False where unsupported."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def rss_bytes(field):
+    """VmRSS or VmHWM (peak RSS) of this process, from /proc/self/status."""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) * 1024
+    raise OSError(f"{field} is not reported on this system")
+
+def measure_chunked_run(raster_path, shapefile_path, memory_budget, workers=1, states=None):
+    """
+    Run the chunked engine once and measure its peak memory.
+
+    Returns:
+    --------
+    dict : zones counted, seconds, the budget and the engine's peak (RSS
+        above the level before the run), all sizes in bytes
+    """
+    from .process_county_landcover import load_counties
+
+    counties = load_counties(shapefile_path, raster_path)
+    if states:
+        counties = counties[counties['STATEFP'].isin(states)]
+    geometries = counties.geometry.values
+
+    # Geometries are loaded before the peak is reset and are not counted
+    if not reset_peak_rss():
+        raise OSError("Resetting the peak RSS needs Linux /proc/self/clear_refs")
+    baseline = rss_bytes('VmRSS')
+    start = time.perf_counter()
+    zones = sum(1 for _ in iter_chunked_zone_counts(raster_path, geometries, memory_budget, workers))
+    return {
+        'zones': zones,
+        'seconds': time.perf_counter() - start,
+        'budget': memory_budget,
+        'peak': rss_bytes('VmHWM') - baseline
+    }
+
+def run_benchmark(memory_budget, workers=1, raster_path=None, shapefile_path=None, states=None,
+                  size=2048, grid=8):
+    """
+    Measure one chunked run, on synthetic data unless a raster is given.
+
+    Returns:
+    --------
+    bool : True when the peak stayed within the budget
+    """
+    data_dir = None
+    if raster_path is None:
+        data_dir = tempfile.mkdtemp(prefix='nlcd_chunked_memory_')
+        data = generate_data(data_dir, size, grid)
+        raster_path, shapefile_path = data['raster_paths'][-1], data['counties_path']
+    try:
+        result = measure_chunked_run(raster_path, shapefile_path, memory_budget, workers, states)
+    finally:
+        if data_dir is not None:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(f"\nCounted {result['zones']} counties in {result['seconds']:.1f} s")
+    print(f"  Budget            : {result['budget'] / 1024 ** 2:10,.1f} MB")
+    print(f"  Engine peak RSS   : {result['peak'] / 1024 ** 2:10,.1f} MB")
+
+    within = result['peak'] <= result['budget']
+    print("PASS: peak within budget" if within else "FAIL: peak exceeds budget")
+    return within
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-mb', type=float, default=DEFAULT_BUDGET_MB,
+                        help="Peak-memory budget in MB (default: %(default)g)")
+    parser.add_argument('--workers', type=int, default=1, help="Reader threads (default: 1)")
+    parser.add_argument('--size', type=int, default=2048,
+                        help="Synthetic raster width and height in pixels (default: %(default)s)")
+    parser.add_argument('--grid', type=int, default=8,
+                        help="Synthetic counties per side (default: %(default)s)")
+    parser.add_argument('--raster', default=None,
+                        help="Real NLCD raster instead of synthetic data (needs --counties)")
+    parser.add_argument('--counties', default=None, help="County shapefile for --raster")
+    parser.add_argument('--states', default=None,
+                        help="Comma-separated state FIPS codes (default: all counties)")
+    args = parser.parse_args()
+    if (args.raster is None) != (args.counties is None):
+        parser.error("--raster and --counties go together")
+
+    states = args.states.split(',') if args.states else None
+    within = run_benchmark(int(args.budget_mb * 1024 ** 2), args.workers, args.raster,
+                           args.counties, states, args.size, args.grid)
+    sys.exit(0 if within else 1)
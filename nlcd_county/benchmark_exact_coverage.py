@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark exact fractional-coverage weighting against the pixel-center rule.
+
+Runs both per-county methods over a subset of counties (Virginia by default,
+whose small independent cities are most affected by the center rule) and
+reports runtime plus the per-county proportion error of the center rule,
+taking the exact coverage-weighted proportions as the reference.
+
+Usage:
+    python -m nlcd_county.benchmark_exact_coverage [--states 51] [--raster PATH] [--counties PATH]
+
+Dependencies: geopandas, rasterio, rasterstats, shapely, pandas, numpy
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from . import zonal_engine
+from .process_county_landcover import (COUNTY_SHAPEFILE_PATH, NLCD_RASTER_PATH, RECLASSIFIER,
+                                      load_counties)
+
+def proportions_for(pixel_counts):
+    """Five-class proportions for one county's pixel counts."""
+    return RECLASSIFIER.proportions(RECLASSIFIER.counts_from_dict(pixel_counts))
+
+def time_method(tasks, exact):
+    """
+    Run one method over all tasks.
+
+    Returns:
+    --------
+    tuple : (elapsed seconds, array of proportions with one row per task)
+    """
+    start = time.perf_counter()
+    proportions = []
+    for task in tasks:
+        county_fips, pixel_counts, error = zonal_engine.county_pixel_counts(task, exact=exact)
+        if error is not None:
+            print(f"Error processing county {county_fips}: {error}")
+        proportions.append(proportions_for(pixel_counts))
+    return time.perf_counter() - start, np.array(proportions)
+
+def run_benchmark(raster_path, shapefile_path, states):
+    """Compare runtime and proportion error of the two methods."""
+    counties = load_counties(shapefile_path, raster_path)
+    counties = counties[counties['STATEFP'].isin(states)]
+    tasks = list(zip(counties['GEOID'], counties.geometry))
+    print(f"\nBenchmarking {len(tasks)} counties in state(s) {', '.join(states)}")
+
+    zonal_engine.open_worker_dataset(raster_path)
+    try:
+        center_time, center = time_method(tasks, exact=False)
+        exact_time, exact = time_method(tasks, exact=True)
+    finally:
+        zonal_engine.close_worker_dataset()
+
+    class_names = RECLASSIFIER.valid_class_names
+    error = pd.DataFrame(np.abs(center - exact), columns=class_names)
+    error.insert(0, 'county_fips', counties['GEOID'].values)
+    error['max_abs_error'] = error[class_names].max(axis=1)
+    area_km2 = counties.geometry.area.values / 1e6
+    error['area_km2'] = area_km2
+
+    print("\nRuntime:")
+    print(f"  Center rule : {center_time:8.2f} s ({center_time / len(tasks) * 1000:7.1f} ms/county)")
+    print(f"  Exact       : {exact_time:8.2f} s ({exact_time / len(tasks) * 1000:7.1f} ms/county)")
+    print(f"  Slowdown    : {exact_time / center_time:8.2f}x")
+
+    print("\nCenter-rule absolute proportion error (vs exact):")
+    print(error[class_names + ['max_abs_error']].describe().round(5))
+
+    print("\nCounties with the largest center-rule error:")
+    for _, row in error.nlargest(10, 'max_abs_error').iterrows():
+        print(f"  {row['county_fips']:5} : {row['max_abs_error'] * 100:6.3f} pp "
+              f"({row['area_km2']:9.1f} km2)")
+
+    small = error['area_km2'] < np.median(area_km2)
+    print(f"\nMean max error, smaller half of counties: {error.loc[small, 'max_abs_error'].mean() * 100:.3f} pp")
+    print(f"Mean max error, larger half of counties:  {error.loc[~small, 'max_abs_error'].mean() * 100:.3f} pp")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--states', default='51',
+                        help="Comma-separated state FIPS codes to benchmark (default: 51)")
+    parser.add_argument('--raster', default=NLCD_RASTER_PATH, help="NLCD raster path")
+    parser.add_argument('--counties', default=COUNTY_SHAPEFILE_PATH, help="County shapefile path")
+    args = parser.parse_args()
+
+    run_benchmark(args.raster, args.counties, args.states.split(','))
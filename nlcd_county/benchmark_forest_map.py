@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark the forest choropleth against the per-county tooltip layers it replaced.
+
+The forest map used to add one folium.GeoJson layer per county, each with its
+own tooltip, on top of the choropleth. It now draws a single FeatureCollection
+with a data-driven style and one shared tooltip template
+(create_interactive_map.forest_map). Both versions are built and saved from
+the same counties, and the HTML size and generation time are reported.
+
+Usage:
+    python -m nlcd_county.benchmark_forest_map [--counties PATH] [--repeat 3]
+
+The land cover results are read from the paths of the config file
+(config.py), like create_interactive_map.py: the Parquet dataset next to
+output_csv or the output_csv itself, whichever was written last. The maps are
+saved to a temporary directory and removed afterwards.
+
+Dependencies: geopandas, folium, pandas
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import folium
+import pandas as pd
+from .create_interactive_map import COUNTY_SHAPEFILE_PATH, forest_map, load_map_counties
+
+def per_county_forest_map(continental_states):
+    """The previous forest map: a choropleth plus one tooltip layer per county."""
+    m2 = folium.Map(location=[39.5, -98.35], zoom_start=5, tiles='CartoDB positron')
+
+    folium.Choropleth(
+        geo_data=continental_states[['geometry', 'GEOID', 'forest_proportion']].to_json(),
+        name='Forest Coverage',
+        data=continental_states,
+        columns=['GEOID', 'forest_proportion'],
+        key_on='feature.properties.GEOID',
+        fill_color='Greens',
+        fill_opacity=0.7,
+        line_opacity=0.2,
+        legend_name='Forest Coverage (%)',
+        nan_fill_color='lightgray'
+    ).add_to(m2)
+
+    for idx, row in continental_states.iterrows():
+        if pd.notna(row['forest_proportion']):
+            tooltip_text = f"{row['NAME']}, {row['STATEFP']}<br>Forest: {row['forest_proportion']*100:.1f}%"
+        else:
+            tooltip_text = f"{row['NAME']}, {row['STATEFP']}<br>No Data"
+
+        folium.GeoJson(
+            row['geometry'].__geo_interface__,
+            style_function=lambda x: {'fillOpacity': 0, 'color': 'transparent', 'weight': 0},
+            tooltip=folium.Tooltip(tooltip_text, sticky=True)
+        ).add_to(m2)
+
+    return m2
+
+def time_build(build, continental_states, html_path, repeat):
+    """
+    Best-of-``repeat`` time to build and save one map.
+
+    Returns:
+    --------
+    tuple : (seconds, HTML size in bytes)
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build(continental_states).save(html_path)
+        times.append(time.perf_counter() - start)
+    return min(times), os.path.getsize(html_path)
+
+def run_benchmark(shapefile_path, repeat):
+    """Build both forest maps and compare generation time and HTML size."""
+    continental_states = load_map_counties(shapefile_path)
+    print(f"\nBenchmarking forest maps for {len(continental_states)} counties "
+          f"(best of {repeat})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_time, before_size = time_build(per_county_forest_map, continental_states,
+                                              os.path.join(tmp, 'before.html'), repeat)
+        after_time, after_size = time_build(forest_map, continental_states,
+                                            os.path.join(tmp, 'after.html'), repeat)
+
+    print(f"\n{'':24}{'Time (s)':>10}{'HTML (MB)':>12}")
+    print(f"  Per-county layers   : {before_time:10.2f}{before_size / 1e6:12.2f}")
+    print(f"  Single layer        : {after_time:10.2f}{after_size / 1e6:12.2f}")
+    print(f"  Improvement         : {before_time / after_time:9.1f}x{before_size / after_size:11.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--counties', default=COUNTY_SHAPEFILE_PATH, help="County shapefile path")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Builds per version; the fastest is reported (default: 3)")
+    args = parser.parse_args()
+
+    run_benchmark(args.counties, args.repeat)
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the county pipeline on synthetic NLCD data.
+
+The real NLCD raster is far too large for CI, so this generates an NLCD-like
+raster instead: the 16 NLCD class codes in patches at roughly their CONUS
+frequencies, 0 (nodata) outside an elliptical footprint and patches of the
+250 fill value. It also writes a second year with a share of patches changed,
+and a county tiling as a TIGER-like shapefile (NAD83, GEOID/STATEFP/NAME).
+Counties are jittered grid cells with wiggly shared edges, so the polygons
+tile the footprint without gaps, and a later vintage modifies a few of them.
+
+Every mode of process_county_landcover.py then runs in a fresh subprocess:
+each engine, worker processes, Hilbert scheduling, the zone raster, the tile
+cache, incremental boundary updates, multi-year counting and transitions.
+For each run the benchmark records:
+- wall time and pixels read per second
+- the peak RSS of the largest process (the run or one of its workers)
+- percentiles of per-county latency, the time between successive counties
+  leaving the engine (single-pass engines emit counties in bursts)
+
+Results are written to JSON, together with the machine and data parameters,
+so regressions can be tracked between runs.
+
+Usage:
+    python -m nlcd_county.benchmark_pipeline [--size 4096] [--grid 16] [--modes zonal,raster]
+                                 [--data-dir DIR] [--output results.json]
+
+Dependencies: geopandas, rasterio, shapely, pandas, numpy
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import geopandas as gpd
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+from shapely.geometry import Polygon
+
+# Approximate CONUS share of each NLCD class (NLCD 2019)
+CLASS_FREQUENCIES = {
+    11: 0.053, 12: 0.0001, 21: 0.028, 22: 0.013, 23: 0.006, 24: 0.002, 31: 0.010,
+    41: 0.095, 42: 0.125, 43: 0.019, 52: 0.215, 71: 0.132, 81: 0.065, 82: 0.168,
+    90: 0.050, 95: 0.019
+}
+
+# Synthetic raster layout
+PATCH_SIZE = 32          # Pixels per side of a land cover patch
+SPECKLE_FRACTION = 0.15  # Pixels replaced by a random class inside patches
+FILL_FRACTION = 0.01     # Patches set to the 250 fill value
+CHANGE_FRACTION = 0.05   # Patches whose class changes in the second year
+EDGE_POINTS = 8          # Interior vertices along each county edge
+PIXEL_SIZE = 30
+ORIGIN = (-2000000.0, 3000000.0)
+YEARS = (2023, 2024)
+
+# Modes benchmarked by default: (name, options for run_mode)
+MODES = {
+    'zonal': {'engine': 'zonal'},
+    'zonal-workers': {'engine': 'zonal', 'workers': min(4, os.cpu_count() or 1)},
+    'zonal-hilbert': {'engine': 'zonal', 'schedule': 'hilbert'},
+    'zonal-tile-cache': {'engine': 'zonal', 'tile_cache': True},
+    'exact': {'engine': 'exact'},
+    'raster': {'engine': 'raster'},
+    'raster-zones': {'engine': 'raster', 'zones': True},
+    'chunked': {'engine': 'chunked'},
+    'chunked-zones': {'engine': 'chunked', 'zones': True},
+    'incremental': {'engine': 'zonal', 'incremental': True},
+    'timeseries': {'kind': 'timeseries'},
+    'transitions': {'kind': 'transitions'}
+}
+
+def raster_path_for(data_dir, year):
+    """Synthetic raster of one year (the year in the name is what raster_year reads)."""
+    return os.path.join(data_dir, f'synthetic_nlcd_{year}.tif')
+
+def class_patches(rng, patch_rows, patch_cols):
+    """Random patch classes drawn at the CONUS class frequencies."""
+    codes = np.array(list(CLASS_FREQUENCIES), dtype=np.uint8)
+    weights = np.array(list(CLASS_FREQUENCIES.values()))
+    return rng.choice(codes, size=(patch_rows, patch_cols), p=weights / weights.sum())
+
+def generate_rasters(data_dir, size, seed=0, block_size=512):
+    """
+    Write one synthetic NLCD raster per year in YEARS, block by block.
+
+    Parameters:
+    -----------
+    data_dir : str
+        Destination directory
+    size : int
+        Raster width and height in pixels
+    seed : int
+        Random seed; the same seed gives the same rasters
+    block_size : int
+        GeoTIFF tile size, as in the NLCD distribution
+
+    Returns:
+    --------
+    list : Raster paths, one per year
+    """
+    rng = np.random.default_rng(seed)
+    n_patches = -(-size // PATCH_SIZE)
+    patches = class_patches(rng, n_patches, n_patches)
+    patches[rng.random(patches.shape) < FILL_FRACTION] = 250
+    changed = class_patches(rng, n_patches, n_patches)
+    change_mask = (rng.random(patches.shape) < CHANGE_FRACTION) & (patches != 250)
+    yearly_patches = [patches, np.where(change_mask, changed, patches)]
+
+    profile = {
+        'driver': 'GTiff', 'height': size, 'width': size, 'count': 1, 'dtype': 'uint8',
+        'crs': 'EPSG:5070', 'transform': from_origin(*ORIGIN, PIXEL_SIZE, PIXEL_SIZE),
+        'tiled': True, 'blockxsize': block_size, 'blockysize': block_size,
+        'compress': 'deflate', 'nodata': 250
+    }
+    paths = []
+    for year, year_patches in zip(YEARS, yearly_patches):
+        path = raster_path_for(data_dir, year)
+        # Speckle is seeded per block, so it is the same in both years
+        with rasterio.open(path, 'w', **profile) as dst:
+            for row in range(0, size, block_size):
+                for col in range(0, size, block_size):
+                    window = Window(col, row, min(block_size, size - col),
+                                    min(block_size, size - row))
+                    dst.write(synthetic_block(year_patches, window, size, seed), 1,
+                              window=window)
+        paths.append(path)
+    return paths
+
+def synthetic_block(patches, window, size, seed):
+    """One block of the synthetic raster: patches, speckle and the nodata footprint."""
+    rows = np.arange(window.row_off, window.row_off + window.height)
+    cols = np.arange(window.col_off, window.col_off + window.width)
+    block = patches[rows[:, None] // PATCH_SIZE, cols[None, :] // PATCH_SIZE]
+
+    rng = np.random.default_rng([seed, window.row_off, window.col_off])
+    speckle = (rng.random(block.shape) < SPECKLE_FRACTION) & (block != 250)
+    block[speckle] = class_patches(rng, 1, int(speckle.sum()))[0]
+
+    # 0 outside an ellipse filling the raster, like the area outside CONUS
+    y = (rows[:, None] + 0.5) / size * 2 - 1
+    x = (cols[None, :] + 0.5) / size * 2 - 1
+    block[x ** 2 + y ** 2 > 1] = 0
+    return block
+
+def edge_points(rng, start, end, jitter):
+    """Interior vertices of a wiggly edge from ``start`` to ``end``."""
+    t = np.linspace(0, 1, EDGE_POINTS + 2)[1:-1, None]
+    normal = np.array([start[1] - end[1], end[0] - start[0]])
+    offsets = rng.uniform(-jitter, jitter, (EDGE_POINTS, 1))
+    return start + t * (end - start) + offsets * normal
+
+def generate_counties(path, size, grid, seed=0, modified=()):
+    """
+    Write a county tiling of the raster footprint as a TIGER-like shapefile.
+
+    Parameters:
+    -----------
+    path : str
+        Destination shapefile
+    size : int
+        Raster width and height in pixels
+    grid : int
+        Counties per side; every ``grid // 4`` rows of counties form a state
+    seed : int
+        Random seed; the same seed gives the same tiling
+    modified : sequence of int
+        County indices whose shared edges are re-drawn (a later vintage)
+
+    Returns:
+    --------
+    geopandas.GeoDataFrame : The counties in NAD83
+    """
+    rng = np.random.default_rng(seed)
+    extent = size * PIXEL_SIZE
+    cell = extent / grid
+    # Grid vertices, jittered inside the frame and kept on it at the border
+    xs = ORIGIN[0] + np.arange(grid + 1) * cell
+    ys = ORIGIN[1] - np.arange(grid + 1) * cell
+    vertices = np.stack(np.meshgrid(xs, ys), axis=-1)
+    jitter = rng.uniform(-0.25, 0.25, vertices.shape) * cell
+    jitter[[0, -1], :, 1] = jitter[:, [0, -1], 0] = 0
+    vertices += jitter
+
+    # Each shared edge is generated once so neighbours use the same vertices
+    horizontal = {}
+    vertical = {}
+    for i in range(grid + 1):
+        for j in range(grid):
+            border = i in (0, grid)
+            horizontal[i, j] = edge_points(rng, vertices[i, j], vertices[i, j + 1],
+                                           0 if border else 0.05)
+    for i in range(grid):
+        for j in range(grid + 1):
+            border = j in (0, grid)
+            vertical[i, j] = edge_points(rng, vertices[i, j], vertices[i + 1, j],
+                                         0 if border else 0.05)
+
+    # Re-draw the right and bottom edges of modified counties
+    for index in modified:
+        i, j = divmod(index, grid)
+        if j + 1 < grid:
+            vertical[i, j + 1] = edge_points(rng, vertices[i, j + 1], vertices[i + 1, j + 1], 0.1)
+        if i + 1 < grid:
+            horizontal[i + 1, j] = edge_points(rng, vertices[i + 1, j], vertices[i + 1, j + 1], 0.1)
+
+    rows_per_state = max(1, grid // 4)
+    records = []
+    for i in range(grid):
+        for j in range(grid):
+            ring = np.concatenate([
+                vertices[i, j][None], horizontal[i, j],
+                vertices[i, j + 1][None], vertical[i, j + 1],
+                vertices[i + 1, j + 1][None], horizontal[i + 1, j][::-1],
+                vertices[i + 1, j][None], vertical[i, j][::-1]
+            ])
+            state = f'{i // rows_per_state + 1:02d}'
+            index = i * grid + j
+            records.append({'GEOID': f'{state}{index:03d}', 'STATEFP': state,
+                            'NAME': f'County {index}', 'geometry': Polygon(ring)})
+    counties = gpd.GeoDataFrame(records, crs='EPSG:5070').to_crs('EPSG:4269')
+    counties.to_file(path)
+    return counties
+
+def generate_data(data_dir, size, grid, seed=0):
+    """
+    Write the synthetic rasters and both county vintages.
+
+    Returns:
+    --------
+    dict : Paths and sizes of the generated data
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    start = time.perf_counter()
+    print(f"Generating {len(YEARS)} synthetic {size} x {size} rasters...")
+    raster_paths = generate_rasters(data_dir, size, seed)
+    print(f"Generating {grid * grid} synthetic counties...")
+    counties_path = os.path.join(data_dir, 'synthetic_counties.shp')
+    previous_path = os.path.join(data_dir, 'synthetic_counties_previous.shp')
+    generate_counties(counties_path, size, grid, seed)
+    # The previous vintage differs in a few counties' edges
+    rng = np.random.default_rng(seed)
+    modified = rng.choice(grid * grid, size=max(1, grid * grid // 50), replace=False)
+    generate_counties(previous_path, size, grid, seed, modified=modified)
+    print(f"Generated data in {time.perf_counter() - start:.1f} s")
+    return {
+        'raster_paths': raster_paths,
+        'counties_path': counties_path,
+        'previous_counties_path': previous_path,
+        'size': size,
+        'pixels': size * size,
+        'counties': grid * grid
+    }
+
+def peak_rss_bytes():
+    """Peak RSS of this process or its largest finished child (ru_maxrss is KB on Linux)."""
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) * 1024
+
+def latency_percentiles(stamps, start):
+    """Percentiles of the gaps between successive county completions, in ms."""
+    if not stamps:
+        return None
+    gaps = np.diff(np.concatenate([[start], stamps])) * 1000
+    percentiles = {f'p{q}': float(np.percentile(gaps, q)) for q in (50, 90, 99)}
+    percentiles['max'] = float(gaps.max())
+    return percentiles
+
+def timed_engine(engine_function, stamps):
+    """Wrap an engine so every county it yields is timestamped."""
+    def run(*args, **kwargs):
+        for item in engine_function(*args, **kwargs):
+            stamps.append(time.perf_counter())
+            yield item
+    return run
+
+def run_mode(data, options, work_dir):
+    """
+    Run one pipeline mode and measure it (called in a fresh subprocess).
+
+    Parameters:
+    -----------
+    data : dict
+        From ``generate_data``
+    options : dict
+        A value of MODES
+    work_dir : str
+        Directory for the run's outputs
+
+    Returns:
+    --------
+    dict : Timing, throughput, memory and latency of the run
+    """
+    from . import process_county_landcover as pipeline
+    from .tile_cache import TileCacheSettings
+
+    raster_path = data['raster_paths'][-1]
+    output_path = os.path.join(work_dir, 'county_landcover_proportions.csv')
+    template = raster_path_for(data['data_dir'], '{year}')
+    kind = options.get('kind', 'run')
+    engine = options.get('engine')
+    kwargs = {}
+    if options.get('zones'):
+        kwargs['zone_path'] = pipeline.prepare_zone_raster(
+            data['counties_path'], raster_path, os.path.join(work_dir, 'county_zones.tif'))
+    if options.get('tile_cache'):
+        cache_dir = os.path.join(work_dir, 'tile_cache')
+        kwargs['tile_cache'] = TileCacheSettings(cache_dir, 1024 ** 3)
+    if options.get('incremental'):
+        # The previous vintage's run supplies the counts being carried over
+        pipeline.process_county_landcover(raster_path, data['previous_counties_path'],
+                                          output_path, engine=engine)
+        kwargs['previous_shapefile'] = data['previous_counties_path']
+    if options.get('tile_cache'):
+        # Fill the cache first; the timed run reads decoded tiles
+        pipeline.process_county_landcover(raster_path, data['counties_path'], output_path,
+                                          engine=engine, tile_cache=kwargs['tile_cache'])
+
+    stamps = []
+    if engine is not None:
+        pipeline.ENGINES[engine] = timed_engine(pipeline.ENGINES[engine], stamps)
+
+    start = time.perf_counter()
+    if kind == 'timeseries':
+        pipeline.process_county_landcover_timeseries(list(YEARS), template,
+                                                     data['counties_path'], output_path)
+        pixels = data['pixels'] * len(YEARS)
+    elif kind == 'transitions':
+        pipeline.process_county_transitions(*YEARS, template, data['counties_path'],
+                                            os.path.join(work_dir, 'transitions.npz'))
+        pixels = data['pixels'] * 2
+    else:
+        pipeline.process_county_landcover(raster_path, data['counties_path'], output_path,
+                                          engine=engine, workers=options.get('workers', 1),
+                                          schedule=options.get('schedule', 'shapefile'),
+                                          **kwargs)
+        pixels = data['pixels']
+    elapsed = time.perf_counter() - start
+
+    return {
+        'seconds': elapsed,
+        'pixels': pixels,
+        'pixels_per_second': pixels / elapsed,
+        'peak_rss_mb': peak_rss_bytes() / 1024 ** 2,
+        'counties_emitted': len(stamps) or None,
+        'county_latency_ms': latency_percentiles(stamps, start)
+    }
+
+def run_mode_subprocess(name, data, work_root):
+    """
+    Run one mode in a fresh interpreter so its peak RSS is its own.
+
+    Returns:
+    --------
+    dict : The mode's result, or its error
+    """
+    work_dir = os.path.join(work_root, name)
+    os.makedirs(work_dir, exist_ok=True)
+    request = json.dumps({'mode': name, 'data': data, 'work_dir': work_dir})
+    completed = subprocess.run([sys.executable, '-m', __spec__.name, '--run-one', request],
+                               capture_output=True, text=True)
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 and not (lines and lines[-1].startswith('{')):
+        error = (completed.stderr.strip().splitlines() or ['unknown error'])[-1]
+        return {'mode': name, 'options': MODES[name], 'error': error}
+    return {'mode': name, 'options': MODES[name], **json.loads(lines[-1])}
+
+def run_benchmark(modes, size, grid, data_dir=None, output_path=None, seed=0):
+    """
+    Generate the synthetic data, run every mode and write the JSON report.
+
+    Parameters:
+    -----------
+    modes : sequence of str
+        Keys of MODES
+    size : int
+        Raster width and height in pixels
+    grid : int
+        Counties per side
+    data_dir : str, optional
+        Keep the data and run outputs here (default: a temporary directory,
+        removed afterwards)
+    output_path : str, optional
+        JSON report (default: benchmark_pipeline_<timestamp>.json)
+    seed : int
+        Random seed for the synthetic data
+
+    Returns:
+    --------
+    dict : The report
+    """
+    created = datetime.now()
+    if output_path is None:
+        output_path = f"benchmark_pipeline_{created:%Y%m%d-%H%M%S}.json"
+    keep = data_dir is not None
+    if data_dir is None:
+        data_dir = tempfile.mkdtemp(prefix='nlcd_benchmark_')
+    data_dir = os.path.abspath(data_dir)
+
+    try:
+        data = generate_data(data_dir, size, grid, seed)
+        data['data_dir'] = data_dir
+        runs = []
+        for name in modes:
+            print(f"\nRunning '{name}'...")
+            result = run_mode_subprocess(name, data, os.path.join(data_dir, 'runs'))
+            runs.append(result)
+            if 'error' in result:
+                print(f"  FAILED: {result['error']}")
+                continue
+            latency = result['county_latency_ms']
+            print(f"  {result['seconds']:8.2f} s  {result['pixels_per_second'] / 1e6:8.1f} "
+                  f"Mpx/s  peak RSS {result['peak_rss_mb']:8.1f} MB"
+                  + (f"  county p50/p99 {latency['p50']:.1f}/{latency['p99']:.1f} ms"
+                     if latency else ""))
+    finally:
+        if not keep:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    report = {
+        'created': created.isoformat(timespec='seconds'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpu_count': os.cpu_count()},
+        'data': {'size': size, 'pixels': size * size, 'counties': grid * grid,
+                 'years': list(YEARS), 'seed': seed},
+        'runs': runs
+    }
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nBenchmark results saved to: {output_path}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=4096,
+                        help="Synthetic raster width and height in pixels (default: %(default)s)")
+    parser.add_argument('--grid', type=int, default=16,
+                        help="Synthetic counties per side (default: %(default)s)")
+    parser.add_argument('--modes', default=','.join(MODES),
+                        help="Comma-separated modes to run (default: all of "
+                             f"{', '.join(MODES)})")
+    parser.add_argument('--data-dir', default=None,
+                        help="Keep the synthetic data and run outputs here (default: a "
+                             "temporary directory)")
+    parser.add_argument('--output', default=None,
+                        help="JSON report path (default: benchmark_pipeline_<timestamp>.json)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument('--run-one', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        # Subprocess of run_mode_subprocess: pipeline output goes to stderr
+        request = json.loads(args.run_one)
+        with contextlib.redirect_stdout(sys.stderr):
+            result = run_mode(request['data'], MODES[request['mode']], request['work_dir'])
+        print(json.dumps(result), flush=True)
+        # Skip interpreter teardown; the result is already reported
+        os._exit(0)
+
+    modes = args.modes.split(',')
+    unknown = [name for name in modes if name not in MODES]
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(unknown)}")
+    run_benchmark(modes, args.size, args.grid, args.data_dir, args.output, args.seed)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Diff two TIGER county vintages by geometry hash.
+
+Only a handful of county polygons change between yearly TIGER releases (for
+example the Connecticut planning regions or Alaska boroughs). Each county is
+hashed from its normalized WKB geometry plus the shapefile CRS, and the two
+vintages are compared by GEOID: counties are added, removed, modified (same
+GEOID, different geometry) or unchanged. Incremental runs recompute only the
+added and modified counties and carry the unchanged ones over from the
+previous run's count cube (see process_county_landcover.py --previous-counties).
+
+Usage:
+    python -m nlcd_county.boundary_diff PREVIOUS.shp CURRENT.shp
+
+Dependencies: geopandas, shapely, numpy
+"""
+
+import argparse
+import hashlib
+
+import numpy as np
+import shapely
+from .count_cube import load_count_cube
+from .geometry_cache import read_counties
+
+def geometry_hashes(counties):
+    """
+    Hash every county geometry.
+
+    Parameters:
+    -----------
+    counties : geopandas.GeoDataFrame
+        Counties with a GEOID column, in their source CRS
+
+    Returns:
+    --------
+    dict : GEOID -> hex digest of the normalized geometry and CRS
+    """
+    crs = counties.crs.to_wkt().encode() if counties.crs is not None else b''
+    # Normalizing orders rings and vertices so equal shapes hash equally
+    wkbs = shapely.to_wkb(shapely.normalize(counties.geometry.values))
+    return {county_fips: hashlib.blake2b(crs + wkb, digest_size=16).hexdigest()
+            for county_fips, wkb in zip(counties['GEOID'].astype(str), wkbs)}
+
+def diff_vintages(previous_hashes, current_hashes):
+    """
+    Compare two vintages' geometry hashes.
+
+    Returns:
+    --------
+    dict : 'added', 'removed', 'modified' and 'unchanged' sorted GEOID lists
+    """
+    previous, current = set(previous_hashes), set(current_hashes)
+    shared = previous & current
+    return {
+        'added': sorted(current - previous),
+        'removed': sorted(previous - current),
+        'modified': sorted(g for g in shared if previous_hashes[g] != current_hashes[g]),
+        'unchanged': sorted(g for g in shared if previous_hashes[g] == current_hashes[g])
+    }
+
+def diff_shapefiles(previous_path, current_path):
+    """Diff two county shapefiles (read through the geometry cache)."""
+    previous = read_counties(previous_path, columns=['GEOID'])
+    current = read_counties(current_path, columns=['GEOID'])
+    return diff_vintages(geometry_hashes(previous), geometry_hashes(current))
+
+def carry_over_counts(count_cube_path, geoids):
+    """
+    Pixel counts of the given counties from a previous run's count cube.
+
+    All-zero rows (counties that failed or missed the raster) are not carried
+    over, so they are recomputed.
+
+    Parameters:
+    -----------
+    count_cube_path : str
+        Count cube written by the previous run
+    geoids : iterable of str
+        Counties to carry over
+
+    Returns:
+    --------
+    dict : GEOID -> {NLCD value: pixel count}, as the checkpoint store holds
+    """
+    cube_geoids, codes, counts = load_count_cube(count_cube_path)
+    row = {county_fips: i for i, county_fips in enumerate(cube_geoids)}
+    carried = {}
+    for county_fips in geoids:
+        if county_fips not in row or not counts[row[county_fips]].any():
+            continue
+        values = counts[row[county_fips]]
+        nonzero = np.flatnonzero(values)
+        carried[county_fips] = {int(codes[i]): values[i].item() for i in nonzero}
+    return carried
+
+def print_diff(diff):
+    """Print the size of each change category and the changed GEOIDs."""
+    for key in ('added', 'removed', 'modified'):
+        geoids = diff[key]
+        sample = ', '.join(geoids[:10]) + (', ...' if len(geoids) > 10 else '')
+        print(f"  {key.capitalize():10}: {len(geoids):5}" + (f"  ({sample})" if geoids else ""))
+    print(f"  {'Unchanged':10}: {len(diff['unchanged']):5}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('previous', help="Previous vintage county shapefile")
+    parser.add_argument('current', help="Current vintage county shapefile")
+    args = parser.parse_args()
+
+    print(f"Comparing {args.previous} -> {args.current}...")
+    print_diff(diff_shapefiles(args.previous, args.current))
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Append-only SQLite checkpoint store for county processing runs.
+
+Every finished county is written as soon as its counts are known, keyed by
+GEOID, so a crashed or killed run can be resumed without recomputing the
+counties it already completed. The raw NLCD pixel counts are stored (as JSON)
+rather than the derived proportions, so resumed runs rebuild exactly the same
+output rows as an uninterrupted run.
+
+Counties whose processing failed are kept in a separate quarantine table with
+the error, the engine and statistics of the geometry, until a later attempt
+(see quarantine.py) succeeds.
+
+Dependencies: sqlite3, json (standard library)
+"""
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+
+# Rows buffered between commits; bounds the work lost to a hard kill
+COMMIT_INTERVAL = 50
+
+class CheckpointStore:
+    """
+    Persistent GEOID -> pixel counts store backed by a SQLite file.
+
+    Parameters:
+    -----------
+    path : str
+        Path of the SQLite database (created if missing)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS county_counts ("
+            "geoid TEXT PRIMARY KEY, "
+            "pixel_counts TEXT NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS county_failures ("
+            "geoid TEXT PRIMARY KEY, "
+            "engine TEXT, "
+            "error TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 1, "
+            "geometry_stats TEXT, "
+            "failed_at TEXT NOT NULL)"
+        )
+        self.connection.commit()
+        self._uncommitted = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def clear(self):
+        """Discard all checkpointed and quarantined counties (start of a fresh run)."""
+        self.connection.execute("DELETE FROM county_counts")
+        self.connection.execute("DELETE FROM county_failures")
+        self.connection.commit()
+
+    def append(self, county_fips, pixel_counts):
+        """
+        Record a finished county.
+
+        Parameters:
+        -----------
+        county_fips : str
+            County GEOID
+        pixel_counts : dict
+            Mapping from NLCD value to pixel count (float counts from exact
+            coverage weighting are kept as floats)
+        """
+        encoded = json.dumps({
+            str(int(value)): float(count) if isinstance(count, float) else int(count)
+            for value, count in pixel_counts.items()
+        })
+        self.connection.execute(
+            "INSERT OR REPLACE INTO county_counts (geoid, pixel_counts) VALUES (?, ?)",
+            (county_fips, encoded)
+        )
+        self._uncommitted += 1
+        if self._uncommitted >= COMMIT_INTERVAL:
+            self.commit()
+
+    def record_failure(self, county_fips, error, engine=None, geometry_stats=None):
+        """
+        Quarantine a county whose processing failed.
+
+        Parameters:
+        -----------
+        county_fips : str
+            County GEOID
+        error : str
+            Exception message (the latest one is kept)
+        engine : str, optional
+            Engine or retry strategy that failed
+        geometry_stats : dict, optional
+            Geometry statistics (see quarantine.geometry_stats)
+        """
+        self.connection.execute(
+            "INSERT INTO county_failures (geoid, engine, error, geometry_stats, failed_at) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (geoid) DO UPDATE SET engine = excluded.engine, "
+            "error = excluded.error, attempts = attempts + 1, "
+            "geometry_stats = excluded.geometry_stats, failed_at = excluded.failed_at",
+            (county_fips, engine, error, json.dumps(geometry_stats),
+             datetime.now(timezone.utc).isoformat(timespec='seconds'))
+        )
+
+    def resolve_failure(self, county_fips):
+        """Release a county from quarantine after it was processed."""
+        self.connection.execute("DELETE FROM county_failures WHERE geoid = ?", (county_fips,))
+
+    def failures(self):
+        """
+        Load the quarantined counties.
+
+        Returns:
+        --------
+        dict : GEOID -> {'engine', 'error', 'attempts', 'geometry_stats', 'failed_at'}
+        """
+        cursor = self.connection.execute(
+            "SELECT geoid, engine, error, attempts, geometry_stats, failed_at "
+            "FROM county_failures ORDER BY geoid")
+        return {geoid: {'engine': engine, 'error': error, 'attempts': attempts,
+                        'geometry_stats': json.loads(stats) if stats else None,
+                        'failed_at': failed_at}
+                for geoid, engine, error, attempts, stats, failed_at in cursor}
+
+    def commit(self):
+        """Flush buffered rows to disk."""
+        self.connection.commit()
+        self._uncommitted = 0
+
+    def load(self):
+        """
+        Load every checkpointed county.
+
+        Returns:
+        --------
+        dict : GEOID -> {NLCD value: pixel count}
+        """
+        cursor = self.connection.execute("SELECT geoid, pixel_counts FROM county_counts")
+        return {geoid: {int(value): count for value, count in json.loads(encoded).items()}
+                for geoid, encoded in cursor}
+
+    def close(self):
+        """Commit pending rows and close the database."""
+        if self.connection is not None:
+            self.commit()
+            self.connection.close()
+            self.connection = None
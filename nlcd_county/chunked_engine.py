@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Bounded-memory chunked engine for national runs on modest RAM.
+
+A full CONUS NLCD array is ~16 GB of uint8, so nothing here ever holds more
+than a few raster blocks at once. Each reader thread owns one dataset handle,
+one block in flight (window -> zone block + value block -> partial count
+matrix), released before the next is read, and its own partial
+(zone x NLCD value) count matrix. Partials are reduced by summation, per
+finished zone after every row band and in full at the end.
+
+The block size is derived from a peak-memory budget: the fixed cost (GDAL's
+block cache and two count-matrix buffers per thread) is reserved first and
+the remainder is split across the reader threads' in-flight blocks (see
+benchmark_chunked_memory.py for a check of the resulting peak). GDAL's
+cache is not left to the environment (5% of RAM by default): the engine sets
+it to a share of the budget for the duration of the run.
+
+Dependencies: rasterio, shapely, numpy, tqdm
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+from tqdm import tqdm
+from . import run_trace
+from .raster_engine import NLCD_VALUE_RANGE, ZoneBlocks, pixel_counts_from_row, zone_dtype
+from .scheduling import default_block_cache_bytes
+from .tile_cache import TILE_SIZE, open_raster
+from .zone_raster import read_manifest
+
+# Default peak-memory budget for --engine chunked
+DEFAULT_MEMORY_BUDGET = 4 * 1024 ** 3
+
+# Largest block edge the planner will choose; bigger blocks stop paying off
+MAX_BLOCK_SIZE = 16384
+
+# Share of the budget given to GDAL's block cache; blocks are read whole and
+# tile-aligned, so the cache only saves re-decoding tiles at block edges
+BLOCK_CACHE_FRACTION = 1 / 16
+
+# Per-thread allowance for the dataset handle, decompression buffers and
+# the rasterizer's working memory, which scale with neither budget nor block
+THREAD_OVERHEAD_BYTES = 8 * 1024 ** 2
+
+def bytes_per_block_pixel(zone_itemsize):
+    """
+    Working memory per pixel of one in-flight block.
+
+    The value block (uint8), the zone block and one int64 encoded index.
+    """
+    return 1 + zone_itemsize + 8
+
+def plan_cache_bytes(memory_budget):
+    """
+    GDAL block cache size for a run: BLOCK_CACHE_FRACTION of the budget,
+    or the configured cache when that is smaller.
+    """
+    return min(default_block_cache_bytes(), int(memory_budget * BLOCK_CACHE_FRACTION))
+
+def plan_block_size(memory_budget, n_zones, workers=1, cache_bytes=None):
+    """
+    Largest block edge that keeps a run under a peak-memory budget.
+
+    Parameters:
+    -----------
+    memory_budget : int
+        Peak-memory budget in bytes (excluding the county geometries)
+    n_zones : int
+        Number of counties
+    workers : int
+        Reader threads, each with one block in flight
+    cache_bytes : int, optional
+        GDAL block cache size (default: ``plan_cache_bytes``)
+
+    Returns:
+    --------
+    int : Block edge in pixels, a multiple of TILE_SIZE
+    """
+    if cache_bytes is None:
+        cache_bytes = plan_cache_bytes(memory_budget)
+    matrix_bytes = (n_zones + 1) * NLCD_VALUE_RANGE * 8
+    # Reduced result, plus each thread's partial, its bincount temporary and
+    # its fixed overhead
+    fixed = cache_bytes + matrix_bytes + workers * (2 * matrix_bytes + THREAD_OVERHEAD_BYTES)
+
+    per_pixel = bytes_per_block_pixel(np.dtype(zone_dtype(n_zones)).itemsize)
+    block_pixels = (memory_budget - fixed) // (workers * per_pixel)
+    block_size = min(int(np.sqrt(max(block_pixels, 0))) // TILE_SIZE * TILE_SIZE, MAX_BLOCK_SIZE)
+    if block_size < TILE_SIZE:
+        needed = fixed + workers * per_pixel * TILE_SIZE ** 2
+        raise ValueError(f"Memory budget of {memory_budget / 1024 ** 2:.0f} MB is too small; "
+                         f"at least {needed / 1024 ** 2:.0f} MB is needed for "
+                         f"{workers} worker(s)")
+    return block_size
+
+class BlockCounter:
+    """
+    One reader thread's stage of the pipeline.
+
+    Parameters:
+    -----------
+    raster_path : str
+        Path to the NLCD raster
+    geometries : numpy.ndarray or None
+        Zone polygons in the raster CRS (unused with ``zone_path``)
+    tile_cache : TileCacheSettings, optional
+        Read through the decoded-tile cache
+    zone_path : str, optional
+        Precomputed zone raster (see zone_raster.py)
+    """
+
+    def __init__(self, raster_path, geometries, tile_cache=None, zone_path=None):
+        self.src = open_raster(raster_path, tile_cache)
+        self.zone_blocks = ZoneBlocks(geometries, self.src, zone_path)
+        self.counts = np.zeros((self.zone_blocks.count + 1, NLCD_VALUE_RANGE), dtype=np.int64)
+
+    def count(self, windows):
+        """Accumulate the windows into this thread's partial count matrix."""
+        for window in windows:
+            with run_trace.stage('zone block') as span:
+                zones = self.zone_blocks.read(window)
+                span['pixels'] = int(window.width * window.height)
+            if zones is None:
+                continue
+            with run_trace.stage('raster decode') as span:
+                values = self.src.read(1, window=window)
+                span['pixels'] = values.size
+            with run_trace.stage('zone histogram') as span:
+                span['pixels'] = values.size
+                # In-place encoding keeps a single int64 temporary per block;
+                # these are the only references, so each block is freed here
+                # rather than after the next one has been read
+                encoded = zones.astype(np.int64).ravel()
+                del zones
+                encoded *= NLCD_VALUE_RANGE
+                encoded += values.ravel()
+                del values
+                self.counts += np.bincount(encoded, minlength=self.counts.size).reshape(
+                    self.counts.shape)
+                del encoded
+        return len(windows)
+
+    def close(self):
+        """Close the dataset handles."""
+        self.zone_blocks.close()
+        self.src.close()
+
+def iter_chunked_zone_counts(raster_path, geometries, memory_budget=DEFAULT_MEMORY_BUDGET,
+                             workers=1, tile_cache=None, block_size=None, rows=None,
+                             zone_path=None):
+    """
+    Stream the raster under a memory budget and yield each zone's counts.
+
+    Every row band is split round-robin across the reader threads; after a
+    band, zones whose bounding box ends above the next band are final and
+    their partial rows are reduced and yielded.
+
+    Parameters:
+    -----------
+    raster_path : str
+        Path to the NLCD raster
+    geometries : sequence of shapely geometries
+        Zone polygons, already in the raster CRS
+    memory_budget : int
+        Peak-memory budget in bytes
+    workers : int
+        Reader threads
+    tile_cache : TileCacheSettings, optional
+        Read through the decoded-tile cache
+    block_size : int, optional
+        Override the block edge chosen by ``plan_block_size``
+    rows : tuple, optional
+        (start, stop) raster rows to stream (tile shards)
+    zone_path : str, optional
+        Precomputed zone raster used instead of rasterizing ``geometries``
+
+    Yields:
+    -------
+    tuple : (zone_index, counts) with counts an int64 vector of length 256
+    """
+    if zone_path is None:
+        geometries = np.asarray(geometries, dtype=object)
+        n_zones = len(geometries)
+    else:
+        n_zones = len(read_manifest(zone_path)['geoids'])
+    workers = max(1, workers)
+    cache_bytes = plan_cache_bytes(memory_budget)
+    if block_size is None:
+        block_size = plan_block_size(memory_budget, n_zones, workers, cache_bytes)
+    print(f"Chunked engine: {block_size} x {block_size} blocks, {workers} reader thread(s), "
+          f"{memory_budget / 1024 ** 2:,.0f} MB budget "
+          f"({cache_bytes / 1024 ** 2:,.0f} MB GDAL cache)")
+
+    # GDAL's cache is process-wide; the setting is restored when the run ends
+    with rasterio.Env(GDAL_CACHEMAX=cache_bytes):
+        counters = [BlockCounter(raster_path, geometries, tile_cache, zone_path)
+                    for _ in range(workers)]
+        try:
+            grid = counters[0].src
+            if grid.dtypes[0] != 'uint8':
+                raise ValueError(f"Expected a uint8 NLCD raster, got {grid.dtypes[0]}")
+            last_rows = counters[0].zone_blocks.last_rows
+            pending = np.ones(n_zones, dtype=bool)
+            row_start, row_stop = rows if rows is not None else (0, grid.height)
+
+            n_blocks = (len(range(row_start, row_stop, block_size))
+                        * len(range(0, grid.width, block_size)))
+            progress = tqdm(total=n_blocks, desc="Processing raster blocks")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for row_off in range(row_start, row_stop, block_size):
+                    band = [Window(col_off, row_off, min(block_size, grid.width - col_off),
+                                   min(block_size, row_stop - row_off))
+                            for col_off in range(0, grid.width, block_size)]
+                    shares = [band[i::workers] for i in range(workers)]
+                    for done in executor.map(BlockCounter.count, counters, shares):
+                        progress.update(done)
+
+                    finished = np.flatnonzero(pending & (last_rows < row_off + block_size))
+                    pending[finished] = False
+                    for index in finished:
+                        yield int(index), sum(counter.counts[index + 1] for counter in counters)
+            progress.close()
+
+            # Final reduction for zones lying (partly) beyond the last streamed row
+            remaining = np.flatnonzero(pending)
+            if len(remaining):
+                reduced = sum(counter.counts for counter in counters)
+                for index in remaining:
+                    yield int(index), reduced[index + 1]
+        finally:
+            for counter in counters:
+                counter.close()
+
+def iter_chunked_pixel_counts(tasks, raster_path, workers=1, tile_cache=None,
+                              schedule='shapefile', memory_budget=DEFAULT_MEMORY_BUDGET,
+                              rows=None, zone_path=None):
+    """
+    Engine adapter with the same interface as
+    ``zonal_engine.iter_county_pixel_counts``.
+
+    Parameters:
+    -----------
+    tasks : list
+        (county_fips, geometry) tuples
+    raster_path : str
+        Path to the NLCD raster
+    workers : int
+        Reader threads
+    tile_cache : TileCacheSettings, optional
+        Read through the decoded-tile cache
+    schedule : str
+        Ignored; blocks are always streamed in raster order
+    memory_budget : int
+        Peak-memory budget in bytes
+    rows : tuple, optional
+        (start, stop) raster rows to stream (tile shards)
+    zone_path : str, optional
+        Precomputed zone raster; task geometries are then not needed
+
+    Yields:
+    -------
+    tuple : (county_fips, pixel_counts, error) in completion order
+    """
+    if not tasks:
+        return
+    if zone_path is not None:
+        # Zones cover every county; report only the requested ones
+        with_zones = {county_fips for county_fips, _ in tasks}
+        geoids, geometries = read_manifest(zone_path)['geoids'], None
+    else:
+        geoids = [county_fips for county_fips, _ in tasks]
+        geometries = [geometry for _, geometry in tasks]
+        with_zones = None
+    for index, row in iter_chunked_zone_counts(raster_path, geometries, memory_budget,
+                                               workers, tile_cache, rows=rows,
+                                               zone_path=zone_path):
+        if with_zones is None or geoids[index] in with_zones:
+            yield geoids[index], pixel_counts_from_row(row), None
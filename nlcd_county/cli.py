@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Command line entry point for the county land cover pipeline.
+
+Each subcommand runs one module of the package as if it were invoked with
+``python -m``; the remaining arguments are passed to it unchanged, so
+``nlcd-county run --help`` shows the options of the county processing step.
+Only the chosen module is imported, so a command never pays for the
+dependencies of another (``verify`` loads no pandas, numpy or GDAL).
+
+Commands:
+    run       Compute county proportions (process_county_landcover)
+    analyze   Write the land cover analysis report (analyze_landcover)
+    maps      Make maps: static (default), interactive or tiles
+              (create_landcover_maps, create_interactive_map, vector_tiles)
+    verify    Spot-check a proportions CSV (verify_results)
+
+Paths not given on the command line come from the config file (config.py).
+
+Usage:
+    nlcd-county [--config nlcd-county.toml] COMMAND [ARGS...]
+    nlcd-county maps interactive
+"""
+
+import argparse
+import os
+import runpy
+import sys
+from . import config
+
+# Module run by each command
+COMMANDS = {
+    'run': 'process_county_landcover',
+    'analyze': 'analyze_landcover',
+    'maps': None,
+    'verify': 'verify_results'
+}
+
+# Module run by each kind of map (the first argument of ``maps``)
+MAP_KINDS = {
+    'static': 'create_landcover_maps',
+    'interactive': 'create_interactive_map',
+    'tiles': 'vector_tiles'
+}
+
+def resolve_command(command, args):
+    """
+    Module to run for a command and the arguments to pass it.
+
+    Returns:
+    --------
+    tuple : (module name, argument list)
+    """
+    if command != 'maps':
+        return COMMANDS[command], args
+    if args and not args[0].startswith('-'):
+        kind, args = args[0], args[1:]
+        if kind not in MAP_KINDS:
+            raise SystemExit(f"nlcd-county maps: unknown map kind '{kind}' "
+                             f"(choose from {', '.join(MAP_KINDS)})")
+        return MAP_KINDS[kind], args
+    return MAP_KINDS['static'], args
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='nlcd-county', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', help=f"Config file (default: ${config.CONFIG_ENV}, "
+                                         f"else ./nlcd-county.toml if present)")
+    parser.add_argument('command', choices=COMMANDS, help="Command to run")
+    parser.add_argument('args', nargs=argparse.REMAINDER,
+                        help="Arguments for the command (see nlcd-county COMMAND --help)")
+    args = parser.parse_args(argv)
+
+    # Modules read their default paths from config.PATHS when imported below
+    if args.config:
+        os.environ[config.CONFIG_ENV] = os.path.abspath(args.config)
+        config.PATHS.update(config.load_paths())
+
+    module, module_args = resolve_command(args.command, args.args)
+    sys.argv = [f'nlcd-county {args.command}', *module_args]
+    runpy.run_module(f'{__package__}.{module}', run_name='__main__', alter_sys=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Input and output paths of the pipeline, read from a TOML config file.
+
+The config file is the one named by the NLCD_COUNTY_CONFIG environment
+variable (``nlcd-county --config PATH`` sets it), else ``nlcd-county.toml``
+in the working directory; without either, the defaults below apply. Relative
+paths are resolved against ``data_dir``, which itself is relative to the
+config file (or the working directory). Example::
+
+    data_dir = "/data/nlcd-county"
+
+    [paths]
+    nlcd_raster = "Annual_NLCD_LndCov_2024_CU_C1V1/Annual_NLCD_LndCov_2024_CU_C1V1.tif"
+    output_csv = "results/county_landcover_proportions.csv"
+
+Paths are read once, when config.py is first imported, and modules copy them
+into their path constants at import time.
+
+Usage:
+    python -m nlcd_county.config [PATH]   # print the resolved paths
+
+Dependencies: tomllib (standard library; tomli before Python 3.11)
+"""
+
+import os
+import sys
+
+try:
+    import tomllib
+except ImportError:
+    import tomli as tomllib
+
+# Environment variable naming the config file
+CONFIG_ENV = 'NLCD_COUNTY_CONFIG'
+
+# Config file looked up in the working directory
+CONFIG_FILENAME = 'nlcd-county.toml'
+
+# Default paths, relative to data_dir (the count cube and Parquet dataset are
+# written next to output_csv; reports is the directory of the analysis report
+# and summary CSVs)
+DEFAULT_PATHS = {
+    'nlcd_raster': 'Annual_NLCD_LndCov_2024_CU_C1V1/Annual_NLCD_LndCov_2024_CU_C1V1.tif',
+    'nlcd_raster_template': 'Annual_NLCD_LndCov_{year}_CU_C1V1/Annual_NLCD_LndCov_{year}_CU_C1V1.tif',
+    'counties': 'tl_2024_us_county/tl_2024_us_county.shp',
+    'output_csv': 'county_landcover_proportions.csv',
+    'timeseries_csv': 'county_landcover_timeseries.csv',
+    'transitions': 'county_landcover_transitions.npz',
+    'zone_raster': 'county_zones.tif',
+    'rollups': 'rollups',
+    'reports': '.',
+    'mbtiles': 'county_landcover.mbtiles'
+}
+
+def config_path():
+    """Config file in effect, or None when the defaults apply."""
+    path = os.environ.get(CONFIG_ENV)
+    if path:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{CONFIG_ENV} names a missing config file: {path}")
+        return path
+    return CONFIG_FILENAME if os.path.exists(CONFIG_FILENAME) else None
+
+def load_paths(path=None):
+    """
+    Resolve the pipeline paths from a config file.
+
+    Parameters:
+    -----------
+    path : str, optional
+        Config file (default: see ``config_path``)
+
+    Returns:
+    --------
+    dict : Path name -> path, for every key of DEFAULT_PATHS
+    """
+    if path is None:
+        path = config_path()
+    config = {}
+    if path is not None:
+        with open(path, 'rb') as f:
+            config = tomllib.load(f)
+
+    unknown = set(config.get('paths', {})) - set(DEFAULT_PATHS)
+    if unknown:
+        raise ValueError(f"Unknown paths in {path}: {', '.join(sorted(unknown))}; "
+                         f"expected some of {', '.join(DEFAULT_PATHS)}")
+    base = os.path.dirname(os.path.abspath(path)) if path is not None else os.getcwd()
+    data_dir = os.path.join(base, os.path.expanduser(config.get('data_dir', '.')))
+
+    paths = {**DEFAULT_PATHS, **config.get('paths', {})}
+    return {name: os.path.normpath(os.path.join(data_dir, os.path.expanduser(value)))
+            for name, value in paths.items()}
+
+# Paths of this run
+PATHS = load_paths()
+
+if __name__ == "__main__":
+    paths = load_paths(sys.argv[1]) if len(sys.argv) > 1 else PATHS
+    print(f"Config: {(sys.argv[1] if len(sys.argv) > 1 else config_path()) or 'defaults'}")
+    for name, value in paths.items():
+        print(f"  {name:22} {value}")
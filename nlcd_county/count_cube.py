@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Compact county x NLCD class pixel-count cube.
+
+The cube keeps the raw pixel counts for the 16 native NLCD codes plus the 250
+fill value as a uint32 matrix (one row per county) in a ``.npz`` file. Any
+class grouping can then be derived from it without another pass over the
+raster. Per-county from -> to transition matrices between two years are
+stored the same way.
+
+Dependencies: numpy, pandas
+"""
+
+import numpy as np
+import pandas as pd
+from .nlcd_classes import NLCD_CODES, PIXEL_AREA_KM2
+from .reclassify import Reclassifier
+
+def build_count_cube(geoids, pixel_counts_by_geoid, dtype=np.uint32):
+    """
+    Assemble the count matrix for a list of counties.
+
+    Parameters:
+    -----------
+    geoids : sequence of str
+        County GEOIDs in output order
+    pixel_counts_by_geoid : dict
+        GEOID -> {NLCD value: pixel count}; counties missing from the dict
+        (e.g. failed ones) get an all-zero row
+    dtype : numpy dtype
+        uint32 for pixel counts; float64 for coverage-weighted (exact) counts
+
+    Returns:
+    --------
+    numpy.ndarray : Matrix of shape (len(geoids), len(NLCD_CODES))
+    """
+    column = {code: i for i, code in enumerate(NLCD_CODES)}
+    counts = np.zeros((len(geoids), len(NLCD_CODES)), dtype=dtype)
+    for row, county_fips in enumerate(geoids):
+        for value, count in pixel_counts_by_geoid.get(county_fips, {}).items():
+            # Values outside the NLCD legend are not part of any class
+            if value in column:
+                counts[row, column[value]] = count
+    return counts
+
+def write_count_cube(path, geoids, counts):
+    """
+    Save a count cube to a compressed ``.npz`` file.
+
+    Parameters:
+    -----------
+    path : str
+        Destination path
+    geoids : sequence of str
+        County GEOIDs, one per row of ``counts``
+    counts : numpy.ndarray
+        Count matrix with columns ordered as NLCD_CODES; stored as uint32
+        (uint64 for rolled-up counts beyond its range), or float64 when the
+        counts are coverage-weighted
+    """
+    counts = np.asarray(counts)
+    if np.issubdtype(counts.dtype, np.floating):
+        dtype = np.float64
+    elif counts.size and counts.max() > np.iinfo(np.uint32).max:
+        dtype = np.uint64
+    else:
+        dtype = np.uint32
+    np.savez_compressed(
+        path,
+        geoids=np.asarray(geoids, dtype=str),
+        codes=np.asarray(NLCD_CODES, dtype=np.uint8),
+        counts=counts.astype(dtype)
+    )
+
+def load_count_cube(path):
+    """
+    Load a count cube written by ``write_count_cube``.
+
+    Returns:
+    --------
+    tuple : (geoids, codes, counts) arrays
+    """
+    with np.load(path) as cube:
+        return cube['geoids'], cube['codes'], cube['counts']
+
+def write_transition_cube(path, geoids, transitions, from_year, to_year):
+    """
+    Save per-county transition matrices to a compressed ``.npz`` file.
+
+    Parameters:
+    -----------
+    path : str
+        Destination path
+    geoids : sequence of str
+        County GEOIDs, one per matrix
+    transitions : numpy.ndarray
+        Counts of shape (n_counties, n_codes, n_codes), from-code on axis 1
+        and to-code on axis 2, both ordered as NLCD_CODES
+    from_year, to_year : int
+        Years of the two rasters
+    """
+    np.savez_compressed(
+        path,
+        geoids=np.asarray(geoids, dtype=str),
+        codes=np.asarray(NLCD_CODES, dtype=np.uint8),
+        transitions=np.asarray(transitions, dtype=np.uint32),
+        years=np.asarray([from_year, to_year], dtype=np.int16)
+    )
+
+def load_transition_cube(path):
+    """
+    Load transition matrices written by ``write_transition_cube``.
+
+    Returns:
+    --------
+    tuple : (geoids, codes, transitions, (from_year, to_year))
+    """
+    with np.load(path) as cube:
+        from_year, to_year = (int(year) for year in cube['years'])
+        return cube['geoids'], cube['codes'], cube['transitions'], (from_year, to_year)
+
+def collapse_transitions(codes, transitions, reclassification_map):
+    """
+    Collapse code-level transition matrices to reclassified classes.
+
+    Returns:
+    --------
+    tuple : (class_names, class_transitions) with class_transitions of shape
+        (n_counties, n_classes, n_classes)
+    """
+    reclassifier = Reclassifier(reclassification_map)
+    indicator = reclassifier.indicator[np.asarray(codes)]
+    class_transitions = np.einsum('ic,nij,jd->ncd', indicator,
+                                  np.asarray(transitions, dtype=np.int64), indicator)
+    return reclassifier.class_names, class_transitions
+
+def cube_to_proportions(geoids, codes, counts, reclassification_map, nodata_class='nodata',
+                        id_column='county_fips', statuses=None):
+    """
+    Derive the per-county proportions table from a count cube.
+
+    Proportions exclude ``nodata_class`` from the denominator, and counties
+    with no valid pixels get all-zero proportions, exactly as the raster
+    pipeline does.
+
+    Parameters:
+    -----------
+    geoids, codes, counts : numpy.ndarray
+        Count cube as returned by ``load_count_cube``
+    reclassification_map : dict
+        Mapping from NLCD value to class name
+    nodata_class : str
+        Class name excluded from the proportions
+    id_column : str
+        Name of the zone ID column (e.g. 'state_fips' for rolled-up cubes)
+    statuses : sequence of str, optional
+        Processing status of each zone ('ok', 'no_data', 'failed' or
+        'missing'), added as a ``status`` column; None entries are filled
+        from the valid pixel count ('ok' or 'no_data')
+
+    Returns:
+    --------
+    pandas.DataFrame : ID column, one ``<class>_proportion`` column per class,
+        the valid (non-nodata) pixel count and area of each zone, and its
+        status when ``statuses`` is given
+    """
+    reclassifier = Reclassifier(reclassification_map, nodata_class)
+    # Lookup-table rows for the cube's columns collapse codes into classes
+    counts = np.asarray(counts)
+    if not np.issubdtype(counts.dtype, np.floating):
+        counts = counts.astype(np.int64)
+    class_counts = counts @ reclassifier.indicator[np.asarray(codes)]
+    proportions = reclassifier.proportions(class_counts)
+
+    df = pd.DataFrame(proportions,
+                      columns=[f'{name}_proportion' for name in reclassifier.valid_class_names])
+    df.insert(0, id_column, np.asarray(geoids, dtype=str))
+    df['valid_pixel_count'] = class_counts[:, reclassifier.valid].sum(axis=1)
+    df['area_km2'] = df['valid_pixel_count'] * PIXEL_AREA_KM2
+    if statuses is not None:
+        counted = np.where(df['valid_pixel_count'] > 0, 'ok', 'no_data')
+        df['status'] = [status or default for status, default in zip(statuses, counted)]
+    return df
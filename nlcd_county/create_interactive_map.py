@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Create interactive HTML map of county land cover proportions using Folium.
+
+These maps embed every county as GeoJSON; for a page that loads only the
+tiles in view, export vector tiles and serve them with vector_tiles.py. The
+HTML pages are saved in the reports directory of the config file (config.py)
+unless --output-dir is given.
+
+Usage:
+    python -m nlcd_county.create_interactive_map [--counties PATH] [--output-dir DIR]
+"""
+
+import argparse
+import os
+import pandas as pd
+import folium
+from folium import plugins
+import json
+import numpy as np
+from .config import PATHS
+from .geometry_cache import read_counties
+from .landcover_dataset import read_landcover
+import warnings
+warnings.filterwarnings('ignore')
+
+# File paths (see config.py)
+COUNTY_SHAPEFILE_PATH = PATHS['counties']
+REPORTS_DIR = PATHS['reports']
+
+land_cover_cols = ['forest_proportion', 'agriculture_proportion', 'developed_proportion', 
+                   'wetland_proportion', 'other_proportion']
+
+def load_map_counties(shapefile_path=COUNTY_SHAPEFILE_PATH):
+    """Continental counties in WGS84 joined to their land cover and dominant type."""
+    print("Loading data...")
+    # Load the county polygons, pre-simplified for web performance along shared
+    # edges so neighbouring counties stay gap-free (see geometry_cache.py)
+    counties = read_counties(shapefile_path, level='medium')
+
+    # Load the land cover proportions (Parquet dataset if present, else the CSV)
+    landcover_df = read_landcover(columns=['forest_proportion', 'agriculture_proportion',
+                                           'developed_proportion', 'wetland_proportion',
+                                           'other_proportion'])
+
+    # Convert FIPS to string and ensure proper formatting
+    counties['GEOID'] = counties['GEOID'].astype(str).str.zfill(5)
+
+    # Merge the data
+    print("Merging shapefile with land cover data...")
+    counties_with_data = counties.merge(landcover_df, left_on='GEOID', right_on='county_fips', how='left')
+
+    # Filter to continental US for better visualization
+    continental_states = counties_with_data[~counties_with_data['STATEFP'].isin(['02', '15', '72', '78', '60', '66', '69'])]
+
+    # Convert to WGS84 for web mapping
+    continental_states = continental_states.to_crs('EPSG:4326')
+
+    # Calculate dominant land cover type
+    continental_states['dominant_type'] = continental_states[land_cover_cols].idxmax(axis=1)
+    continental_states['dominant_type'] = continental_states['dominant_type'].str.replace('_proportion', '').str.capitalize()
+
+    # Handle missing data
+    continental_states.loc[continental_states[land_cover_cols].sum(axis=1) == 0, 'dominant_type'] = 'No Data'
+
+    return continental_states
+
+def dominant_cover_map(continental_states):
+    """Map of each county's dominant land cover with a per-county breakdown tooltip."""
+    # Create the base map
+    print("Creating interactive map...")
+    m = folium.Map(location=[39.5, -98.35], zoom_start=5, tiles='OpenStreetMap')
+
+    # Define color schemes for dominant land cover
+    color_map = {
+        'Forest': '#2E7D32',
+        'Agriculture': '#F57C00',
+        'Developed': '#616161',
+        'Wetland': '#1976D2',
+        'Other': '#E65100',
+        'No Data': '#E0E0E0'
+    }
+
+    # Create style function for the choropleth
+    def style_function(feature):
+        dominant = feature['properties'].get('dominant_type', 'No Data')
+        return {
+            'fillColor': color_map.get(dominant, '#E0E0E0'),
+            'color': 'black',
+            'weight': 0.1,
+            'fillOpacity': 0.7
+        }
+
+    # Create highlight function
+    def highlight_function(feature):
+        return {
+            'weight': 2,
+            'color': 'black',
+            'fillOpacity': 0.9
+        }
+
+    # Prepare tooltip text
+    continental_states['tooltip_text'] = continental_states.apply(
+        lambda x: f"""
+        <b>{x['NAME']}, {x['STATEFP']}</b><br>
+        <b>Dominant: {x['dominant_type']}</b><br>
+        <hr>
+        Forest: {x['forest_proportion']*100:.1f}%<br>
+        Agriculture: {x['agriculture_proportion']*100:.1f}%<br>
+        Developed: {x['developed_proportion']*100:.1f}%<br>
+        Wetland: {x['wetland_proportion']*100:.1f}%<br>
+        Other: {x['other_proportion']*100:.1f}%
+        """ if pd.notna(x['forest_proportion']) else f"<b>{x['NAME']}, {x['STATEFP']}</b><br>No Data Available",
+        axis=1
+    )
+
+    # Convert to GeoJSON with properties
+    geojson_data = json.loads(continental_states[['geometry', 'dominant_type', 'NAME', 'STATEFP', 
+                                                  'forest_proportion', 'agriculture_proportion',
+                                                  'developed_proportion', 'wetland_proportion',
+                                                  'other_proportion', 'tooltip_text']].to_json())
+
+    # Add the choropleth layer
+    folium.GeoJson(
+        geojson_data,
+        style_function=style_function,
+        highlight_function=highlight_function,
+        tooltip=folium.GeoJsonTooltip(
+            fields=['tooltip_text'],
+            labels=False,
+            sticky=True,
+            style="background-color: white; border: 2px solid black; border-radius: 3px; box-shadow: 3px;",
+            max_width=300
+        ),
+        name='County Land Cover'
+    ).add_to(m)
+
+    # Add a custom legend
+    legend_html = '''
+    <div style="position: fixed; 
+                bottom: 50px; right: 50px; width: 200px; height: auto; 
+                background-color: white; z-index:9999; font-size:14px;
+                border:2px solid grey; border-radius: 5px; padding: 10px">
+    <h4 style="margin-top: 0;">Dominant Land Cover</h4>
+    <p style="margin: 0;"><span style="background-color: #2E7D32; width: 20px; height: 10px; display: inline-block; margin-right: 5px;"></span>Forest</p>
+    <p style="margin: 0;"><span style="background-color: #F57C00; width: 20px; height: 10px; display: inline-block; margin-right: 5px;"></span>Agriculture</p>
+    <p style="margin: 0;"><span style="background-color: #616161; width: 20px; height: 10px; display: inline-block; margin-right: 5px;"></span>Developed</p>
+    <p style="margin: 0;"><span style="background-color: #1976D2; width: 20px; height: 10px; display: inline-block; margin-right: 5px;"></span>Wetland</p>
+    <p style="margin: 0;"><span style="background-color: #E65100; width: 20px; height: 10px; display: inline-block; margin-right: 5px;"></span>Other</p>
+    <p style="margin: 0;"><span style="background-color: #E0E0E0; width: 20px; height: 10px; display: inline-block; margin-right: 5px;"></span>No Data</p>
+    </div>
+    '''
+    m.get_root().html.add_child(folium.Element(legend_html))
+
+    # Add layer control
+    folium.LayerControl().add_to(m)
+
+    # Add fullscreen button
+    plugins.Fullscreen().add_to(m)
+
+    return m
+
+def forest_map(continental_states):
+    """
+    Continuous forest-proportion choropleth as one GeoJSON layer.
+
+    All counties share a single FeatureCollection whose fill comes from the
+    choropleth's data-driven style and whose tooltip is one template filled
+    from each feature's properties.
+    """
+    m2 = folium.Map(location=[39.5, -98.35], zoom_start=5, tiles='CartoDB positron')
+
+    # Only the properties the style and tooltip read are embedded
+    features = continental_states[['geometry', 'GEOID', 'NAME', 'STATEFP', 'forest_proportion']].copy()
+    features['forest_label'] = (features['forest_proportion'] * 100).map('{:.1f}%'.format)
+    features.loc[features['forest_proportion'].isna(), 'forest_label'] = 'No Data'
+
+    # Create choropleth for forest proportion
+    choropleth = folium.Choropleth(
+        geo_data=features.to_json(),
+        name='Forest Coverage',
+        data=features,
+        columns=['GEOID', 'forest_proportion'],
+        key_on='feature.properties.GEOID',
+        fill_color='Greens',
+        fill_opacity=0.7,
+        line_opacity=0.2,
+        legend_name='Forest Coverage (%)',
+        nan_fill_color='lightgray'
+    ).add_to(m2)
+
+    # Add tooltips
+    choropleth.geojson.add_child(folium.GeoJsonTooltip(
+        fields=['NAME', 'STATEFP', 'forest_label'],
+        aliases=['County', 'State', 'Forest'],
+        sticky=True
+    ))
+
+    return m2
+
+def print_map_statistics(continental_states):
+    """Print county counts by dominant land cover."""
+    # Create summary statistics for the interactive map
+    print("\nGenerating map statistics...")
+    stats = {
+        'Total Counties': len(continental_states),
+        'Counties with Data': len(continental_states[continental_states[land_cover_cols].sum(axis=1) > 0]),
+        'Dominant Forest': len(continental_states[continental_states['dominant_type'] == 'Forest']),
+        'Dominant Agriculture': len(continental_states[continental_states['dominant_type'] == 'Agriculture']),
+        'Dominant Developed': len(continental_states[continental_states['dominant_type'] == 'Developed']),
+        'Dominant Wetland': len(continental_states[continental_states['dominant_type'] == 'Wetland']),
+        'Dominant Other': len(continental_states[continental_states['dominant_type'] == 'Other'])
+    }
+
+    print("\nMap Statistics (Continental US):")
+    for key, value in stats.items():
+        print(f"  {key}: {value:,}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--counties', default=COUNTY_SHAPEFILE_PATH, help="County shapefile path")
+    parser.add_argument('--output-dir', default=REPORTS_DIR,
+                        help="Directory for the HTML maps (default: %(default)s)")
+    args = parser.parse_args()
+    os.makedirs(args.output_dir, exist_ok=True)
+    dominant_path = os.path.join(args.output_dir, 'county_landcover_interactive.html')
+    forest_path = os.path.join(args.output_dir, 'forest_coverage_interactive.html')
+
+    continental_states = load_map_counties(args.counties)
+
+    m = dominant_cover_map(continental_states)
+
+    # Save the map
+    print("Saving interactive map...")
+    m.save(dominant_path)
+    print(f"Interactive map saved as: {dominant_path}")
+
+    # Create a second map showing forest proportion as a continuous choropleth
+    print("\nCreating forest proportion choropleth map...")
+    m2 = forest_map(continental_states)
+    m2.save(forest_path)
+    print(f"Forest coverage map saved as: {forest_path}")
+
+    print_map_statistics(continental_states)
+
+    print("\nInteractive maps created successfully!")
+    print(f"Open '{dominant_path}' in a web browser to explore the data.")
+    print(f"Open '{forest_path}' for forest-specific visualization.")
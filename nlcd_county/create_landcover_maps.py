@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Create map visualizations of county land cover proportions using the shapefile and analysis results.
+
+With --render raster the counties are rasterized once into an ID image and
+every panel is a colour lookup on it, drawn in parallel worker processes
+(see raster_choropleth.py); the default vector mode plots the polygons. The
+ID image is read from the precomputed zone raster's overviews when its
+manifest hash matches the shapefile and NLCD grid (build it with
+``nlcd-county run precompute``), and rasterized from the polygons otherwise.
+
+The figures are saved in the reports directory of the config file
+(config.py) unless --output-dir is given.
+
+Usage:
+    python -m nlcd_county.create_landcover_maps [--render vector|raster] [--workers N] [--width PX]
+        [--zones PATH] [--raster PATH] [--output-dir DIR]
+"""
+
+import argparse
+import os
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib.gridspec import GridSpec
+import matplotlib.patches as mpatches
+from matplotlib.colors import ListedColormap, BoundaryNorm
+import numpy as np
+from .config import PATHS
+from .geometry_cache import read_counties
+from .landcover_dataset import read_landcover
+from .raster_choropleth import (CountyImage, category_colors, compose_figure, proportion_colors,
+                               render_panels)
+from .zone_raster import current_zone_hash, is_current
+import warnings
+warnings.filterwarnings('ignore')
+
+# File paths (see config.py)
+COUNTY_SHAPEFILE_PATH = PATHS['counties']
+NLCD_RASTER_PATH = PATHS['nlcd_raster']
+ZONE_RASTER_PATH = PATHS['zone_raster']
+REPORTS_DIR = PATHS['reports']
+
+# Figures written to the output directory
+NATIONAL_MAPS_NAME = 'county_landcover_maps.png'
+REGIONAL_MAPS_NAME = 'regional_landcover_maps.png'
+
+# Define color schemes for each land cover type
+color_schemes = {
+    'forest_proportion': 'Greens',
+    'agriculture_proportion': 'YlOrBr',
+    'developed_proportion': 'Greys',
+    'wetland_proportion': 'Blues',
+    'other_proportion': 'Oranges'
+}
+
+titles = {
+    'forest_proportion': 'Forest Coverage',
+    'agriculture_proportion': 'Agricultural Coverage',
+    'developed_proportion': 'Developed Coverage',
+    'wetland_proportion': 'Wetland Coverage',
+    'other_proportion': 'Other Land Coverage (Water, Barren, Grassland, Shrub)'
+}
+
+land_cover_cols = ['forest_proportion', 'agriculture_proportion', 'developed_proportion',
+                   'wetland_proportion', 'other_proportion']
+
+# Create categorical color map
+categories = ['forest', 'agriculture', 'developed', 'wetland', 'other', 'no_data']
+colors_dominant = ['#2E7D32', '#F57C00', '#616161', '#1976D2', '#E65100', '#E0E0E0']
+cmap_dominant = ListedColormap(colors_dominant)
+legend_labels = ['Forest', 'Agriculture', 'Developed', 'Wetland', 'Other', 'No Data']
+
+# Define regions of interest
+regions = {
+    'Northeast Corridor': {'states': ['09', '25', '44', '36', '34', '10', '24', '11', '51', '42'],
+                          'title': 'Northeast Corridor - Development Pressure'},
+    'Corn Belt': {'states': ['19', '17', '18', '39', '27', '55'],
+                  'title': 'Midwest Corn Belt - Agricultural Dominance'},
+    'Southeast Forest': {'states': ['37', '45', '13', '01', '47', '21', '54', '51'],
+                        'title': 'Appalachian/Southeast - Forest Coverage'},
+    'Western Arid': {'states': ['04', '35', '32', '49', '08', '56'],
+                    'title': 'Western States - Arid Lands and Development'}
+}
+
+def load_map_counties(shapefile_path=COUNTY_SHAPEFILE_PATH):
+    """Continental counties joined to their land cover, with the dominant type coded."""
+    print("Loading data...")
+    # Load the county polygons (cached GeoParquet, simplified along shared edges)
+    counties = read_counties(shapefile_path, level='medium', columns=['GEOID', 'STATEFP'])
+
+    # Load the land cover proportions (Parquet dataset if present, else the CSV)
+    landcover_df = read_landcover(columns=land_cover_cols)
+
+    # Convert FIPS to string and ensure proper formatting
+    counties['GEOID'] = counties['GEOID'].astype(str).str.zfill(5)
+
+    # Merge the data
+    print("Merging shapefile with land cover data...")
+    counties_with_data = counties.merge(landcover_df, left_on='GEOID', right_on='county_fips', how='left')
+
+    # Filter to continental US for better visualization (exclude Alaska, Hawaii, territories)
+    # Alaska (02), Hawaii (15), Puerto Rico (72), Virgin Islands (78), other territories
+    continental_states = counties_with_data[~counties_with_data['STATEFP'].isin(['02', '15', '72', '78', '60', '66', '69'])].copy()
+
+    # Find dominant type
+    continental_states['dominant_type'] = continental_states[land_cover_cols].idxmax(axis=1)
+    continental_states['dominant_type'] = continental_states['dominant_type'].str.replace('_proportion', '')
+
+    # Handle missing data
+    continental_states.loc[continental_states[land_cover_cols].sum(axis=1) == 0, 'dominant_type'] = 'no_data'
+
+    # Map categories to numbers
+    continental_states['dominant_code'] = continental_states['dominant_type'].map({
+        'forest': 0, 'agriculture': 1, 'developed': 2, 'wetland': 3, 'other': 4, 'no_data': 5
+    })
+    return continental_states
+
+def plot_vector_maps(continental_states, output_dir=REPORTS_DIR):
+    """National and regional maps drawn from the county polygons, saved in ``output_dir``."""
+    national_path = os.path.join(output_dir, NATIONAL_MAPS_NAME)
+    regional_path = os.path.join(output_dir, REGIONAL_MAPS_NAME)
+    # Create figure with subplots for each land cover type
+    print("Creating land cover proportion maps...")
+    fig = plt.figure(figsize=(24, 20))
+    gs = GridSpec(3, 2, figure=fig, hspace=0.15, wspace=0.05)
+
+    # Create individual maps for each land cover type
+    for idx, (col, title) in enumerate(titles.items()):
+        row = idx // 2
+        column = idx % 2
+        ax = fig.add_subplot(gs[row, column])
+
+        # Plot the map
+        continental_states.plot(column=col,
+                               ax=ax,
+                               legend=True,
+                               cmap=color_schemes[col],
+                               edgecolor='none',
+                               linewidth=0,
+                               missing_kwds={'color': 'lightgray'},
+                               legend_kwds={'label': 'Proportion',
+                                          'orientation': 'horizontal',
+                                          'shrink': 0.8,
+                                          'pad': 0.02,
+                                          'fraction': 0.05})
+
+        ax.set_title(title, fontsize=14, fontweight='bold', pad=10)
+        ax.axis('off')
+
+        # Add state boundaries for reference
+        state_boundaries = continental_states.dissolve(by='STATEFP')
+        state_boundaries.boundary.plot(ax=ax, edgecolor='black', linewidth=0.5, alpha=0.3)
+
+    # Create dominant land cover map
+    print("Creating dominant land cover type map...")
+    ax_dominant = fig.add_subplot(gs[2, :])
+
+    # Plot dominant land cover
+    continental_states.plot(column='dominant_code',
+                            ax=ax_dominant,
+                            cmap=cmap_dominant,
+                            edgecolor='none',
+                            linewidth=0,
+                            vmin=0,
+                            vmax=5)
+
+    # Add state boundaries
+    state_boundaries = continental_states.dissolve(by='STATEFP')
+    state_boundaries.boundary.plot(ax=ax_dominant, edgecolor='black', linewidth=0.5, alpha=0.3)
+
+    ax_dominant.set_title('Dominant Land Cover Type by County', fontsize=16, fontweight='bold', pad=10)
+    ax_dominant.axis('off')
+
+    # Create custom legend
+    legend_elements = [mpatches.Patch(color=color, label=label)
+                       for label, color in zip(legend_labels, colors_dominant)]
+    ax_dominant.legend(handles=legend_elements, loc='lower left', frameon=True,
+                      fancybox=True, shadow=True, ncol=6, fontsize=10)
+
+    # Main title
+    fig.suptitle('US County Land Cover Proportions - NLCD 2024 Analysis',
+                 fontsize=18, fontweight='bold', y=0.98)
+
+    # Save the figure
+    plt.tight_layout()
+    plt.savefig(national_path, dpi=150, bbox_inches='tight', facecolor='white')
+    print(f"Map saved as: {national_path}")
+
+    # Create additional focused regional maps
+    print("\nCreating regional detail maps...")
+    fig2, axes = plt.subplots(2, 2, figsize=(20, 16))
+
+    for idx, (region_name, region_info) in enumerate(regions.items()):
+        ax = axes[idx // 2, idx % 2]
+
+        # Filter to region
+        regional_data = continental_states[continental_states['STATEFP'].isin(region_info['states'])]
+
+        # Plot dominant land cover
+        regional_data.plot(column='dominant_code',
+                          ax=ax,
+                          cmap=cmap_dominant,
+                          edgecolor='gray',
+                          linewidth=0.1,
+                          vmin=0,
+                          vmax=5)
+
+        # Add state boundaries
+        regional_states = regional_data.dissolve(by='STATEFP')
+        regional_states.boundary.plot(ax=ax, edgecolor='black', linewidth=1, alpha=0.5)
+
+        ax.set_title(region_info['title'], fontsize=12, fontweight='bold')
+        ax.axis('off')
+
+        # Add mini legend
+        if idx == 0:
+            ax.legend(handles=legend_elements, loc='upper right', frameon=True,
+                     fancybox=True, shadow=True, fontsize=8)
+
+    fig2.suptitle('Regional Land Cover Patterns - Detailed Views', fontsize=16, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(regional_path, dpi=150, bbox_inches='tight', facecolor='white')
+    print(f"Regional maps saved as: {regional_path}")
+
+def current_zone_raster(zone_path, shapefile_path, raster_path):
+    """``zone_path`` when its manifest hash matches the shapefile and NLCD grid, else None."""
+    if (os.path.exists(zone_path) and os.path.exists(raster_path)
+            and is_current(zone_path, current_zone_hash(zone_path, shapefile_path, raster_path))):
+        return zone_path
+    print(f"Zone raster {zone_path} is missing or stale; rasterizing the counties instead")
+    return None
+
+def plot_raster_maps(continental_states, workers, width, zone_path=None, output_dir=REPORTS_DIR):
+    """
+    The same national and regional maps as colour lookups on a county-ID image.
+
+    Parameters:
+    -----------
+    continental_states : geopandas.GeoDataFrame
+        Counties from ``load_map_counties``
+    workers : int
+        Processes rendering panels in parallel
+    width : int
+        County-ID image width in pixels
+    zone_path : str, optional
+        Current zone raster whose overviews supply the ID image
+    output_dir : str
+        Directory the figures are saved in
+    """
+    if zone_path is not None:
+        print(f"Reading a {width}-pixel-wide ID image from zone raster {zone_path}...")
+    else:
+        print(f"Rasterizing {len(continental_states)} counties to a {width}-pixel-wide ID image...")
+    county_image = CountyImage(continental_states.geometry.values,
+                               continental_states['STATEFP'].values, width,
+                               zone_path=zone_path, geoids=continental_states['GEOID'].values)
+    dominant = category_colors(continental_states['dominant_code'].values, colors_dominant)
+    legend = list(zip(legend_labels, colors_dominant))
+
+    panels, slots = [], []
+    for idx, (col, title) in enumerate(titles.items()):
+        colors, norm = proportion_colors(continental_states[col].values, color_schemes[col])
+        panels.append({'colors': colors, 'title': title, 'size': (12, 6.5),
+                       'state_edges': ('black', 0.3), 'colorbar': (color_schemes[col], norm)})
+        slots.append((idx // 2, idx % 2))
+    panels.append({'colors': dominant, 'title': 'Dominant Land Cover Type by County',
+                   'title_size': 16, 'size': (24, 6.5), 'state_edges': ('black', 0.3),
+                   'legend': legend, 'legend_ncol': 6})
+    # The dominant map gets its own row rather than sharing the last one with 'Other'
+    slots.append((3, slice(None)))
+
+    for idx, region_info in enumerate(regions.values()):
+        # Counties outside the region are drawn as background
+        in_region = continental_states['STATEFP'].isin(region_info['states']).values
+        colors = dominant.copy()
+        colors[1:][~in_region] = 0
+        panels.append({'colors': colors, 'title': region_info['title'], 'title_size': 12,
+                       'size': (10, 8), 'crop': True, 'county_edges': ('gray', 0.3),
+                       'state_edges': ('black', 0.5),
+                       'legend': legend if idx == 0 else None, 'legend_loc': 'upper right',
+                       'legend_size': 8})
+
+    print(f"Rendering {len(panels)} panels with {workers} worker(s)...")
+    images = render_panels(county_image, panels, workers)
+
+    national_path = os.path.join(output_dir, NATIONAL_MAPS_NAME)
+    regional_path = os.path.join(output_dir, REGIONAL_MAPS_NAME)
+    compose_figure(images[:6], slots, (4, 2), (24, 26.5),
+                   'US County Land Cover Proportions - NLCD 2024 Analysis', national_path)
+    print(f"Map saved as: {national_path}")
+    compose_figure(images[6:], [(0, 0), (0, 1), (1, 0), (1, 1)], (2, 2), (20, 16),
+                   'Regional Land Cover Patterns - Detailed Views', regional_path,
+                   suptitle_size=16)
+    print(f"Regional maps saved as: {regional_path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--counties', default=COUNTY_SHAPEFILE_PATH, help="County shapefile path")
+    parser.add_argument('--render', choices=['vector', 'raster'], default='vector',
+                        help="Plot county polygons, or colour a rasterized county-ID image "
+                             "(default: vector)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Panel rendering processes for --render raster "
+                             "(default: one per CPU)")
+    parser.add_argument('--width', type=int, default=3600,
+                        help="County-ID image width in pixels for --render raster "
+                             "(default: %(default)s)")
+    parser.add_argument('--zones', default=ZONE_RASTER_PATH,
+                        help="Precomputed zone raster for --render raster, used when current "
+                             "(default: %(default)s)")
+    parser.add_argument('--raster', default=NLCD_RASTER_PATH,
+                        help="NLCD raster the zone raster must match (default: %(default)s)")
+    parser.add_argument('--output-dir', default=REPORTS_DIR,
+                        help="Directory for the map images (default: %(default)s)")
+    args = parser.parse_args()
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    continental_states = load_map_counties(args.counties)
+    if args.render == 'raster':
+        zone_path = current_zone_raster(args.zones, args.counties, args.raster)
+        plot_raster_maps(continental_states, args.workers, args.width, zone_path,
+                         args.output_dir)
+    else:
+        plot_vector_maps(continental_states, args.output_dir)
+
+    print("\nMap creation complete!")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Rebuild county land cover proportions from a saved pixel-count cube.
+
+No raster I/O is involved: the cube written by process_county_landcover.py
+already holds every county's pixel count for each native NLCD code, so any
+reclassification map can be applied in milliseconds. Each county keeps the
+status of the CSV the cube was written with ('failed' and 'missing' counties
+have empty counts); without that CSV it is 'ok' or 'no_data' by pixel count.
+
+Usage:
+    python -m nlcd_county.derive_proportions [--cube COUNTS.npz] [--scheme NAME | --mapping MAP.json]
+                                 [--output OUT.csv] [--source SOURCE.csv]
+
+--scheme selects a built-in mapping ('default' five classes or 'anderson2' for
+the full Anderson Level II legend). MAP.json maps NLCD codes to class names,
+e.g. {"41": "forest", "250": "nodata"}.
+
+Dependencies: numpy, pandas
+"""
+
+import argparse
+import json
+import os
+import pandas as pd
+from .config import PATHS
+from .count_cube import cube_to_proportions, load_count_cube
+from .nlcd_classes import NLCD_RECLASSIFICATION, RECLASSIFICATION_SCHEMES
+
+# File paths (see config.py)
+OUTPUT_CSV_PATH = PATHS['output_csv']
+COUNT_CUBE_PATH = os.path.splitext(OUTPUT_CSV_PATH)[0] + '_counts.npz'
+
+def load_reclassification(path):
+    """Load a code -> class mapping from JSON (keys are NLCD codes)."""
+    with open(path) as f:
+        return {int(code): class_name for code, class_name in json.load(f).items()}
+
+def source_csv_path(cube_path):
+    """Proportions CSV a count cube was written next to (see process_county_landcover.py)."""
+    if cube_path.endswith('_counts.npz'):
+        return cube_path[:-len('_counts.npz')] + '.csv'
+    return os.path.splitext(cube_path)[0] + '.csv'
+
+def read_statuses(source_path):
+    """County FIPS -> status from a proportions CSV; empty when it has none."""
+    if not os.path.exists(source_path):
+        return {}
+    df = pd.read_csv(source_path, dtype={'county_fips': str})
+    if 'status' not in df.columns:
+        return {}
+    return dict(zip(df['county_fips'].str.zfill(5), df['status']))
+
+def derive_proportions(cube_path=COUNT_CUBE_PATH, output_path=OUTPUT_CSV_PATH,
+                       reclassification_map=NLCD_RECLASSIFICATION, source_path=None):
+    """
+    Write a proportions CSV for the given reclassification map.
+    
+    Parameters:
+    -----------
+    cube_path : str
+        Count cube written by process_county_landcover.py
+    output_path : str
+        Destination CSV path
+    reclassification_map : dict
+        Mapping from NLCD value to class name; the 'nodata' class is excluded
+        from the proportions
+    source_path : str, optional
+        Proportions CSV whose status column is carried over (default: the
+        CSV next to the cube)
+    """
+    geoids, codes, counts = load_count_cube(cube_path)
+    # Read before writing: the output may replace the source CSV
+    statuses = read_statuses(source_path or source_csv_path(cube_path))
+    df = cube_to_proportions(geoids, codes, counts, reclassification_map,
+                             statuses=[statuses.get(str(county_fips)) for county_fips in geoids])
+    df.to_csv(output_path, index=False)
+    n_classes = sum(column.endswith('_proportion') for column in df.columns)
+    print(f"Derived {n_classes} class proportions for {len(df)} counties")
+    for status, count in df['status'].value_counts().items():
+        if status != 'ok':
+            print(f"Counties with status '{status}': {count}")
+    print(f"Results saved to: {output_path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cube', default=COUNT_CUBE_PATH, help="Pixel count cube (.npz)")
+    parser.add_argument('--scheme', choices=sorted(RECLASSIFICATION_SCHEMES), default='default',
+                        help="Built-in reclassification scheme (default: default)")
+    parser.add_argument('--mapping', default=None,
+                        help="JSON reclassification map (overrides --scheme)")
+    parser.add_argument('--output', default=OUTPUT_CSV_PATH, help="Output CSV path")
+    parser.add_argument('--source', default=None,
+                        help="CSV whose county statuses are carried over (default: the "
+                             "CSV next to the cube)")
+    args = parser.parse_args()
+    
+    if args.mapping:
+        mapping = load_reclassification(args.mapping)
+    else:
+        mapping = RECLASSIFICATION_SCHEMES[args.scheme]
+    derive_proportions(args.cube, args.output, mapping, args.source)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Multi-resolution cache of the county polygons as GeoParquet.
+
+Reading the TIGER county shapefile takes seconds and the web map simplified
+every polygon again on each run. This module keeps one GeoParquet file per
+level of detail next to the shapefile (``<stem>_geometry_cache/``), built on
+first use and rebuilt when the shapefile changes (a hash of its files is kept
+in ``manifest.json``, together with their path, size and mtime so the files
+are only re-hashed when those change). Simplified levels use shapely's coverage simplification,
+which simplifies each shared county boundary once, so neighbours keep
+identical edges and no slivers or gaps open between them. The 'full' level is
+the unmodified shapefile geometry.
+
+Several processes may fill a cold cache at once (e.g. local shards): level
+files are named after the shapefile hash and, like the manifest, written to
+a temporary file and renamed into place, so a reader never sees a partial
+file and a rebuild never removes the files of the current shapefile.
+
+Usage:
+    python -m nlcd_county.geometry_cache [--counties PATH] [--levels full,medium,coarse]
+                             [--cache-dir DIR]
+
+Dependencies: geopandas, shapely>=2.1, pyarrow
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from .config import PATHS
+from .zone_raster import shapefile_digests, shapefile_stats
+
+# File paths (see config.py)
+COUNTY_SHAPEFILE_PATH = PATHS['counties']
+
+# Simplification tolerance of each level, in shapefile CRS units (degrees for
+# TIGER/NAD83); None keeps the source geometry
+GEOMETRY_LEVELS = {
+    'full': None,
+    'fine': 0.002,
+    'medium': 0.01,
+    'coarse': 0.05
+}
+
+# Bumped whenever the cache layout or simplification changes, forcing a rebuild
+GEOMETRY_CACHE_VERSION = 2
+
+def default_cache_dir(shapefile_path):
+    """Cache directory stored next to the shapefile."""
+    return os.path.splitext(shapefile_path)[0] + '_geometry_cache'
+
+def sources_key(sources):
+    """Short hash of the shapefile digests, naming the level files built from them."""
+    return hashlib.sha256(json.dumps(sources, sort_keys=True).encode()).hexdigest()[:16]
+
+def level_path(cache_dir, level, key):
+    """GeoParquet file of one level of detail built from the shapefile ``key``."""
+    return os.path.join(cache_dir, f'counties_{level}_{key}.parquet')
+
+def replace_atomically(path, write):
+    """Call ``write(temporary_path)``, then rename the result onto ``path``."""
+    temporary = f'{path}.{os.getpid()}.tmp'
+    try:
+        write(temporary)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+def read_cache_manifest(cache_dir):
+    """Manifest of a cache directory, or None when it has not been built."""
+    try:
+        with open(os.path.join(cache_dir, 'manifest.json')) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def write_cache_manifest(cache_dir, sources, stats):
+    """Record the shapefile (digests and file stats) a cache directory serves."""
+    manifest = {'version': GEOMETRY_CACHE_VERSION, 'sources': sources, 'stats': stats,
+                'levels': GEOMETRY_LEVELS}
+
+    def write(path):
+        with open(path, 'w') as f:
+            json.dump(manifest, f)
+
+    replace_atomically(os.path.join(cache_dir, 'manifest.json'), write)
+
+def reset_cache(cache_dir, sources, stats):
+    """
+    Point a stale cache directory at a new shapefile.
+
+    Level files of other shapefiles are removed; those of ``sources`` are
+    kept, as another process may just have written or be reading them
+    (a process still reading a removed file keeps its open handle).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    current = {os.path.basename(level_path(cache_dir, level, sources_key(sources)))
+               for level in GEOMETRY_LEVELS}
+    for name in os.listdir(cache_dir):
+        if (name.startswith('counties_') and name.endswith('.parquet')
+                and name not in current):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except FileNotFoundError:
+                pass  # Removed by a concurrent reset
+    write_cache_manifest(cache_dir, sources, stats)
+
+def ensure_current(shapefile_path, cache_dir):
+    """
+    Reset the cache if the shapefile changed since it was built.
+
+    The shapefile is identified by the stats of its files; only when those
+    differ from the manifest are the files hashed, and a cache whose hashes
+    still match (e.g. after a copy or touch) is kept with the new stats.
+
+    Returns:
+    --------
+    str : Key of the current shapefile (see ``level_path``)
+    """
+    stats = shapefile_stats(shapefile_path)
+    manifest = read_cache_manifest(cache_dir)
+    if manifest is None or manifest.get('version') != GEOMETRY_CACHE_VERSION:
+        sources = shapefile_digests(shapefile_path)
+        reset_cache(cache_dir, sources, stats)
+    elif manifest.get('stats') != stats:
+        sources = shapefile_digests(shapefile_path)
+        if manifest.get('sources') == sources:
+            write_cache_manifest(cache_dir, sources, stats)
+        else:
+            reset_cache(cache_dir, sources, stats)
+    else:
+        sources = manifest['sources']
+    return sources_key(sources)
+
+def simplify_coverage(geometries, tolerance):
+    """
+    Simplify polygons that tile the plane without breaking shared edges.
+
+    Parameters:
+    -----------
+    geometries : array-like of shapely geometries
+        Non-overlapping polygons sharing boundaries (a polygonal coverage)
+    tolerance : float
+        Roughly the square root of the area of the largest triangle removed,
+        in CRS units
+
+    Returns:
+    --------
+    numpy.ndarray : Simplified geometries in input order
+    """
+    return shapely.coverage_simplify(np.asarray(geometries), tolerance)
+
+def build_level(shapefile_path, cache_dir, level, key):
+    """Write one level's GeoParquet file, simplifying from the full level."""
+    tolerance = GEOMETRY_LEVELS[level]
+    if tolerance is None:
+        counties = gpd.read_file(shapefile_path)
+    else:
+        counties = read_counties(shapefile_path, 'full', cache_dir=cache_dir)
+        counties['geometry'] = simplify_coverage(counties.geometry.values, tolerance)
+    replace_atomically(level_path(cache_dir, level, key),
+                       lambda path: counties.to_parquet(path, index=False))
+
+def read_counties(shapefile_path=COUNTY_SHAPEFILE_PATH, level='full', columns=None,
+                  cache_dir=None):
+    """
+    County polygons at a level of detail, building the cache when needed.
+
+    Parameters:
+    -----------
+    shapefile_path : str
+        County shapefile the cache is built from
+    level : str
+        Key of GEOMETRY_LEVELS
+    columns : sequence of str, optional
+        Attribute columns to load (default: all); geometry is always loaded
+    cache_dir : str, optional
+        Cache directory (default: next to the shapefile)
+
+    Returns:
+    --------
+    geopandas.GeoDataFrame : Counties in shapefile order and CRS
+    """
+    if level not in GEOMETRY_LEVELS:
+        raise ValueError(f"Unknown geometry level '{level}'; choose from "
+                         f"{', '.join(GEOMETRY_LEVELS)}")
+    if cache_dir is None:
+        cache_dir = default_cache_dir(shapefile_path)
+
+    key = ensure_current(shapefile_path, cache_dir)
+    path = level_path(cache_dir, level, key)
+    if not os.path.exists(path):
+        print(f"Caching '{level}' county geometries in {cache_dir}...")
+        build_level(shapefile_path, cache_dir, level, key)
+
+    if columns is not None:
+        columns = [*columns, 'geometry']
+    return gpd.read_parquet(path, columns=columns)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--counties', default=COUNTY_SHAPEFILE_PATH, help="County shapefile path")
+    parser.add_argument('--levels', default=','.join(GEOMETRY_LEVELS),
+                        help="Comma-separated levels to build (default: all)")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Cache directory (default: next to the shapefile)")
+    args = parser.parse_args()
+
+    for level in args.levels.split(','):
+        start = time.perf_counter()
+        counties = read_counties(args.counties, level, cache_dir=args.cache_dir)
+        vertices = shapely.get_num_coordinates(counties.geometry.values).sum()
+        print(f"  {level:7}: {len(counties)} counties, {vertices:,} vertices "
+              f"({time.perf_counter() - start:.2f}s)")
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Columnar (Parquet) copy of the county land cover results.
+
+The proportions CSV stores GEOIDs as integers that every reader has to pad
+back to five digits, and it is parsed in full even when a script needs two
+columns. The Parquet dataset written alongside it keeps the GEOID as a
+dictionary-encoded string, proportions as float32 and valid pixel counts as
+uint32, hive-partitioned by year and state (``year=2024/state_fips=01/``).
+Each run replaces only the year partitions it writes, so the dataset
+accumulates years; every partition carries a status column. Readers load just
+the columns and years they ask for. Without an explicit source,
+``read_landcover`` reads whichever of the dataset and the CSV was written
+last, so a CSV rebuilt by derive_proportions.py is not shadowed by an older
+dataset.
+
+Dependencies: pyarrow, pandas, numpy
+"""
+
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from .config import PATHS
+
+# Dataset directory written next to the proportions CSV
+DATASET_NAME = 'county_landcover.parquet'
+
+# Sources a reader chooses from when it names none, the newest winning (see config.py)
+DEFAULT_SOURCES = (os.path.join(os.path.dirname(PATHS['output_csv']), DATASET_NAME),
+                   PATHS['output_csv'])
+
+PARTITION_COLUMNS = ['year', 'state_fips']
+PARTITIONING = ds.partitioning(pa.schema([('year', pa.int16()), ('state_fips', pa.string())]),
+                               flavor='hive')
+
+def default_dataset_path(output_path):
+    """Parquet dataset stored next to the output CSV."""
+    return os.path.join(os.path.dirname(os.path.abspath(output_path)), DATASET_NAME)
+
+def raster_year(raster_path):
+    """NLCD year in a raster file name (e.g. Annual_NLCD_LndCov_2024_...), or None."""
+    match = re.search(r'(?<!\d)(19[89]\d|20\d\d)(?!\d)', os.path.basename(raster_path))
+    return int(match.group(1)) if match else None
+
+def landcover_table(results_df, year=None):
+    """
+    Arrow table of results rows with the dataset's column types.
+
+    Parameters:
+    -----------
+    results_df : pandas.DataFrame
+        county_fips, ``<class>_proportion`` columns and optionally
+        valid_pixel_count / area_km2 / status, plus a year column unless
+        ``year`` is given
+    year : int, optional
+        NLCD year of every row
+
+    Returns:
+    --------
+    pyarrow.Table
+    """
+    geoids = results_df['county_fips'].astype(str).str.zfill(5)
+    years = np.full(len(results_df), year) if year is not None else results_df['year']
+    columns = {
+        'county_fips': pa.array(geoids).dictionary_encode(),
+        'state_fips': pa.array(geoids.str[:2]),
+        'year': pa.array(np.asarray(years), type=pa.int16())
+    }
+    for column in results_df.columns:
+        if column.endswith('_proportion') or column == 'area_km2':
+            columns[column] = pa.array(results_df[column].to_numpy(), type=pa.float32())
+    if 'valid_pixel_count' in results_df:
+        # Exact-engine counts are fractional; whole pixels are enough here
+        valid_pixels = np.rint(results_df['valid_pixel_count'].to_numpy(dtype=np.float64))
+        columns['valid_pixel_count'] = pa.array(valid_pixels.astype(np.uint32))
+    if 'status' in results_df:
+        status = results_df['status'].astype(str)
+    elif 'valid_pixel_count' in results_df:
+        # Keep the schema the same across partitions
+        status = pd.Series(np.where(results_df['valid_pixel_count'] > 0, 'ok', 'no_data'))
+    else:
+        status = None
+    if status is not None:
+        columns['status'] = pa.array(status).dictionary_encode()
+    return pa.table(columns)
+
+def write_landcover_dataset(results_df, dataset_path, year=None):
+    """
+    Write results into the dataset, replacing the partitions they cover.
+
+    Parameters:
+    -----------
+    results_df : pandas.DataFrame
+        Results rows (see ``landcover_table``)
+    dataset_path : str
+        Dataset directory
+    year : int, optional
+        NLCD year of every row, when ``results_df`` has no year column
+    """
+    pq.write_to_dataset(landcover_table(results_df, year), dataset_path,
+                        partitioning=PARTITION_COLUMNS, partitioning_flavor='hive',
+                        existing_data_behavior='delete_matching')
+
+def dataset_years(dataset_path):
+    """Sorted years present in a dataset."""
+    dataset = ds.dataset(dataset_path, format='parquet', partitioning=PARTITIONING)
+    return sorted({ds.get_partition_keys(fragment.partition_expression)['year']
+                   for fragment in dataset.get_fragments()})
+
+def modified_time(path):
+    """Latest modification time of a file, or of any file in a dataset directory."""
+    if not os.path.isdir(path):
+        return os.path.getmtime(path)
+    return max((os.path.getmtime(os.path.join(root, name))
+                for root, _, names in os.walk(path) for name in names),
+               default=os.path.getmtime(path))
+
+def default_source():
+    """The most recently written of DEFAULT_SOURCES (the CSV when none exists)."""
+    existing = [path for path in DEFAULT_SOURCES if os.path.exists(path)]
+    if not existing:
+        return DEFAULT_SOURCES[-1]
+    return max(existing, key=modified_time)
+
+def read_landcover(source=None, columns=None, year=None, states=None):
+    """
+    Load county land cover results, reading only the requested columns.
+
+    Parameters:
+    -----------
+    source : str, optional
+        Parquet dataset directory or proportions CSV (default: the most
+        recently written of DEFAULT_SOURCES)
+    columns : sequence of str, optional
+        Columns to load (default: all); names the source lacks are skipped
+    year : int, optional
+        Year to load from a dataset (default: the latest)
+    states : sequence of str, optional
+        State FIPS codes to load (default: all)
+
+    Returns:
+    --------
+    pandas.DataFrame : One row per county with a zero-padded string
+        county_fips and state_fips, plus the requested columns
+    """
+    if source is None:
+        source = default_source()
+    if columns is not None:
+        columns = list(dict.fromkeys(['county_fips', 'state_fips', *columns]))
+
+    if os.path.isdir(source):
+        dataset = ds.dataset(source, format='parquet', partitioning=PARTITIONING)
+        if year is None:
+            year = dataset_years(source)[-1]
+        row_filter = ds.field('year') == year
+        if states is not None:
+            row_filter &= ds.field('state_fips').isin(list(states))
+        if columns is not None:
+            columns = [column for column in columns if column in dataset.schema.names]
+        return dataset.to_table(columns=columns, filter=row_filter).to_pandas()
+
+    wanted = None if columns is None else set(columns)
+    df = pd.read_csv(source, dtype={'county_fips': str},
+                     usecols=lambda column: wanted is None or column in wanted)
+    df['county_fips'] = df['county_fips'].str.zfill(5)
+    df['state_fips'] = df['county_fips'].str[:2]
+    if states is not None:
+        df = df[df['state_fips'].isin(list(states))].reset_index(drop=True)
+    return df
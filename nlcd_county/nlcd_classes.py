@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+NLCD land cover class codes and the default five-class reclassification.
+"""
+
+# Native NLCD land cover codes plus the 250 fill value, in legend order
+NLCD_CODES = (11, 12, 21, 22, 23, 24, 31, 41, 42, 43, 52, 71, 81, 82, 90, 95, 250)
+
+# Area of one 30 m x 30 m NLCD pixel
+PIXEL_AREA_KM2 = 0.0009
+
+# NLCD land cover reclassification mapping
+NLCD_RECLASSIFICATION = {
+    # Forest
+    41: 'forest',    # Deciduous Forest
+    42: 'forest',    # Evergreen Forest
+    43: 'forest',    # Mixed Forest
+    
+    # Agriculture
+    81: 'agriculture',    # Pasture/Hay
+    82: 'agriculture',    # Cultivated Crops
+    
+    # Developed
+    21: 'developed',    # Developed, Open Space
+    22: 'developed',    # Developed, Low Intensity
+    23: 'developed',    # Developed, Medium Intensity
+    24: 'developed',    # Developed, High Intensity
+    
+    # Wetland
+    90: 'wetland',    # Woody Wetlands
+    95: 'wetland',    # Emergent Herbaceous Wetlands
+    
+    # Other
+    11: 'other',     # Open Water
+    12: 'other',     # Perennial Ice/Snow
+    31: 'other',     # Barren Land
+    52: 'other',     # Shrub/Scrub
+    71: 'other',     # Grassland/Herbaceous
+    
+    # NoData (exclude from calculations)
+    250: 'nodata'
+}
+
+# Full Anderson Level II legend: every native NLCD code is its own class
+ANDERSON_LEVEL_II = {
+    11: 'open_water',
+    12: 'perennial_ice_snow',
+    21: 'developed_open_space',
+    22: 'developed_low_intensity',
+    23: 'developed_medium_intensity',
+    24: 'developed_high_intensity',
+    31: 'barren_land',
+    41: 'deciduous_forest',
+    42: 'evergreen_forest',
+    43: 'mixed_forest',
+    52: 'shrub_scrub',
+    71: 'grassland_herbaceous',
+    81: 'pasture_hay',
+    82: 'cultivated_crops',
+    90: 'woody_wetlands',
+    95: 'emergent_herbaceous_wetlands',
+    250: 'nodata'
+}
+
+# Named reclassification schemes selectable from the command line
+RECLASSIFICATION_SCHEMES = {
+    'default': NLCD_RECLASSIFICATION,
+    'anderson2': ANDERSON_LEVEL_II
+}
@@ -0,0 +1,1084 @@
+#!/usr/bin/env python3
+"""
+Process NLCD 2024 raster data to calculate land cover proportions by county.
+
+This script performs the following operations:
+1. Load NLCD raster and county shapefile
+2. Reproject county boundaries to match raster CRS
+3. For each county, extract raster values and calculate land cover proportions
+   (per-county zonal_stats, the single-pass rasterized-zone engine with
+   --engine raster, exact fractional pixel coverage with --engine exact, or
+   the bounded-memory streaming engine with --engine chunked)
+4. Export results to CSV file, plus a county x NLCD code pixel-count cube
+   and a Parquet dataset partitioned by year and state (landcover_dataset.py)
+
+The zonal engine can spread counties across worker processes with --workers N.
+Finished counties are checkpointed to SQLite; --resume skips them on a rerun.
+With --years, all Annual NLCD years are counted against one shared zone mask
+and written as a long (county, year, class) table. --transitions FROM TO stores
+per-county NLCD code transition matrices between two years. --tile-cache keeps
+decoded raster tiles on local disk so repeated runs skip decompression, and
+--schedule hilbert visits counties in spatial order with shared read windows.
+--shard i/N runs one of N independent shards (by state or raster strip) and
+writes a partial count file; the merge command sums partials into the usual
+outputs (see run_local_shards.py for a local multi-process run). The
+precompute command writes a county-ID GeoTIFF on the NLCD grid that --zones
+runs reuse until the shapefile or grid changes. --previous-counties OLD.shp
+diffs a new TIGER vintage against the previous one by geometry hash and
+recomputes only added and modified counties, carrying the rest over from the
+previous count cube (boundary_diff.py). --trace PATH records wall time, CPU
+time, bytes read and pixels per stage and per county to a Chrome trace
+(.json) or JSON lines file and prints the slowest stages and counties
+(run_trace.py). Counties whose engine fails are quarantined in the checkpoint
+with their error and geometry statistics and get status 'failed' in the
+output; --retry-failed reprocesses only them with fallback strategies
+(quarantine.py).
+
+Dependencies: geopandas, rasterio, rasterstats, pandas, numpy, pyarrow, tqdm
+"""
+
+import argparse
+import os
+from functools import partial
+import rasterio
+import pandas as pd
+import numpy as np
+from . import run_trace
+from .boundary_diff import carry_over_counts, diff_shapefiles, print_diff
+from .checkpoint import CheckpointStore
+from .chunked_engine import DEFAULT_MEMORY_BUDGET, iter_chunked_pixel_counts
+from .config import PATHS
+from .geometry_cache import read_counties
+from .count_cube import (build_count_cube, collapse_transitions, write_count_cube,
+                        write_transition_cube)
+from .landcover_dataset import default_dataset_path, raster_year, write_landcover_dataset
+from .nlcd_classes import NLCD_CODES, NLCD_RECLASSIFICATION, PIXEL_AREA_KM2
+from .quarantine import (default_quarantine_path, geometry_stats, iter_retry_pixel_counts,
+                        write_quarantine)
+from .reclassify import Reclassifier
+from .sharding import (SHARD_MODES, default_partial_path, merge_partial_counts, parse_shard,
+                      state_shard_mask, tile_shard_rows, write_partial_counts)
+from .tile_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, TileCacheSettings
+from .raster_engine import (count_zone_classes_multi, count_zone_transitions,
+                           iter_zone_pixel_counts, write_zone_raster)
+from .zone_raster import (current_zone_hash, grid_signature, is_current, read_manifest,
+                          shapefile_stats, write_manifest)
+from .zonal_engine import iter_county_pixel_counts
+import warnings
+warnings.filterwarnings('ignore')
+
+# File paths (see config.py)
+NLCD_RASTER_PATH = PATHS['nlcd_raster']
+COUNTY_SHAPEFILE_PATH = PATHS['counties']
+OUTPUT_CSV_PATH = PATHS['output_csv']
+
+# Multi-year mode: Annual NLCD rasters (1985-2024) share one grid
+NLCD_RASTER_TEMPLATE = PATHS['nlcd_raster_template']
+OUTPUT_TIMESERIES_CSV_PATH = PATHS['timeseries_csv']
+OUTPUT_TRANSITIONS_PATH = PATHS['transitions']
+
+# Precomputed county-ID raster on the NLCD grid (manifest stored alongside)
+ZONE_RASTER_PATH = PATHS['zone_raster']
+
+# Lookup-table reclassifier for the five output classes
+RECLASSIFIER = Reclassifier(NLCD_RECLASSIFICATION)
+
+def reclassify_array(array, reclassification_map):
+    """
+    Reclassify a numpy array based on a mapping dictionary.
+    
+    Parameters:
+    -----------
+    array : numpy.ndarray
+        Input array with original NLCD values
+    reclassification_map : dict
+        Mapping from original values to new class names
+    
+    Returns:
+    --------
+    dict : Dictionary with class names as keys and pixel counts as values
+    """
+    reclassifier = Reclassifier(reclassification_map)
+    return reclassifier.as_dict(reclassifier.count_array(array))  # Excludes masked/nodata pixels
+
+def calculate_proportions(class_counts):
+    """
+    Calculate proportions for each land cover class, excluding NoData pixels.
+    
+    Parameters:
+    -----------
+    class_counts : dict
+        Dictionary with class names as keys and pixel counts as values
+    
+    Returns:
+    --------
+    dict : Dictionary with class names as keys and proportions as values
+    """
+    # Calculate total pixels excluding NoData
+    total_valid_pixels = sum(count for class_name, count in class_counts.items() 
+                           if class_name != 'nodata')
+    
+    if total_valid_pixels == 0:
+        # Handle case where all pixels are NoData
+        return {
+            'forest_proportion': 0.0,
+            'agriculture_proportion': 0.0,
+            'developed_proportion': 0.0,
+            'wetland_proportion': 0.0,
+            'other_proportion': 0.0
+        }
+    
+    proportions = {
+        'forest_proportion': class_counts['forest'] / total_valid_pixels,
+        'agriculture_proportion': class_counts['agriculture'] / total_valid_pixels,
+        'developed_proportion': class_counts['developed'] / total_valid_pixels,
+        'wetland_proportion': class_counts['wetland'] / total_valid_pixels,
+        'other_proportion': class_counts['other'] / total_valid_pixels
+    }
+    
+    return proportions
+
+def empty_result(county_fips, status='no_data'):
+    """
+    Output row for a county without counts: 'no_data' when no raster data
+    intersects it, 'failed' when it is quarantined and 'missing' when it was
+    never processed.
+    """
+    return {
+        'county_fips': county_fips,
+        'forest_proportion': 0.0,
+        'agriculture_proportion': 0.0,
+        'developed_proportion': 0.0,
+        'wetland_proportion': 0.0,
+        'other_proportion': 0.0,
+        'valid_pixel_count': 0,
+        'area_km2': 0.0,
+        'status': status
+    }
+
+def summarize_pixel_counts(county_fips, pixel_counts):
+    """
+    Build the output row for one county from its raw NLCD pixel counts.
+    
+    Parameters:
+    -----------
+    county_fips : str
+        County GEOID
+    pixel_counts : dict
+        Mapping from NLCD value to pixel count (zonal_stats categorical output)
+    
+    Returns:
+    --------
+    dict : Output row with county_fips, the five land cover proportions,
+        the county's valid (non-nodata) pixel count and area, which let
+        aggregates weight counties by size, and its status ('ok', or
+        'no_data' without valid pixels)
+    """
+    if not pixel_counts:
+        # Handle case where no raster data intersects with county
+        print(f"Warning: No raster data found for county {county_fips}")
+        return empty_result(county_fips)
+    
+    # Convert to class counts using the reclassification lookup table
+    class_counts = RECLASSIFIER.as_dict(RECLASSIFIER.counts_from_dict(pixel_counts))
+    
+    # Calculate proportions
+    proportions = calculate_proportions(class_counts)
+    valid_pixels = sum(count for class_name, count in class_counts.items()
+                       if class_name != 'nodata')
+    
+    return {
+        'county_fips': county_fips,
+        **proportions,
+        'valid_pixel_count': valid_pixels,
+        'area_km2': valid_pixels * PIXEL_AREA_KM2,
+        'status': 'ok' if valid_pixels > 0 else 'no_data'
+    }
+
+# Engines yield (county_fips, pixel_counts, error) for each county task
+ENGINES = {
+    # One windowed zonal_stats call per county (zonal_engine.py)
+    'zonal': iter_county_pixel_counts,
+    # Per-county windows weighted by exact fractional pixel coverage (opt-in)
+    'exact': partial(iter_county_pixel_counts, exact=True),
+    # Rasterize all counties into zone IDs and stream the raster once (raster_engine.py)
+    'raster': iter_zone_pixel_counts,
+    # Raster engine streamed under a peak-memory budget (chunked_engine.py)
+    'chunked': iter_chunked_pixel_counts
+}
+
+# Engines that can read zone blocks from a precomputed zone raster
+ZONE_ENGINES = ('raster', 'chunked')
+
+def default_checkpoint_path(output_path):
+    """Checkpoint database stored next to the output CSV."""
+    return os.path.splitext(output_path)[0] + '.checkpoint.sqlite'
+
+def default_count_cube_path(output_path):
+    """Raw pixel-count cube stored next to the output CSV."""
+    return os.path.splitext(output_path)[0] + '_counts.npz'
+
+def collect_results(counties_reprojected, raster_path, engine, workers, store, tile_cache=None,
+                    schedule='shapefile', memory_budget=DEFAULT_MEMORY_BUDGET, rows=None,
+                    zone_path=None, retry_failed=False):
+    """
+    Run an engine over every county not yet in the checkpoint store.
+    
+    Parameters:
+    -----------
+    counties_reprojected : geopandas.GeoDataFrame
+        Counties in the raster CRS
+    raster_path : str
+        Path to the NLCD raster
+    engine : str
+        Key into ENGINES
+    workers : int
+        Number of worker processes (zonal engine)
+    store : CheckpointStore
+        Store receiving each finished county
+    tile_cache : TileCacheSettings, optional
+        Read the raster through the decoded-tile cache
+    schedule : str
+        County visiting order for the per-county engines ('shapefile' or
+        'hilbert')
+    memory_budget : int
+        Peak-memory budget in bytes for the chunked engine
+    rows : tuple, optional
+        (start, stop) raster rows for the raster/chunked engines (tile shards)
+    zone_path : str, optional
+        Precomputed zone raster for the raster/chunked engines
+    retry_failed : bool
+        Process only the counties quarantined in the store, with the
+        fallback strategies of quarantine.py instead of the engine
+    
+    Returns:
+    --------
+    tuple : (results, completed) with the output rows in county (shapefile)
+        order and the GEOID -> pixel counts mapping of successful counties
+    """
+    completed = store.load()
+    quarantined = store.failures()
+    geometries = dict(zip(counties_reprojected['GEOID'], counties_reprojected.geometry))
+    tasks = [(county_fips, geometry) for county_fips, geometry in geometries.items()
+             if county_fips not in completed
+             and (not retry_failed or county_fips in quarantined)]
+    if completed:
+        print(f"Skipping {len(completed)} counties already checkpointed, "
+              f"{len(tasks)} remaining")
+    
+    engine_function = ENGINES[engine]
+    if retry_failed:
+        print(f"Retrying {len(tasks)} quarantined counties with fallbacks...")
+        engine_function = partial(iter_retry_pixel_counts, exact=engine == 'exact')
+        engine = 'fallback'
+    if engine == 'chunked':
+        engine_function = partial(engine_function, memory_budget=memory_budget)
+    if rows is not None:
+        engine_function = partial(engine_function, rows=rows)
+    if zone_path is not None:
+        engine_function = partial(engine_function, zone_path=zone_path)
+    county_stream = engine_function(tasks, raster_path, workers,
+                                    tile_cache=tile_cache, schedule=schedule)
+    with run_trace.stage('count counties', engine=engine) as span:
+        pixels = 0
+        for county_fips, pixel_counts, error in county_stream:
+            if error is not None:
+                # Failed counties are quarantined, not checkpointed, so a
+                # resumed or --retry-failed run processes them again
+                print(f"Error processing county {county_fips}: {error}")
+                store.record_failure(county_fips, error, engine,
+                                     geometry_stats(geometries.get(county_fips)))
+                quarantined[county_fips] = error
+                continue
+            store.append(county_fips, pixel_counts)
+            if county_fips in quarantined:
+                store.resolve_failure(county_fips)
+                del quarantined[county_fips]
+            completed[county_fips] = pixel_counts
+            pixels += sum(pixel_counts.values())
+        store.commit()
+        span['pixels'] = int(pixels)
+    
+    results = []
+    for county_fips in counties_reprojected['GEOID']:
+        if county_fips in completed:
+            results.append(summarize_pixel_counts(county_fips, completed[county_fips]))
+        else:
+            # Empty rows are marked so they are not mistaken for real no-data
+            status = 'failed' if county_fips in quarantined else 'missing'
+            results.append(empty_result(county_fips, status))
+    
+    return results, completed
+
+def load_counties(shapefile_path, raster_path):
+    """
+    Load the county shapefile and reproject it to the raster CRS.
+    
+    Returns:
+    --------
+    geopandas.GeoDataFrame : Counties in the raster CRS
+    """
+    print("Loading datasets...")
+    
+    # Load county shapefile (through the GeoParquet geometry cache)
+    print("Loading county shapefile...")
+    with run_trace.stage('load counties'):
+        counties = read_counties(shapefile_path)
+    print(f"Loaded {len(counties)} counties")
+    
+    # Load NLCD raster to get CRS information
+    print("Loading NLCD raster...")
+    with run_trace.stage('open raster'), rasterio.open(raster_path) as src:
+        raster_crs = src.crs
+        print(f"Raster CRS: {raster_crs}")
+        print(f"Raster shape: {src.shape}")
+        print(f"Raster bounds: {src.bounds}")
+    
+    # Reproject counties to match raster CRS
+    print(f"Reprojecting counties from {counties.crs} to {raster_crs}")
+    with run_trace.stage('reproject counties'):
+        return counties.to_crs(raster_crs)
+
+def prepare_zone_raster(shapefile_path=COUNTY_SHAPEFILE_PATH,
+                        raster_path=NLCD_RASTER_PATH,
+                        zone_path=ZONE_RASTER_PATH):
+    """
+    Make sure the precomputed zone raster matches the shapefile and grid.
+    
+    The county-ID GeoTIFF is rebuilt only when its manifest hash (covering
+    the shapefile files, raster CRS, transform and shape) differs from the
+    current inputs; otherwise nothing is reprojected or rasterized.
+    
+    Parameters:
+    -----------
+    shapefile_path : str
+        Path to the county boundary shapefile
+    raster_path : str
+        NLCD raster defining the grid
+    zone_path : str
+        Zone GeoTIFF (manifest stored next to it, see zone_raster.py)
+    
+    Returns:
+    --------
+    str : ``zone_path``
+    """
+    stats = shapefile_stats(shapefile_path)
+    digest = current_zone_hash(zone_path, shapefile_path, raster_path)
+    if is_current(zone_path, digest):
+        print(f"Using precomputed zone raster {zone_path}")
+        return zone_path
+    
+    print(f"Building zone raster {zone_path}...")
+    counties_reprojected = load_counties(shapefile_path, raster_path)
+    with run_trace.stage('rasterize zones') as span:
+        last_rows, zone_pixels = write_zone_raster(zone_path,
+                                                   counties_reprojected.geometry.values,
+                                                   raster_path)
+        span['pixels'] = int(zone_pixels.sum())
+    with rasterio.open(raster_path) as src:
+        grid = grid_signature(src)
+    write_manifest(zone_path, digest, grid, counties_reprojected['GEOID'], last_rows, zone_pixels,
+                   stats)
+    return zone_path
+
+def load_zone_counties(zone_path):
+    """
+    County table of a precomputed zone raster, in zone (shapefile) order.
+    
+    The zone engines need no geometries once the zones are rasterized, so
+    the geometry column is left empty.
+    """
+    return pd.DataFrame({'GEOID': read_manifest(zone_path)['geoids'], 'geometry': None})
+
+def load_run_counties(shapefile_path, raster_path, zone_path=None):
+    """
+    Counties for a run: from the zone raster manifest when one is used
+    (building it if stale), otherwise loaded and reprojected.
+    """
+    if zone_path is None:
+        return load_counties(shapefile_path, raster_path)
+    prepare_zone_raster(shapefile_path, raster_path, zone_path)
+    return load_zone_counties(zone_path)
+
+def write_results(results, output_path, dataset_path=None, year=None):
+    """
+    Validate per-county proportion rows, save them to CSV and print a summary.
+    
+    Parameters:
+    -----------
+    results : list
+        Output rows in county order (see summarize_pixel_counts)
+    output_path : str
+        Destination CSV path
+    dataset_path : str, optional
+        Parquet dataset the rows are also written to (default: next to the
+        output CSV)
+    year : int, optional
+        NLCD year of the rows; the Parquet dataset is only written when known
+    """
+    # Convert results to DataFrame
+    print("Creating results DataFrame...")
+    results_df = pd.DataFrame(results)
+    
+    # Verify proportions sum to approximately 1.0 (allowing for floating point precision)
+    print("Validating results...")
+    proportion_cols = ['forest_proportion', 'agriculture_proportion', 'developed_proportion', 
+                      'wetland_proportion', 'other_proportion']
+    results_df['total_proportion'] = results_df[proportion_cols].sum(axis=1)
+    
+    # Check for counties with invalid proportions
+    invalid_counties = results_df[
+        (results_df['total_proportion'] < 0.99) | (results_df['total_proportion'] > 1.01)
+    ]
+    
+    if len(invalid_counties) > 0:
+        print(f"Warning: {len(invalid_counties)} counties have proportions that don't sum to ~1.0")
+        print("Sample invalid counties:")
+        print(invalid_counties[['county_fips', 'total_proportion']].head())
+    
+    # Drop the validation column before saving
+    results_df = results_df.drop('total_proportion', axis=1)
+    
+    # Save results to CSV
+    print(f"Saving results to {output_path}...")
+    with run_trace.stage('write CSV'):
+        results_df.to_csv(output_path, index=False)
+    
+    if year is None:
+        print("Note: NLCD year unknown (pass --year); skipping the Parquet dataset")
+    else:
+        if dataset_path is None:
+            dataset_path = default_dataset_path(output_path)
+        print(f"Writing {year} to Parquet dataset {dataset_path}...")
+        with run_trace.stage('write Parquet dataset'):
+            write_landcover_dataset(results_df, dataset_path, year)
+    
+    # Print summary statistics
+    print("\nSummary Statistics:")
+    print(f"Total counties processed: {len(results_df)}")
+    print(f"Counties with data: {len(results_df[results_df[proportion_cols].sum(axis=1) > 0])}")
+    if 'status' in results_df:
+        for status, count in results_df['status'].value_counts().items():
+            if status != 'ok':
+                print(f"Counties with status '{status}': {count}")
+    
+    print("\nLand cover statistics (mean proportions):")
+    for col in proportion_cols:
+        mean_prop = results_df[col].mean()
+        print(f"  {col.replace('_proportion', '').title()}: {mean_prop:.4f}")
+    
+    print(f"\nResults saved to: {output_path}")
+
+def process_county_landcover(raster_path=NLCD_RASTER_PATH,
+                             shapefile_path=COUNTY_SHAPEFILE_PATH,
+                             output_path=OUTPUT_CSV_PATH,
+                             engine='zonal',
+                             workers=1,
+                             checkpoint_path=None,
+                             resume=False,
+                             count_cube_path=None,
+                             tile_cache=None,
+                             schedule='shapefile',
+                             memory_budget=DEFAULT_MEMORY_BUDGET,
+                             zone_path=None,
+                             dataset_path=None,
+                             year=None,
+                             previous_shapefile=None,
+                             previous_count_cube=None,
+                             retry_failed=False):
+    """
+    Main function to process NLCD data and calculate county-level land cover proportions.
+    
+    Parameters:
+    -----------
+    raster_path : str
+        Path to the NLCD land cover raster
+    shapefile_path : str
+        Path to the county boundary shapefile
+    output_path : str
+        Destination CSV path
+    engine : str
+        'zonal' for one zonal_stats call per county, 'raster' for the
+        single-pass rasterized-zone engine, 'exact' for per-county
+        fractional coverage weighting of boundary pixels, or 'chunked' for
+        the raster engine under a peak-memory budget
+    workers : int
+        Number of worker processes for the zonal/exact engines; the output is
+        byte-identical to a serial run
+    checkpoint_path : str, optional
+        SQLite store of finished counties (default: next to the output CSV)
+    resume : bool
+        Skip counties already present in the checkpoint store instead of
+        starting a fresh run
+    count_cube_path : str, optional
+        Destination of the raw county x NLCD code count cube (default: next
+        to the output CSV); see derive_proportions.py
+    tile_cache : TileCacheSettings, optional
+        Serve raster reads from a local decoded-tile cache so repeated and
+        resumed runs skip decompression (see tile_cache.py)
+    schedule : str
+        'hilbert' visits counties along a Hilbert curve of their centroids
+        and batches neighbours into shared reads (zonal/exact engines; see
+        scheduling.py); the output is identical to shapefile order
+    memory_budget : int
+        Peak-memory budget in bytes for the chunked engine, which sizes its
+        raster blocks to stay under it (see chunked_engine.py)
+    zone_path : str, optional
+        Precomputed zone raster for the raster/chunked engines, rebuilt only
+        when stale (see ``prepare_zone_raster``); skips reprojecting and
+        rasterizing the counties
+    dataset_path : str, optional
+        Parquet dataset partitioned by year and state (default: next to the
+        output CSV); see landcover_dataset.py
+    year : int, optional
+        NLCD year of the raster (default: parsed from its file name)
+    previous_shapefile : str, optional
+        Previous TIGER vintage; only counties added or modified since it are
+        processed and the unchanged ones are carried over (see
+        ``incremental_counts``)
+    previous_count_cube : str, optional
+        Count cube of the previous vintage's run on the same raster (default:
+        ``count_cube_path``, which this run then overwrites)
+    retry_failed : bool
+        Resume from the checkpoint and reprocess only the quarantined
+        counties with the fallback strategies of quarantine.py
+    """
+    if retry_failed:
+        # Fallbacks need the county geometries, and all other counties are kept
+        resume = True
+        zone_path = None
+    if count_cube_path is None:
+        count_cube_path = default_count_cube_path(output_path)
+    carried = {}
+    if previous_shapefile is not None:
+        carried = incremental_counts(previous_shapefile, shapefile_path,
+                                     previous_count_cube or count_cube_path)
+    
+    if zone_path is not None and engine not in ZONE_ENGINES:
+        print(f"Note: the '{engine}' engine does not use the zone raster")
+        zone_path = None
+    counties_reprojected = load_run_counties(shapefile_path, raster_path, zone_path)
+    
+    if checkpoint_path is None:
+        checkpoint_path = default_checkpoint_path(output_path)
+    print(f"Checkpointing finished counties to {checkpoint_path}")
+    
+    print(f"Processing counties with the '{engine}' engine...")
+    with CheckpointStore(checkpoint_path) as store:
+        if not resume:
+            store.clear()
+        # Carried-over counties are checkpointed so collect_results skips them
+        for county_fips, pixel_counts in carried.items():
+            store.append(county_fips, pixel_counts)
+        store.commit()
+        results, completed = collect_results(counties_reprojected, raster_path,
+                                             engine, workers, store, tile_cache, schedule,
+                                             memory_budget, zone_path=zone_path,
+                                             retry_failed=retry_failed)
+        failures = store.failures()
+    
+    quarantine_path = default_quarantine_path(output_path)
+    write_quarantine(quarantine_path, failures)
+    if failures:
+        print(f"Warning: {len(failures)} counties failed and are quarantined in "
+              f"{quarantine_path}; rerun with --retry-failed to reprocess only them")
+    
+    # Persist raw counts so other class groupings need no raster pass
+    print(f"Saving pixel count cube to {count_cube_path}...")
+    geoids = list(counties_reprojected['GEOID'])
+    cube_dtype = np.float64 if engine == 'exact' else np.uint32
+    with run_trace.stage('write count cube'):
+        write_count_cube(count_cube_path, geoids, build_count_cube(geoids, completed, cube_dtype))
+    
+    if year is None:
+        year = raster_year(raster_path)
+    write_results(results, output_path, dataset_path, year)
+
+def incremental_counts(previous_shapefile, shapefile_path, previous_count_cube):
+    """
+    Pixel counts carried over from the previous TIGER vintage's run.
+    
+    The two shapefiles are diffed by geometry hash (see boundary_diff.py);
+    counties whose geometry is unchanged keep their previous counts, so only
+    added and modified counties go through an engine. The previous count
+    cube must come from the same NLCD raster.
+    
+    Returns:
+    --------
+    dict : GEOID -> {NLCD value: pixel count} of the unchanged counties
+    """
+    print(f"Diffing county boundaries against {previous_shapefile}...")
+    diff = diff_shapefiles(previous_shapefile, shapefile_path)
+    print_diff(diff)
+    if not os.path.exists(previous_count_cube):
+        print(f"Note: no previous count cube at {previous_count_cube}; processing all counties")
+        return {}
+    carried = carry_over_counts(previous_count_cube, diff['unchanged'])
+    print(f"Carrying over {len(carried)} unchanged counties from {previous_count_cube}")
+    return carried
+
+def process_county_shard(shard,
+                         shard_by='state',
+                         raster_path=NLCD_RASTER_PATH,
+                         shapefile_path=COUNTY_SHAPEFILE_PATH,
+                         output_path=OUTPUT_CSV_PATH,
+                         partial_path=None,
+                         engine='zonal',
+                         workers=1,
+                         resume=False,
+                         tile_cache=None,
+                         schedule='shapefile',
+                         memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Run one shard of a county run and write its partial count file.
+    
+    Shards are independent, so they can run on separate machines; combine
+    their partial files with ``merge_county_shards`` (see sharding.py).
+    
+    Parameters:
+    -----------
+    shard : tuple
+        (index, count), 1-based
+    shard_by : str
+        'state' counts whole states (any engine); 'tile' streams one strip
+        of raster rows (raster/chunked engines only)
+    partial_path : str, optional
+        Destination of the partial count file (default: next to the output
+        CSV, named after the shard)
+    
+    The remaining parameters are as for ``process_county_landcover``.
+    """
+    index, count = shard
+    if shard_by == 'tile' and engine not in ('raster', 'chunked'):
+        raise ValueError("Tile shards need the 'raster' or 'chunked' engine, "
+                         "which count every pixel exactly once")
+    if partial_path is None:
+        partial_path = default_partial_path(output_path, index, count)
+    
+    counties_reprojected = load_counties(shapefile_path, raster_path)
+    order = list(counties_reprojected['GEOID'])
+    
+    # Counties each shard counts (part of), so the merge can tell which
+    # counties a missing shard leaves incomplete
+    rows = None
+    if shard_by == 'state':
+        coverage = np.column_stack([
+            state_shard_mask(counties_reprojected['STATEFP'], counties_reprojected.geometry.area,
+                             shard_index, count)
+            for shard_index in range(1, count + 1)])
+    else:
+        with rasterio.open(raster_path) as src:
+            strips = [tile_shard_rows(src.height, shard_index, count)
+                      for shard_index in range(1, count + 1)]
+            transform = src.transform
+        rows = strips[index - 1]
+        # Only counties whose bounding box reaches into the strip
+        bounds = counties_reprojected.geometry.bounds
+        top = np.asarray((bounds['maxy'] - transform.f) / transform.e)
+        bottom = np.asarray((bounds['miny'] - transform.f) / transform.e)
+        coverage = np.column_stack([(top < stop) & (bottom >= start) for start, stop in strips])
+    shard_counties = counties_reprojected[coverage[:, index - 1]]
+    print(f"Shard {index}/{count} ({shard_by}): {len(shard_counties)} counties"
+          + (f", raster rows {rows[0]}-{rows[1]}" if rows else ""))
+    
+    checkpoint_path = default_checkpoint_path(partial_path)
+    with CheckpointStore(checkpoint_path) as store:
+        if not resume:
+            store.clear()
+        _, completed = collect_results(shard_counties, raster_path, engine, workers, store,
+                                       tile_cache, schedule, memory_budget, rows)
+        failures = store.failures()
+    
+    quarantine_path = default_quarantine_path(partial_path)
+    write_quarantine(quarantine_path, failures)
+    if failures:
+        print(f"Warning: {len(failures)} counties failed and are quarantined in "
+              f"{quarantine_path}; the merge marks them 'failed'")
+    
+    geoids = [county_fips for county_fips in shard_counties['GEOID'] if county_fips in completed]
+    cube_dtype = np.float64 if engine == 'exact' else np.uint32
+    print(f"Saving partial counts to {partial_path}...")
+    write_partial_counts(partial_path, geoids, build_count_cube(geoids, completed, cube_dtype),
+                         order, index, count, shard_by, coverage, list(failures))
+
+def merge_county_shards(partial_paths, output_path=OUTPUT_CSV_PATH, count_cube_path=None,
+                        dataset_path=None, year=None):
+    """
+    Combine shard partial count files into the normal outputs.
+    
+    Writes the same proportions CSV and count cube as an unsharded run;
+    counties that failed in a shard get status 'failed', and counties of
+    shards absent from ``partial_paths`` get status 'missing'.
+    
+    Parameters:
+    -----------
+    partial_paths : sequence of str
+        Partial count files written by ``process_county_shard``
+    output_path : str
+        Destination CSV path
+    count_cube_path : str, optional
+        Destination of the merged count cube (default: next to the output CSV)
+    dataset_path : str, optional
+        Parquet dataset directory (default: next to the output CSV)
+    year : int, optional
+        NLCD year of the shards; the Parquet dataset is skipped when unknown
+    """
+    print(f"Merging {len(partial_paths)} partial count files...")
+    with run_trace.stage('merge partials'):
+        geoids, counts, missing, statuses = merge_partial_counts(partial_paths)
+    if missing:
+        print(f"Warning: shards {', '.join(map(str, missing))} are missing; "
+              "their counties are left empty with status 'missing'")
+    
+    if count_cube_path is None:
+        count_cube_path = default_count_cube_path(output_path)
+    print(f"Saving pixel count cube to {count_cube_path}...")
+    with run_trace.stage('write count cube'):
+        write_count_cube(count_cube_path, geoids, counts)
+    
+    results = []
+    for county_fips, row in zip(geoids, counts):
+        if county_fips in statuses:
+            results.append(empty_result(county_fips, statuses[county_fips]))
+            continue
+        pixel_counts = {int(code): count.item()
+                        for code, count in zip(NLCD_CODES, row) if count}
+        results.append(summarize_pixel_counts(county_fips, pixel_counts))
+    write_results(results, output_path, dataset_path, year)
+
+def parse_years(spec):
+    """
+    Parse a year list such as '1985-2024' or '2001,2011,2024'.
+    
+    Returns:
+    --------
+    list : Sorted unique years
+    """
+    years = set()
+    for part in spec.split(','):
+        if '-' in part:
+            start, end = (int(year) for year in part.split('-'))
+            years.update(range(start, end + 1))
+        else:
+            years.add(int(part))
+    return sorted(years)
+
+def timeseries_table(geoids, years, counts):
+    """
+    Long-format (county, year, class) table from per-year value counts.
+    
+    Parameters:
+    -----------
+    geoids : sequence of str
+        County GEOIDs
+    years : sequence of int
+        Years matching the first axis of ``counts``
+    counts : numpy.ndarray
+        Pixel counts of shape (n_years, n_counties, 256)
+    
+    Returns:
+    --------
+    pandas.DataFrame : county_fips, year, land_cover_class, pixel_count, proportion
+    """
+    all_class_counts = RECLASSIFIER.count_classes(counts)
+    class_counts = all_class_counts[..., RECLASSIFIER.valid]
+    proportions = RECLASSIFIER.proportions(all_class_counts)
+    class_names = RECLASSIFIER.valid_class_names
+    
+    # Reorder to (county, year, class) so rows group by county
+    class_counts = class_counts.transpose(1, 0, 2)
+    proportions = proportions.transpose(1, 0, 2)
+    n_counties, n_years, n_classes = class_counts.shape
+    
+    return pd.DataFrame({
+        'county_fips': np.repeat(np.asarray(geoids, dtype=str), n_years * n_classes),
+        'year': np.tile(np.repeat(np.asarray(years), n_classes), n_counties),
+        'land_cover_class': np.tile(class_names, n_counties * n_years),
+        'pixel_count': class_counts.ravel(),
+        'proportion': proportions.ravel()
+    })
+
+def yearly_results(timeseries_df):
+    """
+    Wide per-(year, county) result rows from a long timeseries table.
+    
+    Returns:
+    --------
+    pandas.DataFrame : year, county_fips, the class proportions, valid pixel
+        count, area and status, as in summarize_pixel_counts
+    """
+    keys = ['year', 'county_fips']
+    wide = timeseries_df.pivot(index=keys, columns='land_cover_class', values='proportion')
+    wide = wide[RECLASSIFIER.valid_class_names].add_suffix('_proportion')
+    wide['valid_pixel_count'] = timeseries_df.groupby(keys)['pixel_count'].sum()
+    wide['area_km2'] = wide['valid_pixel_count'] * PIXEL_AREA_KM2
+    wide['status'] = np.where(wide['valid_pixel_count'] > 0, 'ok', 'no_data')
+    wide.columns.name = None
+    return wide.reset_index()
+
+def process_county_landcover_timeseries(years,
+                                        raster_template=NLCD_RASTER_TEMPLATE,
+                                        shapefile_path=COUNTY_SHAPEFILE_PATH,
+                                        output_path=OUTPUT_TIMESERIES_CSV_PATH,
+                                        workers=None,
+                                        tile_cache=None,
+                                        zone_path=None,
+                                        dataset_path=None):
+    """
+    Multi-year mode: count every year's raster against one shared zone mask.
+    
+    The yearly Annual NLCD rasters share a grid, so counties are reprojected
+    and rasterized once per block and that zone block is reused for all
+    years, whose windows are read in parallel.
+    
+    Parameters:
+    -----------
+    years : sequence of int
+        NLCD years to process
+    raster_template : str
+        Raster path with a ``{year}`` placeholder
+    shapefile_path : str
+        Path to the county boundary shapefile
+    output_path : str
+        Destination of the long-format (county, year, class) CSV
+    workers : int, optional
+        Parallel reader threads (default: one per year)
+    tile_cache : TileCacheSettings, optional
+        Read the rasters through the decoded-tile cache
+    zone_path : str, optional
+        Precomputed zone raster read instead of rasterizing the counties
+    dataset_path : str, optional
+        Parquet dataset that receives one partition per year (default: next
+        to the output CSV)
+    """
+    raster_paths = [raster_template.format(year=year) for year in years]
+    counties_reprojected = load_run_counties(shapefile_path, raster_paths[0], zone_path)
+    
+    print(f"Processing {len(years)} years ({years[0]}-{years[-1]}) against one zone mask...")
+    with run_trace.stage('count years') as span:
+        counts = count_zone_classes_multi(raster_paths, counties_reprojected.geometry.values,
+                                          workers=workers, tile_cache=tile_cache,
+                                          zone_path=zone_path)
+        span['pixels'] = int(counts.sum())
+    
+    results_df = timeseries_table(counties_reprojected['GEOID'], years, counts)
+    print(f"Saving results to {output_path}...")
+    with run_trace.stage('write CSV'):
+        results_df.to_csv(output_path, index=False)
+    
+    if dataset_path is None:
+        dataset_path = default_dataset_path(output_path)
+    print(f"Writing {len(years)} years to Parquet dataset {dataset_path}...")
+    with run_trace.stage('write Parquet dataset'):
+        write_landcover_dataset(yearly_results(results_df), dataset_path)
+    
+    print("\nNational land cover by year (pixel-weighted proportions):")
+    national = results_df.pivot_table(index='year', columns='land_cover_class',
+                                      values='pixel_count', aggfunc='sum')
+    national = national[RECLASSIFIER.valid_class_names]
+    print(national.div(national.sum(axis=1), axis=0).round(4))
+    
+    print(f"\nResults saved to: {output_path}")
+
+def process_county_transitions(from_year, to_year,
+                               raster_template=NLCD_RASTER_TEMPLATE,
+                               shapefile_path=COUNTY_SHAPEFILE_PATH,
+                               output_path=OUTPUT_TRANSITIONS_PATH,
+                               tile_cache=None,
+                               zone_path=None):
+    """
+    Per-county land cover change between two NLCD years.
+    
+    Streams both years' rasters in aligned blocks and stores one NLCD code
+    transition matrix per county (see count_cube.load_transition_cube).
+    
+    Parameters:
+    -----------
+    from_year, to_year : int
+        Earlier and later NLCD years
+    raster_template : str
+        Raster path with a ``{year}`` placeholder
+    shapefile_path : str
+        Path to the county boundary shapefile
+    output_path : str
+        Destination ``.npz`` path
+    tile_cache : TileCacheSettings, optional
+        Read the rasters through the decoded-tile cache
+    zone_path : str, optional
+        Precomputed zone raster read instead of rasterizing the counties
+    """
+    from_path = raster_template.format(year=from_year)
+    to_path = raster_template.format(year=to_year)
+    counties_reprojected = load_run_counties(shapefile_path, from_path, zone_path)
+    
+    print(f"Computing {from_year} -> {to_year} transitions...")
+    with run_trace.stage('count transitions') as span:
+        transitions = count_zone_transitions(from_path, to_path,
+                                             counties_reprojected.geometry.values,
+                                             tile_cache=tile_cache, zone_path=zone_path)
+        span['pixels'] = int(transitions.sum())
+    
+    print(f"Saving transition matrices to {output_path}...")
+    with run_trace.stage('write transitions'):
+        write_transition_cube(output_path, list(counties_reprojected['GEOID']),
+                              transitions, from_year, to_year)
+    
+    class_names, class_transitions = collapse_transitions(NLCD_CODES, transitions,
+                                                          NLCD_RECLASSIFICATION)
+    national = class_transitions.sum(axis=0)
+    changed = national.sum() - np.trace(national)
+    print(f"\nPixels that changed class: {changed:,} of {national.sum():,}")
+    
+    print(f"\nResults saved to: {output_path}")
+
+def parse_args():
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', nargs='?', choices=['run', 'merge', 'precompute'],
+                        default='run',
+                        help="'run' (default) processes counties; 'merge' combines shard "
+                             "partial count files into the output CSV and count cube; "
+                             "'precompute' builds the county zone raster if it is stale")
+    parser.add_argument('partials', nargs='*', default=[],
+                        help="Partial count files to merge (merge only)")
+    parser.add_argument('--raster', default=None,
+                        help="NLCD raster path; with --years or --transitions, a path "
+                             "template with a {year} placeholder (default: "
+                             f"{NLCD_RASTER_PATH}, or {NLCD_RASTER_TEMPLATE})")
+    parser.add_argument('--counties', default=COUNTY_SHAPEFILE_PATH, help="County shapefile path")
+    parser.add_argument('--output', default=None,
+                        help=f"Output path (default: {OUTPUT_CSV_PATH}; with --years, "
+                             f"{OUTPUT_TIMESERIES_CSV_PATH}; with --transitions, "
+                             f"{OUTPUT_TRANSITIONS_PATH})")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='zonal',
+                        help="County processing engine (default: zonal)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes for the zonal engine, or reader threads "
+                             "for the chunked engine and --years mode (default: 1; one "
+                             "per year with --years)")
+    parser.add_argument('--checkpoint', default=None,
+                        help="Checkpoint database (default: next to the output CSV)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip counties already recorded in the checkpoint")
+    parser.add_argument('--years', type=parse_years, default=None,
+                        help="Multi-year mode over Annual NLCD years, e.g. 1985-2024 "
+                             "or 2001,2024; writes a long (county, year, class) table")
+    parser.add_argument('--transitions', type=int, nargs=2, metavar=('FROM', 'TO'),
+                        default=None,
+                        help="Per-county land cover transition matrices between two years")
+    parser.add_argument('--tile-cache', nargs='?', const=DEFAULT_CACHE_DIR, default=None,
+                        metavar='DIR',
+                        help="Serve raster reads from a local decoded-tile cache "
+                             f"(default directory: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--tile-cache-gb', type=float, default=DEFAULT_MAX_BYTES / 1024 ** 3,
+                        help="Tile cache size cap in GB; least recently used tiles are "
+                             "evicted first (default: %(default)g)")
+    parser.add_argument('--schedule', choices=['shapefile', 'hilbert'], default='shapefile',
+                        help="County visiting order for the zonal/exact engines; 'hilbert' "
+                             "batches neighbouring counties into shared reads and reports "
+                             "GDAL block-cache hit rates estimated by an LRU simulation, "
+                             "not measured (default: shapefile)")
+    parser.add_argument('--memory-budget', type=float,
+                        default=DEFAULT_MEMORY_BUDGET / 1024 ** 3, metavar='GB',
+                        help="Peak-memory budget for --engine chunked, including GDAL's "
+                             "block cache (default: %(default)g)")
+    parser.add_argument('--zones', nargs='?', const=ZONE_RASTER_PATH, default=None,
+                        metavar='PATH',
+                        help="Read county zones from a precomputed zone raster (raster/"
+                             "chunked engines, --years, --transitions), rebuilding it only "
+                             f"when stale (default path: {ZONE_RASTER_PATH})")
+    parser.add_argument('--shard', type=parse_shard, default=None, metavar='i/N',
+                        help="Run only shard i of N (1-based) and write a partial count "
+                             "file; combine the shards with the merge command")
+    parser.add_argument('--shard-by', choices=SHARD_MODES, default='state',
+                        help="Split shards by whole states, or by strips of raster rows "
+                             "(tile; raster/chunked engines) (default: state)")
+    parser.add_argument('--partial', default=None,
+                        help="Partial count file for --shard (default: next to the output CSV)")
+    parser.add_argument('--dataset', default=None,
+                        help="Parquet dataset directory partitioned by year and state "
+                             "(default: next to the output CSV)")
+    parser.add_argument('--year', type=int, default=None,
+                        help="NLCD year of --raster for the Parquet dataset (default: "
+                             "parsed from the raster file name)")
+    parser.add_argument('--previous-counties', default=None, metavar='SHAPEFILE',
+                        help="Previous TIGER vintage: recompute only counties added or "
+                             "modified since it and carry the rest over from the previous "
+                             "count cube")
+    parser.add_argument('--previous-counts', default=None, metavar='NPZ',
+                        help="Count cube of the previous vintage's run on the same raster "
+                             "(default: the count cube next to the output CSV)")
+    parser.add_argument('--trace', default=None, metavar='PATH',
+                        help="Record per-stage and per-county timings to a Chrome trace "
+                             "(.json) or JSON lines file and print the slowest counties")
+    parser.add_argument('--retry-failed', action='store_true',
+                        help="Reprocess only the counties quarantined by an earlier run, "
+                             "with fallbacks (make_valid geometry, smaller windows)")
+    args = parser.parse_args()
+    
+    # --years and --transitions read one raster per year and write their own outputs
+    if args.years and args.transitions:
+        parser.error("--years and --transitions cannot be combined")
+    if args.years or args.transitions:
+        if args.raster is not None and '{year}' not in args.raster:
+            parser.error("--years and --transitions need a --raster template with a "
+                         "{year} placeholder")
+        args.raster = args.raster or NLCD_RASTER_TEMPLATE
+        default_output = OUTPUT_TRANSITIONS_PATH if args.transitions else OUTPUT_TIMESERIES_CSV_PATH
+    else:
+        args.raster = args.raster or NLCD_RASTER_PATH
+        default_output = OUTPUT_CSV_PATH
+    args.output = args.output or default_output
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    tile_cache = None
+    if args.tile_cache:
+        tile_cache = TileCacheSettings(args.tile_cache, int(args.tile_cache_gb * 1024 ** 3))
+    
+    if args.trace:
+        run_trace.start(args.trace)
+    try:
+        with run_trace.stage('run', command=args.command):
+            if args.command == 'merge':
+                merge_county_shards(args.partials, output_path=args.output,
+                                    dataset_path=args.dataset,
+                                    year=args.year or raster_year(args.raster))
+            elif args.command == 'precompute':
+                prepare_zone_raster(args.counties, args.raster, args.zones or ZONE_RASTER_PATH)
+            elif args.transitions:
+                process_county_transitions(*args.transitions, raster_template=args.raster,
+                                           shapefile_path=args.counties,
+                                           output_path=args.output, tile_cache=tile_cache,
+                                           zone_path=args.zones)
+            elif args.years:
+                # One reader thread per year unless --workers asks for a specific count
+                workers = args.workers if args.workers > 1 else None
+                process_county_landcover_timeseries(args.years, raster_template=args.raster,
+                                                    shapefile_path=args.counties,
+                                                    output_path=args.output, workers=workers,
+                                                    tile_cache=tile_cache, zone_path=args.zones,
+                                                    dataset_path=args.dataset)
+            elif args.shard:
+                process_county_shard(args.shard, shard_by=args.shard_by, raster_path=args.raster,
+                                     shapefile_path=args.counties, output_path=args.output,
+                                     partial_path=args.partial, engine=args.engine,
+                                     workers=args.workers, resume=args.resume,
+                                     tile_cache=tile_cache, schedule=args.schedule,
+                                     memory_budget=int(args.memory_budget * 1024 ** 3))
+            else:
+                process_county_landcover(raster_path=args.raster, shapefile_path=args.counties,
+                                         output_path=args.output,
+                                         engine=args.engine, workers=args.workers,
+                                         checkpoint_path=args.checkpoint, resume=args.resume,
+                                         tile_cache=tile_cache, schedule=args.schedule,
+                                         memory_budget=int(args.memory_budget * 1024 ** 3),
+                                         zone_path=args.zones, dataset_path=args.dataset,
+                                         year=args.year,
+                                         previous_shapefile=args.previous_counties,
+                                         previous_count_cube=args.previous_counts,
+                                         retry_failed=args.retry_failed)
+    finally:
+        run_trace.finish()
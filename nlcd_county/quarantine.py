@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Failure quarantine and fallback retries for per-county processing.
+
+A county whose engine raises is not written as an all-zero row that looks
+like real no-data. It is quarantined in the checkpoint database with the
+exception and statistics of its geometry (see checkpoint.CheckpointStore)
+and its output row gets status 'failed'. ``--retry-failed`` then
+reprocesses only the quarantined counties, trying each strategy of
+FALLBACK_STRATEGIES in turn until one succeeds:
+
+- 'retry': the zonal (or exact) engine again, for transient I/O errors
+- 'make_valid': the geometry repaired with shapely.make_valid, keeping its
+  polygonal parts
+- 'tiled': the repaired geometry clipped to pixel-aligned sub-windows of
+  RETRY_TILE_SIZE pixels, each counted on its own read and summed
+
+Clipping at pixel edges keeps every pixel centre on the same side of the
+county boundary, so tiled counts equal whole-county counts.
+
+Usage:
+    python -m nlcd_county.quarantine [--checkpoint PATH]   # list quarantined counties
+
+Dependencies: rasterio, rasterstats, shapely, numpy
+"""
+
+import argparse
+import csv
+import os
+
+import numpy as np
+import rasterio
+import shapely
+from .zonal_engine import close_worker_dataset, county_pixel_counts, open_worker_dataset
+
+# Fallbacks tried in order by --retry-failed
+FALLBACK_STRATEGIES = ('retry', 'make_valid', 'tiled')
+
+# Edge length (pixels) of the sub-windows of the 'tiled' fallback
+RETRY_TILE_SIZE = 2048
+
+# Columns of the quarantine CSV written next to the output
+QUARANTINE_COLUMNS = ['county_fips', 'engine', 'error', 'attempts', 'failed_at', 'area_km2',
+                      'width_km', 'height_km', 'vertices', 'parts', 'is_valid', 'validity']
+
+def default_quarantine_path(output_path):
+    """Quarantine CSV stored next to the output CSV."""
+    return os.path.splitext(output_path)[0] + '_quarantine.csv'
+
+def geometry_stats(geometry):
+    """
+    Statistics of a county geometry for the quarantine table.
+
+    Parameters:
+    -----------
+    geometry : shapely geometry or None
+        County polygon in the raster CRS (metres); None with a zone raster
+
+    Returns:
+    --------
+    dict or None : area and bounding box size in km, vertex and part counts,
+        and validity with shapely's reason
+    """
+    if geometry is None:
+        return None
+    minx, miny, maxx, maxy = geometry.bounds
+    return {
+        'area_km2': geometry.area / 1e6,
+        'width_km': (maxx - minx) / 1e3,
+        'height_km': (maxy - miny) / 1e3,
+        'vertices': int(shapely.get_num_coordinates(geometry)),
+        'parts': int(shapely.get_num_geometries(geometry)),
+        'is_valid': bool(shapely.is_valid(geometry)),
+        'validity': shapely.is_valid_reason(geometry)
+    }
+
+def polygonal_make_valid(geometry):
+    """Repair a geometry, keeping only its polygonal parts."""
+    repaired = shapely.make_valid(geometry)
+    if repaired.geom_type in ('Polygon', 'MultiPolygon'):
+        return repaired
+    polygons = [part for part in shapely.get_parts(repaired)
+                if part.geom_type in ('Polygon', 'MultiPolygon')]
+    return shapely.union_all(polygons)
+
+def tiled_pixel_counts(task, transform, exact=False, tile_size=RETRY_TILE_SIZE):
+    """
+    Count a county one pixel-aligned sub-window at a time.
+
+    Parameters:
+    -----------
+    task : tuple
+        (county_fips, geometry) with the geometry in the raster CRS
+    transform : affine.Affine
+        Raster transform (north-up)
+    exact : bool
+        Use exact fractional coverage weighting
+    tile_size : int
+        Sub-window edge length in pixels
+
+    Returns:
+    --------
+    tuple : (county_fips, pixel_counts, error), as county_pixel_counts
+    """
+    county_fips, geometry = task
+    minx, miny, maxx, maxy = geometry.bounds
+    col_start, row_start = np.floor(~transform * (minx, maxy)).astype(int)
+    col_stop, row_stop = np.ceil(~transform * (maxx, miny)).astype(int)
+
+    totals = {}
+    for row in range(row_start, row_stop, tile_size):
+        for col in range(col_start, col_stop, tile_size):
+            west, north = transform * (col, row)
+            east, south = transform * (col + tile_size, row + tile_size)
+            part = shapely.clip_by_rect(geometry, west, south, east, north)
+            if part.is_empty or part.area == 0:
+                continue
+            _, pixel_counts, error = county_pixel_counts((county_fips, part), exact)
+            if error is not None:
+                return county_fips, {}, f"tile at row {row}, col {col}: {error}"
+            for value, count in pixel_counts.items():
+                totals[value] = totals.get(value, 0) + count
+    return county_fips, totals, None
+
+def retry_pixel_counts(task, transform, exact=False):
+    """
+    Try each fallback strategy on one county until one succeeds.
+
+    Returns:
+    --------
+    tuple : (county_fips, pixel_counts, error, strategy) with the strategy
+        that succeeded, or the last error and None
+    """
+    county_fips, geometry = task
+    errors = []
+    repaired = None
+    for strategy in FALLBACK_STRATEGIES:
+        try:
+            if strategy != 'retry' and repaired is None:
+                repaired = polygonal_make_valid(geometry)
+            if strategy == 'retry':
+                result = county_pixel_counts(task, exact)
+            elif strategy == 'make_valid':
+                result = county_pixel_counts((county_fips, repaired), exact)
+            else:
+                result = tiled_pixel_counts((county_fips, repaired), transform, exact)
+        except Exception as e:
+            result = (county_fips, {}, str(e))
+        if result[2] is None:
+            return result + (strategy,)
+        errors.append(f"{strategy}: {result[2]}")
+    return county_fips, {}, '; '.join(errors), None
+
+def iter_retry_pixel_counts(tasks, raster_path, workers=1, exact=False, tile_cache=None,
+                            schedule='shapefile'):
+    """
+    Engine adapter running the fallback strategies over quarantined counties.
+
+    Has the interface of ``zonal_engine.iter_county_pixel_counts``; the few
+    quarantined counties are retried serially, so ``workers`` and
+    ``schedule`` are ignored.
+
+    Yields:
+    -------
+    tuple : (county_fips, pixel_counts, error) in input order
+    """
+    with rasterio.open(raster_path) as src:
+        transform = src.transform
+    open_worker_dataset(raster_path, tile_cache)
+    try:
+        for task in tasks:
+            county_fips, pixel_counts, error, strategy = retry_pixel_counts(task, transform, exact)
+            if strategy is not None:
+                print(f"Recovered county {county_fips} with the '{strategy}' fallback")
+            yield county_fips, pixel_counts, error
+    finally:
+        close_worker_dataset()
+
+def write_quarantine(path, failures):
+    """
+    Save the quarantined counties to CSV, or remove a stale file when none are left.
+
+    Parameters:
+    -----------
+    path : str
+        Destination CSV path
+    failures : dict
+        From ``CheckpointStore.failures``
+    """
+    if not failures:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=QUARANTINE_COLUMNS)
+        writer.writeheader()
+        for county_fips, failure in failures.items():
+            writer.writerow({'county_fips': county_fips,
+                             **{key: failure[key]
+                                for key in ('engine', 'error', 'attempts', 'failed_at')},
+                             **(failure['geometry_stats'] or {})})
+
+if __name__ == "__main__":
+    from .checkpoint import CheckpointStore
+    from .process_county_landcover import OUTPUT_CSV_PATH, default_checkpoint_path
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--checkpoint', default=default_checkpoint_path(OUTPUT_CSV_PATH),
+                        help="Checkpoint database (default: next to the output CSV)")
+    args = parser.parse_args()
+
+    with CheckpointStore(args.checkpoint) as store:
+        failures = store.failures()
+    print(f"{len(failures)} quarantined counties in {args.checkpoint}")
+    for county_fips, failure in failures.items():
+        stats = failure['geometry_stats'] or {}
+        print(f"  {county_fips}  {failure['engine'] or '':8} attempts={failure['attempts']}  "
+              f"area={stats.get('area_km2', float('nan')):,.1f} km2  "
+              f"valid={stats.get('is_valid')}  {failure['error']}")
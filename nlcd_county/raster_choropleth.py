@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Raster-backed choropleths: rasterize the counties once, colour by lookup.
+
+Plotting a GeoDataFrame re-tessellates every county polygon for every panel.
+Here the counties are burned once into an ID image (0 = background, i + 1 =
+county i), and each panel is a colour lookup table indexed by that image and
+drawn with ``imshow``. State and county outlines are found from ID changes
+between neighbouring pixels, so no polygon is drawn at all. Panels are
+rendered to RGBA images in worker processes that receive the ID image once,
+then placed into the final figure.
+
+When a current precomputed zone raster exists (zone_raster.py), the ID
+image is read from its nearest-neighbour overviews on the NLCD grid instead
+of rasterizing the counties again.
+
+Dependencies: rasterio, matplotlib, numpy
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize, to_rgba
+from matplotlib.figure import Figure
+from matplotlib.gridspec import GridSpec
+from matplotlib.patches import Patch
+from rasterio import features
+from rasterio.transform import from_bounds
+from .zone_raster import ZoneRaster
+
+# Panel resolution, matching the saved figures
+PANEL_DPI = 150
+
+BACKGROUND = (1.0, 1.0, 1.0, 0.0)
+
+def to_rgba_bytes(colors):
+    """RGBA floats in [0, 1] as uint8, keeping panel images at 4 bytes per pixel."""
+    return np.round(np.asarray(colors) * 255).astype(np.uint8)
+
+# ID image and outline masks owned by the current (worker) process
+_image = None
+
+class CountyImage:
+    """
+    County-ID image of a set of counties, in geographic coordinates or, when
+    read from a zone raster, on the NLCD grid.
+
+    Parameters:
+    -----------
+    geometries : sequence of shapely geometries
+        County polygons (lon/lat)
+    state_codes : sequence of str
+        State FIPS of each county, for the state outlines
+    width : int
+        Image width in pixels; the height keeps pixels square on the map
+    zone_path : str, optional
+        Current zone raster to read the image from (on the NLCD grid)
+        instead of rasterizing ``geometries``
+    geoids : sequence of str, optional
+        GEOID of each county, matching them to the zone raster's zones
+    """
+
+    def __init__(self, geometries, state_codes, width, zone_path=None, geoids=None):
+        if zone_path is not None:
+            self.read_zones(zone_path, geoids, width)
+        else:
+            self.rasterize(geometries, width)
+
+        _, state_index = np.unique(np.asarray(state_codes), return_inverse=True)
+        states = np.concatenate([[-1], state_index])[self.ids]
+        self.county_edges = outline(self.ids)
+        self.state_edges = outline(states)
+
+    def rasterize(self, geometries, width):
+        """Burn the counties into an image in geographic coordinates."""
+        west, south, east, north = np.array([g.bounds for g in geometries]).T
+        west, south, east, north = west.min(), south.min(), east.max(), north.max()
+        # Degrees of longitude shrink with latitude; stretch rows to match
+        self.aspect = 1 / np.cos(np.radians((south + north) / 2))
+        height = int(round(width * (north - south) / (east - west) * self.aspect))
+        self.extent = (west, east, south, north)
+
+        self.ids = features.rasterize(
+            zip(geometries, range(1, len(geometries) + 1)),
+            out_shape=(height, width),
+            transform=from_bounds(west, south, east, north, width, height),
+            fill=0, dtype='int32')
+
+    def read_zones(self, zone_path, geoids, width):
+        """Read the image from a zone raster overview, renumbering its zones."""
+        with ZoneRaster(zone_path) as zones:
+            # Zones of counties not being drawn become background
+            position = {county_fips: i + 1 for i, county_fips in enumerate(geoids)}
+            renumber = np.zeros(len(zones.geoids) + 1, dtype=np.int32)
+            renumber[1:] = [position.get(county_fips, 0) for county_fips in zones.geoids]
+
+            height = max(1, int(round(width * zones.src.height / zones.src.width)))
+            self.ids = renumber[zones.read_overview((height, width))]
+            left, bottom, right, top = zones.src.bounds
+        # The NLCD grid is projected with square pixels
+        self.aspect = 1.0
+        self.extent = (left, right, bottom, top)
+
+def outline(labels):
+    """Pixels whose right or lower neighbour carries a different label."""
+    edges = np.zeros(labels.shape, dtype=bool)
+    edges[:, :-1] |= labels[:, :-1] != labels[:, 1:]
+    edges[:-1, :] |= labels[:-1, :] != labels[1:, :]
+    return edges
+
+def proportion_colors(values, cmap, missing_color='lightgray'):
+    """
+    Colour lookup table for a continuous county variable.
+
+    Returns:
+    --------
+    tuple : (uint8 RGBA table of shape (n_counties + 1, 4), Normalize used)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    norm = Normalize(vmin=np.nanmin(values), vmax=np.nanmax(values))
+    colors = np.empty((len(values) + 1, 4))
+    colors[0] = BACKGROUND
+    colors[1:] = colormaps[cmap](norm(values))
+    colors[1:][np.isnan(values)] = to_rgba(missing_color)
+    return to_rgba_bytes(colors), norm
+
+def category_colors(codes, palette):
+    """uint8 colour lookup table for integer county categories indexing ``palette``."""
+    colors = np.empty((len(codes) + 1, 4))
+    colors[0] = BACKGROUND
+    colors[1:] = np.array([to_rgba(color) for color in palette])[np.asarray(codes)]
+    return to_rgba_bytes(colors)
+
+def init_panel_worker(county_image):
+    """Pool initializer: keep the county image for the worker's lifetime."""
+    global _image
+    _image = county_image
+
+def shade(rgba, mask, color, alpha):
+    """Blend ``color`` into the masked pixels of a uint8 RGBA image."""
+    blended = rgba[mask, :3] * (1 - alpha) + np.asarray(to_rgba(color)[:3]) * 255 * alpha
+    rgba[mask, :3] = np.round(blended).astype(np.uint8)
+    rgba[mask, 3] = np.maximum(rgba[mask, 3], round(alpha * 255))
+
+def render_panel(panel):
+    """
+    Draw one panel to an RGBA array using the worker's county image.
+
+    Parameters:
+    -----------
+    panel : dict
+        'colors' (uint8 lookup table), 'title', 'size' (inches) and optionally
+        'title_size', 'crop' (True to zoom to the coloured counties),
+        'county_edges' / 'state_edges' ((color, alpha) outlines), 'colorbar'
+        ((cmap, Normalize)) and 'legend' (list of (label, color), placed
+        with 'legend_loc', 'legend_ncol' and 'legend_size')
+
+    Returns:
+    --------
+    numpy.ndarray : Rendered panel, shape (height, width, 4), uint8
+    """
+    image = _image
+    rgba = panel['colors'][image.ids]
+    visible = rgba[..., 3] > 0
+    if panel.get('county_edges'):
+        shade(rgba, image.county_edges & visible, *panel['county_edges'])
+    if panel.get('state_edges'):
+        shade(rgba, image.state_edges & visible, *panel['state_edges'])
+
+    west, east, south, north = image.extent
+    if panel.get('crop') and visible.any():
+        rows = np.flatnonzero(visible.any(axis=1))
+        cols = np.flatnonzero(visible.any(axis=0))
+        height, width = visible.shape
+        rgba = rgba[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+        x_step, y_step = (east - west) / width, (north - south) / height
+        west, east = west + cols[0] * x_step, west + (cols[-1] + 1) * x_step
+        north, south = north - rows[0] * y_step, north - (rows[-1] + 1) * y_step
+
+    fig = Figure(figsize=panel['size'], dpi=PANEL_DPI, facecolor='white')
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.imshow(rgba, extent=(west, east, south, north), interpolation='nearest')
+    ax.set_aspect(image.aspect)
+    ax.set_title(panel['title'], fontsize=panel.get('title_size', 14), fontweight='bold', pad=10)
+    ax.axis('off')
+    if panel.get('colorbar'):
+        cmap, norm = panel['colorbar']
+        fig.colorbar(ScalarMappable(norm=norm, cmap=cmap), ax=ax, label='Proportion',
+                     orientation='horizontal', shrink=0.8, pad=0.02, fraction=0.05)
+    if panel.get('legend'):
+        handles = [Patch(color=color, label=label) for label, color in panel['legend']]
+        ax.legend(handles=handles, loc=panel.get('legend_loc', 'lower left'), frameon=True,
+                  fancybox=True, shadow=True, ncol=panel.get('legend_ncol', 1),
+                  fontsize=panel.get('legend_size', 10))
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+def render_panels(county_image, panels, workers=1):
+    """
+    Render panels, in parallel worker processes when ``workers`` > 1.
+
+    Returns:
+    --------
+    list : RGBA arrays in panel order
+    """
+    if workers <= 1:
+        init_panel_worker(county_image)
+        return [render_panel(panel) for panel in panels]
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_panel_worker,
+                             initargs=(county_image,)) as executor:
+        return list(executor.map(render_panel, panels))
+
+def compose_figure(images, slots, shape, figsize, suptitle, output_path, suptitle_size=18):
+    """
+    Place rendered panels on a grid and save the figure.
+
+    Parameters:
+    -----------
+    images : sequence of numpy.ndarray
+        Panels from ``render_panels``
+    slots : sequence
+        GridSpec index of each panel, e.g. (0, 1) or (2, slice(None))
+    shape : tuple
+        (rows, columns) of the grid
+    figsize : tuple
+        Figure size in inches
+    suptitle : str
+        Figure title
+    output_path : str
+        Destination image path
+    """
+    fig = Figure(figsize=figsize, dpi=PANEL_DPI, facecolor='white')
+    FigureCanvasAgg(fig)
+    gs = GridSpec(*shape, figure=fig, hspace=0.02, wspace=0.02)
+    for image, slot in zip(images, slots):
+        ax = fig.add_subplot(gs[slot])
+        ax.imshow(image, interpolation='nearest')
+        ax.axis('off')
+    fig.suptitle(suptitle, fontsize=suptitle_size, fontweight='bold', y=0.98)
+    fig.savefig(output_path, dpi=PANEL_DPI, bbox_inches='tight', facecolor='white')
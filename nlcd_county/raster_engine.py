@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Single-pass rasterized-zone engine for county land cover counts.
+
+Instead of calling zonal_stats once per county (which reopens the NLCD raster
+and rasterizes one polygon at a time), every county polygon is burned into a
+zone-ID raster aligned to the NLCD grid. The NLCD raster is streamed block by
+block and a full (zone x NLCD class) count matrix is accumulated with a single
+np.bincount per block over ``zone_id * 256 + class_value``.
+
+Zone IDs are 1-based positions in the county GeoDataFrame; 0 marks pixels that
+fall outside every county. Because all counties share one zone raster, each
+pixel belongs to exactly one county (per-county zonal_stats can count a pixel
+whose center sits exactly on a shared boundary twice).
+
+The zone raster can also be written once as a GeoTIFF (``write_zone_raster``)
+and read back block by block on later runs (see zone_raster.py).
+
+Dependencies: rasterio, shapely, numpy, tqdm
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import rasterio
+import shapely
+from rasterio import features
+from rasterio.enums import Resampling
+from rasterio.windows import Window, bounds as window_bounds, transform as window_transform
+from shapely import STRtree, box
+from tqdm import tqdm
+from . import run_trace
+from .nlcd_classes import NLCD_CODES
+from .tile_cache import TILE_SIZE, open_raster
+from .zone_raster import ZoneRaster, read_manifest
+
+# Number of distinct values an 8-bit NLCD pixel can take
+NLCD_VALUE_RANGE = 256
+
+# Edge length (pixels) of the square blocks streamed from the NLCD raster;
+# a multiple of tile_cache.TILE_SIZE so cached tiles line up with blocks
+BLOCK_SIZE = 4096
+
+# Overview decimation factors of precomputed zone rasters (map-scale reads)
+ZONE_OVERVIEW_FACTORS = [4, 16, 64, 256]
+
+def iter_block_windows(height, width, block_size=BLOCK_SIZE, row_start=0):
+    """
+    Yield row-major windows tiling a raster of the given shape.
+
+    Parameters:
+    -----------
+    height, width : int
+        Raster dimensions in pixels (``height`` is the stop row)
+    block_size : int
+        Edge length of each window in pixels
+    row_start : int
+        First row to tile
+
+    Yields:
+    -------
+    rasterio.windows.Window
+    """
+    for row_off in range(row_start, height, block_size):
+        for col_off in range(0, width, block_size):
+            yield Window(col_off, row_off,
+                         min(block_size, width - col_off),
+                         min(block_size, height - row_off))
+
+def zone_dtype(n_zones):
+    """Smallest rasterio-supported integer dtype able to hold n_zones IDs."""
+    return 'uint16' if n_zones < np.iinfo(np.uint16).max else 'uint32'
+
+def rasterize_zone_block(geometries, tree, window, transform, dtype):
+    """
+    Burn the zone IDs of all geometries intersecting a window into an array.
+
+    Parameters:
+    -----------
+    geometries : numpy.ndarray
+        Array of shapely geometries in the raster CRS
+    tree : shapely.STRtree
+        Spatial index built over ``geometries``
+    window : rasterio.windows.Window
+        Raster window to rasterize
+    transform : affine.Affine
+        Transform of the full raster
+    dtype : str
+        Output dtype (see ``zone_dtype``)
+
+    Returns:
+    --------
+    numpy.ndarray or None : Zone-ID array shaped like the window, or None when
+        no geometry intersects the window
+    """
+    hits = tree.query(box(*window_bounds(window, transform)))
+    if len(hits) == 0:
+        return None
+
+    # Pixel-center rule (all_touched=False) matches the zonal_stats default
+    shapes = ((geometries[i], int(i) + 1) for i in np.sort(hits))
+    return features.rasterize(
+        shapes,
+        out_shape=(int(window.height), int(window.width)),
+        transform=window_transform(window, transform),
+        fill=0,
+        dtype=dtype
+    )
+
+def accumulate_zone_counts(counts, zones, values):
+    """
+    Add the (zone x value) histogram of one block to a running count matrix.
+
+    Parameters:
+    -----------
+    counts : numpy.ndarray
+        Count matrix of shape (n_zones + 1, 256), updated in place
+    zones : numpy.ndarray
+        Zone-ID block
+    values : numpy.ndarray
+        NLCD values block (uint8) aligned with ``zones``
+    """
+    encoded = zones.astype(np.int64).ravel() * NLCD_VALUE_RANGE + values.ravel()
+    counts += np.bincount(encoded, minlength=counts.size).reshape(counts.shape)
+
+def zone_last_rows(geometries, transform):
+    """
+    Last raster row touched by each geometry's bounding box.
+
+    Once the block stream has moved past this row, the geometry's counts are
+    final.
+    """
+    miny = shapely.bounds(geometries)[:, 1]
+    return np.floor((miny - transform.f) / transform.e).astype(np.int64)
+
+class ZoneBlocks:
+    """
+    Zone-ID blocks for raster windows.
+
+    Blocks are read from a precomputed zone raster when one is given (see
+    zone_raster.py) and rasterized from the geometries otherwise; both give
+    identical blocks.
+
+    Parameters:
+    -----------
+    geometries : sequence of shapely geometries or None
+        Zone polygons in the raster CRS (unused with ``zone_path``)
+    src : rasterio dataset
+        NLCD raster defining the grid
+    zone_path : str, optional
+        Precomputed zone GeoTIFF on the same grid
+    """
+
+    def __init__(self, geometries, src, zone_path=None):
+        self.transform = src.transform
+        self.zone_raster = None
+        if zone_path is not None:
+            self.zone_raster = ZoneRaster(zone_path)
+            self.zone_raster.check_grid(src)
+            self.count = len(self.zone_raster.geoids)
+            self.last_rows = self.zone_raster.last_rows
+        else:
+            self.geometries = np.asarray(geometries, dtype=object)
+            self.tree = STRtree(self.geometries)
+            self.dtype = zone_dtype(len(self.geometries))
+            self.count = len(self.geometries)
+            self.last_rows = zone_last_rows(self.geometries, src.transform)
+
+    def read(self, window):
+        """Zone-ID block for a window, or None outside every zone."""
+        if self.zone_raster is not None:
+            return self.zone_raster.read(window)
+        return rasterize_zone_block(self.geometries, self.tree, window, self.transform, self.dtype)
+
+    def close(self):
+        """Close the zone raster, if any."""
+        if self.zone_raster is not None:
+            self.zone_raster.close()
+
+def write_zone_raster(zone_path, geometries, raster_path, block_size=BLOCK_SIZE):
+    """
+    Burn zone IDs onto the NLCD grid as a tiled GeoTIFF.
+
+    The file is written under a temporary name and renamed when complete, so
+    an interrupted build never replaces a good zone raster.
+
+    Parameters:
+    -----------
+    zone_path : str
+        Destination GeoTIFF
+    geometries : sequence of shapely geometries
+        Zone polygons, already in the raster CRS
+    raster_path : str
+        NLCD raster defining the grid
+    block_size : int
+        Edge length of the rasterized blocks in pixels
+
+    Returns:
+    --------
+    tuple : (last_rows, zone_pixels) per zone, for the manifest
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    temporary = f'{zone_path}.{os.getpid()}.tmp.tif'
+    zone_pixels = np.zeros(len(geometries) + 1, dtype=np.int64)
+
+    with rasterio.open(raster_path) as src:
+        zone_blocks = ZoneBlocks(geometries, src)
+        profile = {
+            'driver': 'GTiff', 'height': src.height, 'width': src.width, 'count': 1,
+            'dtype': zone_blocks.dtype, 'crs': src.crs, 'transform': src.transform,
+            'nodata': 0, 'tiled': True, 'blockxsize': TILE_SIZE, 'blockysize': TILE_SIZE,
+            'compress': 'deflate', 'BIGTIFF': 'IF_SAFER'
+        }
+        with rasterio.open(temporary, 'w', **profile) as dst:
+            blocks = list(iter_block_windows(src.height, src.width, block_size))
+            for window in tqdm(blocks, desc="Rasterizing county zones"):
+                zones = zone_blocks.read(window)
+                if zones is None:
+                    continue
+                dst.write(zones, 1, window=window)
+                zone_pixels += np.bincount(zones.ravel(), minlength=len(zone_pixels))
+            dst.build_overviews(ZONE_OVERVIEW_FACTORS, Resampling.nearest)
+
+    os.replace(temporary, zone_path)
+    return zone_blocks.last_rows, zone_pixels[1:]
+
+def iter_zone_counts(raster_path, geometries, block_size=BLOCK_SIZE, tile_cache=None, rows=None,
+                     zone_path=None):
+    """
+    Stream the raster once and yield each zone's counts as soon as it is final.
+
+    Blocks are visited one row band at a time; after each band, every zone
+    whose bounding box ends above the next band is complete and is yielded.
+    This lets callers checkpoint finished counties during a long run.
+
+    Parameters:
+    -----------
+    raster_path : str
+        Path to the NLCD raster
+    geometries : sequence of shapely geometries
+        Zone polygons, already in the raster CRS
+    block_size : int
+        Edge length of the streamed blocks in pixels
+    tile_cache : TileCacheSettings, optional
+        Read through the decoded-tile cache (see tile_cache.py)
+    rows : tuple, optional
+        (start, stop) raster rows to stream; zones reaching outside them
+        get partial counts (see sharding.py)
+    zone_path : str, optional
+        Precomputed zone raster to read zone blocks from instead of
+        rasterizing ``geometries`` (which may then be None)
+
+    Yields:
+    -------
+    tuple : (zone_index, counts) where zone_index is the 0-based zone
+        position and counts is an int64 vector of length 256
+    """
+    with open_raster(raster_path, tile_cache) as src:
+        if src.dtypes[0] != 'uint8':
+            raise ValueError(f"Expected a uint8 NLCD raster, got {src.dtypes[0]}")
+
+        zone_blocks = ZoneBlocks(geometries, src, zone_path)
+        counts = np.zeros((zone_blocks.count + 1, NLCD_VALUE_RANGE), dtype=np.int64)
+        pending = np.ones(zone_blocks.count, dtype=bool)
+        row_start, row_stop = rows if rows is not None else (0, src.height)
+
+        blocks = list(iter_block_windows(row_stop, src.width, block_size, row_start))
+        progress = tqdm(total=len(blocks), desc="Processing raster blocks")
+        try:
+            for row_off in range(row_start, row_stop, block_size):
+                band = [w for w in blocks if w.row_off == row_off]
+                for window in band:
+                    with run_trace.stage('zone block') as span:
+                        zones = zone_blocks.read(window)
+                        span['pixels'] = int(window.width * window.height)
+                    if zones is not None:
+                        with run_trace.stage('raster decode') as span:
+                            values = src.read(1, window=window)
+                            span['pixels'] = values.size
+                        with run_trace.stage('zone histogram') as span:
+                            accumulate_zone_counts(counts, zones, values)
+                            span['pixels'] = values.size
+                    progress.update(1)
+
+                finished = np.flatnonzero(pending & (zone_blocks.last_rows < row_off + block_size))
+                pending[finished] = False
+                for index in finished:
+                    yield int(index), counts[index + 1]
+        finally:
+            progress.close()
+            zone_blocks.close()
+
+    # Zones lying (partly) beyond the last streamed row
+    for index in np.flatnonzero(pending):
+        yield int(index), counts[index + 1]
+
+def count_zone_classes(raster_path, geometries, block_size=BLOCK_SIZE, tile_cache=None,
+                       zone_path=None):
+    """
+    Count NLCD pixel values for every zone in a single pass over the raster.
+
+    Parameters:
+    -----------
+    raster_path : str
+        Path to the NLCD raster
+    geometries : sequence of shapely geometries
+        Zone polygons, already in the raster CRS
+    block_size : int
+        Edge length of the streamed blocks in pixels
+    tile_cache : TileCacheSettings, optional
+        Read through the decoded-tile cache
+    zone_path : str, optional
+        Precomputed zone raster used instead of rasterizing ``geometries``
+
+    Returns:
+    --------
+    numpy.ndarray : int64 matrix of shape (n_zones, 256) where entry [i, v]
+        is the number of pixels with value v inside geometry i
+    """
+    # Every zone is yielded exactly once
+    rows = dict(iter_zone_counts(raster_path, geometries, block_size, tile_cache,
+                                 zone_path=zone_path))
+    counts = np.zeros((len(rows), NLCD_VALUE_RANGE), dtype=np.int64)
+    for index, row in rows.items():
+        counts[index] = row
+    return counts
+
+def check_shared_grid(datasets):
+    """
+    Raise ValueError unless all datasets share CRS, transform and shape.
+    """
+    reference = datasets[0]
+    for src in datasets[1:]:
+        if (src.crs != reference.crs or src.transform != reference.transform
+                or src.shape != reference.shape):
+            raise ValueError(f"{src.name} is not on the same grid as {reference.name}")
+        if src.dtypes[0] != 'uint8':
+            raise ValueError(f"Expected a uint8 NLCD raster, got {src.dtypes[0]}")
+
+def count_zone_classes_multi(raster_paths, geometries, block_size=BLOCK_SIZE, workers=None,
+                             tile_cache=None, zone_path=None):
+    """
+    Count NLCD pixel values per zone for several rasters on a shared grid.
+
+    The zone block for each window is rasterized once and reused for every
+    raster (e.g. every Annual NLCD year); the rasters' windows are read and
+    counted in parallel threads, one dataset handle per raster.
+
+    Parameters:
+    -----------
+    raster_paths : sequence of str
+        Rasters sharing CRS, transform and shape
+    geometries : sequence of shapely geometries
+        Zone polygons, already in the raster CRS
+    block_size : int
+        Edge length of the streamed blocks in pixels
+    workers : int, optional
+        Reader threads (default: one per raster)
+    tile_cache : TileCacheSettings, optional
+        Read through the decoded-tile cache
+    zone_path : str, optional
+        Precomputed zone raster used instead of rasterizing ``geometries``
+
+    Returns:
+    --------
+    numpy.ndarray : int64 array of shape (n_rasters, n_zones, 256)
+    """
+    datasets = [open_raster(path, tile_cache) for path in raster_paths]
+    zone_blocks = None
+    try:
+        check_shared_grid(datasets)
+        grid = datasets[0]
+        zone_blocks = ZoneBlocks(geometries, grid, zone_path)
+        counts = np.zeros((len(raster_paths), zone_blocks.count + 1, NLCD_VALUE_RANGE),
+                          dtype=np.int64)
+
+        def count_window(i, window, zone_offsets):
+            # Each dataset handle is only ever used by one thread at a time
+            with run_trace.stage('raster decode') as span:
+                values = datasets[i].read(1, window=window).ravel()
+                span['pixels'] = values.size
+            with run_trace.stage('zone histogram') as span:
+                counts[i] += np.bincount(zone_offsets + values,
+                                         minlength=counts[i].size).reshape(counts[i].shape)
+                span['pixels'] = values.size
+
+        with ThreadPoolExecutor(max_workers=workers or len(datasets)) as executor:
+            blocks = list(iter_block_windows(grid.height, grid.width, block_size))
+            for window in tqdm(blocks, desc="Processing raster blocks"):
+                with run_trace.stage('zone block') as span:
+                    zones = zone_blocks.read(window)
+                    span['pixels'] = int(window.width * window.height)
+                if zones is None:
+                    continue
+                zone_offsets = zones.astype(np.int64).ravel() * NLCD_VALUE_RANGE
+                list(executor.map(count_window, range(len(datasets)),
+                                  [window] * len(datasets), [zone_offsets] * len(datasets)))
+    finally:
+        for src in datasets:
+            src.close()
+        if zone_blocks is not None:
+            zone_blocks.close()
+
+    # Drop the background row (pixels outside every county)
+    return counts[:, 1:]
+
+def count_zone_transitions(from_path, to_path, geometries, block_size=BLOCK_SIZE,
+                           tile_cache=None, zone_path=None):
+    """
+    Per-zone from -> to transition counts between two NLCD rasters.
+
+    Both rasters are streamed in aligned blocks. Each pixel's (from, to) code
+    pair is mapped to an index over NLCD_CODES and encoded together with its
+    zone ID, so one bincount per block fills every zone's transition matrix.
+
+    Parameters:
+    -----------
+    from_path, to_path : str
+        Earlier and later NLCD rasters on the same grid
+    geometries : sequence of shapely geometries
+        Zone polygons, already in the raster CRS
+    block_size : int
+        Edge length of the streamed blocks in pixels
+    tile_cache : TileCacheSettings, optional
+        Read through the decoded-tile cache
+    zone_path : str, optional
+        Precomputed zone raster used instead of rasterizing ``geometries``
+
+    Returns:
+    --------
+    numpy.ndarray : int64 array of shape (n_zones, n_codes, n_codes) where
+        entry [z, i, j] counts pixels in zone z that went from NLCD_CODES[i]
+        to NLCD_CODES[j]
+    """
+    n_codes = len(NLCD_CODES)
+    # Index n_codes collects 0 and any value outside the legend; dropped below
+    n_bins = n_codes + 1
+    code_index = np.full(NLCD_VALUE_RANGE, n_codes, dtype=np.int64)
+    code_index[list(NLCD_CODES)] = np.arange(n_codes)
+
+    with open_raster(from_path, tile_cache) as src_from, \
+            open_raster(to_path, tile_cache) as src_to:
+        check_shared_grid([src_from, src_to])
+        zone_blocks = ZoneBlocks(geometries, src_from, zone_path)
+        counts = np.zeros((zone_blocks.count + 1, n_bins, n_bins), dtype=np.int64)
+
+        try:
+            blocks = list(iter_block_windows(src_from.height, src_from.width, block_size))
+            for window in tqdm(blocks, desc="Processing raster blocks"):
+                with run_trace.stage('zone block') as span:
+                    zones = zone_blocks.read(window)
+                    span['pixels'] = int(window.width * window.height)
+                if zones is None:
+                    continue
+                with run_trace.stage('raster decode') as span:
+                    from_values = src_from.read(1, window=window).ravel()
+                    to_values = src_to.read(1, window=window).ravel()
+                    span['pixels'] = from_values.size + to_values.size
+                with run_trace.stage('transition histogram') as span:
+                    from_index = code_index[from_values]
+                    to_index = code_index[to_values]
+                    encoded = ((zones.astype(np.int64).ravel() * n_bins + from_index) * n_bins
+                               + to_index)
+                    counts += np.bincount(encoded, minlength=counts.size).reshape(counts.shape)
+                    span['pixels'] = zones.size
+        finally:
+            zone_blocks.close()
+
+    # Drop the background zone and the out-of-legend bin
+    return counts[1:, :n_codes, :n_codes]
+
+def iter_zone_pixel_counts(tasks, raster_path, workers=1, tile_cache=None, schedule='shapefile',
+                           rows=None, zone_path=None):
+    """
+    Engine adapter with the same interface as
+    ``zonal_engine.iter_county_pixel_counts``.
+
+    Parameters:
+    -----------
+    tasks : list
+        (county_fips, geometry) tuples
+    raster_path : str
+        Path to the NLCD raster
+    workers : int
+        Ignored; the single pass runs in the current process
+    tile_cache : TileCacheSettings, optional
+        Read through the decoded-tile cache
+    schedule : str
+        Ignored; blocks are always streamed in raster order
+    rows : tuple, optional
+        (start, stop) raster rows to stream (tile shards)
+    zone_path : str, optional
+        Precomputed zone raster; task geometries are then not needed
+
+    Yields:
+    -------
+    tuple : (county_fips, pixel_counts, error) in completion order
+    """
+    if not tasks:
+        return
+    if zone_path is not None:
+        # Zones cover every county; report only the requested ones
+        with_zones = {county_fips for county_fips, _ in tasks}
+        geoids, geometries = read_manifest(zone_path)['geoids'], None
+    else:
+        geoids = [county_fips for county_fips, _ in tasks]
+        geometries = [geometry for _, geometry in tasks]
+        with_zones = None
+    for index, row in iter_zone_counts(raster_path, geometries, tile_cache=tile_cache, rows=rows,
+                                       zone_path=zone_path):
+        if with_zones is None or geoids[index] in with_zones:
+            yield geoids[index], pixel_counts_from_row(row), None
+
+def pixel_counts_from_row(row):
+    """
+    Convert one row of the count matrix to a zonal_stats-style count dict.
+
+    Value 0 is excluded, matching ``zonal_stats(..., nodata=0)``.
+    """
+    values = np.flatnonzero(row)
+    return {int(value): int(row[value]) for value in values if value != 0}
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Vectorized NLCD reclassification through a 256-entry lookup table.
+
+A Reclassifier turns a code -> class mapping into a uint8 lookup table once,
+then applies it to whole raster blocks with fancy indexing or to pixel-count
+vectors/matrices with a single integer matrix product, with no per-value
+Python loop.
+
+Dependencies: numpy
+"""
+
+import numpy as np
+from .nlcd_classes import NLCD_RECLASSIFICATION
+
+# Lookup-table entry for NLCD values that belong to no class
+UNMAPPED = 255
+
+class Reclassifier:
+    """
+    Reusable NLCD code -> class lookup.
+
+    Parameters:
+    -----------
+    reclassification_map : dict
+        Mapping from NLCD value to class name (e.g. NLCD_RECLASSIFICATION or
+        ANDERSON_LEVEL_II). Classes are indexed in order of first appearance.
+    nodata_class : str
+        Class excluded from proportion denominators
+    """
+
+    def __init__(self, reclassification_map=NLCD_RECLASSIFICATION, nodata_class='nodata'):
+        self.class_names = list(dict.fromkeys(reclassification_map.values()))
+        if len(self.class_names) >= UNMAPPED:
+            raise ValueError(f"At most {UNMAPPED - 1} classes are supported")
+
+        self.lut = np.full(256, UNMAPPED, dtype=np.uint8)
+        for value, class_name in reclassification_map.items():
+            self.lut[value] = self.class_names.index(class_name)
+
+        # (256, n_classes) indicator: value counts @ indicator = class counts
+        self.indicator = (self.lut[:, None] == np.arange(len(self.class_names))).astype(np.int64)
+        self.valid = np.array([name != nodata_class for name in self.class_names])
+
+    def reclassify(self, array):
+        """
+        Map a uint8 NLCD array to class indices (UNMAPPED for other values).
+        """
+        return self.lut[array]
+
+    def count_classes(self, value_counts):
+        """
+        Collapse per-value pixel counts into per-class counts.
+
+        Parameters:
+        -----------
+        value_counts : numpy.ndarray
+            Counts indexed by NLCD value, shape (..., 256); fractional
+            (coverage-weighted) counts are supported
+
+        Returns:
+        --------
+        numpy.ndarray : int64 (or float64 for fractional input) counts of
+            shape (..., n_classes)
+        """
+        value_counts = np.asarray(value_counts)
+        if not np.issubdtype(value_counts.dtype, np.floating):
+            value_counts = value_counts.astype(np.int64)
+        return value_counts @ self.indicator
+
+    def count_array(self, array):
+        """
+        Per-class pixel counts of a raster block, ignoring 0 (masked) pixels.
+        """
+        value_counts = np.bincount(array.ravel(), minlength=256)[:256]
+        value_counts[0] = 0
+        return self.count_classes(value_counts)
+
+    def counts_from_dict(self, pixel_counts):
+        """
+        Per-class counts from a zonal_stats-style {value: count} dict.
+        """
+        counts = np.array(list(pixel_counts.values()))
+        value_counts = np.zeros(256, dtype=np.float64 if counts.dtype.kind == 'f' else np.int64)
+        if pixel_counts:
+            value_counts[np.fromiter(pixel_counts.keys(), dtype=np.int64)] = counts
+        return self.count_classes(value_counts)
+
+    def as_dict(self, class_counts):
+        """Label a class-count vector with class names."""
+        return {name: count.item() for name, count in zip(self.class_names, class_counts)}
+
+    def proportions(self, class_counts):
+        """
+        Class proportions excluding the nodata class.
+
+        Parameters:
+        -----------
+        class_counts : numpy.ndarray
+            Class counts of shape (..., n_classes)
+
+        Returns:
+        --------
+        numpy.ndarray : float64 proportions of shape (..., n_valid_classes);
+            all zero where a row has no valid pixels
+        """
+        valid_counts = np.asarray(class_counts)[..., self.valid]
+        total_valid_pixels = valid_counts.sum(axis=-1, keepdims=True)
+        return np.divide(valid_counts, total_valid_pixels,
+                         out=np.zeros(valid_counts.shape, dtype=np.float64),
+                         where=total_valid_pixels > 0)
+
+    @property
+    def valid_class_names(self):
+        """Names of the classes reported as proportions."""
+        return [name for name, valid in zip(self.class_names, self.valid) if valid]
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Roll a fine zone layer's pixel counts up to coarser levels.
+
+Count the finest zone layer once (e.g. census tracts, by passing a tract
+shapefile to ``process_county_landcover.py --counties``) and every coarser
+level follows from its count cube without another raster pass: counties and
+states by GEOID prefix, the analysis regions by state, and any custom
+grouping of zones from a two-column CSV. Levels are built by summing pixel
+counts, so each level's proportions are exactly what counting its polygons
+directly would give, not an average of finer proportions.
+
+Usage:
+    python -m nlcd_county.rollup [--cube COUNTS.npz] [--levels county,state,region]
+                     [--groups GROUPS.csv] [--output-dir DIR]
+
+GROUPS.csv has a ``geoid`` and a ``group`` column; zones it does not list are
+left out of the custom level. Each level is written as a count cube
+(``<level>_counts.npz``, readable by derive_proportions.py) and a
+proportions CSV (``<level>_landcover_proportions.csv``).
+
+Dependencies: numpy, pandas
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from .config import PATHS
+from .count_cube import cube_to_proportions, load_count_cube, write_count_cube
+from .nlcd_classes import NLCD_RECLASSIFICATION
+
+# File paths (see config.py)
+COUNT_CUBE_PATH = os.path.splitext(PATHS['output_csv'])[0] + '_counts.npz'
+OUTPUT_DIR = PATHS['rollups']
+
+# GEOID prefix length identifying each level of the TIGER hierarchy
+PREFIX_LEVELS = {'state': 2, 'county': 5, 'tract': 11}
+
+# ID column written for each level
+ID_COLUMNS = {'state': 'state_fips', 'county': 'county_fips', 'tract': 'tract_geoid',
+              'region': 'region', 'custom': 'group'}
+
+STATE_NAMES = {
+    '01': 'Alabama', '02': 'Alaska', '04': 'Arizona', '05': 'Arkansas', '06': 'California',
+    '08': 'Colorado', '09': 'Connecticut', '10': 'Delaware', '11': 'DC', '12': 'Florida',
+    '13': 'Georgia', '15': 'Hawaii', '16': 'Idaho', '17': 'Illinois', '18': 'Indiana',
+    '19': 'Iowa', '20': 'Kansas', '21': 'Kentucky', '22': 'Louisiana', '23': 'Maine',
+    '24': 'Maryland', '25': 'Massachusetts', '26': 'Michigan', '27': 'Minnesota', '28': 'Mississippi',
+    '29': 'Missouri', '30': 'Montana', '31': 'Nebraska', '32': 'Nevada', '33': 'New Hampshire',
+    '34': 'New Jersey', '35': 'New Mexico', '36': 'New York', '37': 'North Carolina', '38': 'North Dakota',
+    '39': 'Ohio', '40': 'Oklahoma', '41': 'Oregon', '42': 'Pennsylvania', '44': 'Rhode Island',
+    '45': 'South Carolina', '46': 'South Dakota', '47': 'Tennessee', '48': 'Texas', '49': 'Utah',
+    '50': 'Vermont', '51': 'Virginia', '53': 'Washington', '54': 'West Virginia', '55': 'Wisconsin',
+    '56': 'Wyoming'
+}
+
+REGIONS = {
+    'Northeast': ['09', '23', '25', '33', '44', '50', '34', '36', '42'],
+    'Southeast': ['10', '11', '12', '13', '24', '37', '45', '51', '54', '01', '21', '28', '47'],
+    'Midwest': ['17', '18', '26', '39', '55', '19', '20', '27', '29', '31', '38', '46'],
+    'Southwest': ['04', '35', '40', '48'],
+    'West': ['02', '06', '08', '15', '16', '30', '32', '41', '49', '53', '56']
+}
+
+def prefix_keys(geoids, length):
+    """Group key of each zone: the first ``length`` characters of its GEOID."""
+    return np.asarray([str(geoid)[:length] for geoid in geoids])
+
+def region_keys(geoids, regions=REGIONS, other='Other'):
+    """Region of each zone from its state FIPS prefix."""
+    region_of = {state: region for region, states in regions.items() for state in states}
+    return np.asarray([region_of.get(state, other) for state in prefix_keys(geoids, 2)])
+
+def load_groups(path):
+    """
+    Custom zone grouping from a CSV with ``geoid`` and ``group`` columns.
+
+    Returns:
+    --------
+    dict : GEOID -> group name
+    """
+    groups = pd.read_csv(path, dtype=str)
+    return dict(zip(groups['geoid'], groups['group']))
+
+def rollup_counts(counts, keys):
+    """
+    Sum count-cube rows that share a group key.
+
+    Parameters:
+    -----------
+    counts : numpy.ndarray
+        Count matrix of shape (n_zones, n_codes)
+    keys : sequence
+        Group key of each zone; None leaves the zone out
+
+    Returns:
+    --------
+    tuple : (labels, rolled) with sorted group labels and the summed matrix
+        of shape (n_groups, n_codes); integer counts are summed as int64
+    """
+    counts = np.asarray(counts)
+    keep = np.asarray([key is not None for key in keys], dtype=bool)
+    labels, inverse = np.unique(np.asarray(keys, dtype=object)[keep].astype(str),
+                                return_inverse=True)
+
+    dtype = np.float64 if np.issubdtype(counts.dtype, np.floating) else np.int64
+    rolled = np.zeros((len(labels), counts.shape[1]), dtype=dtype)
+    np.add.at(rolled, inverse, counts[keep])
+    return labels, rolled
+
+def level_keys(geoids, level, groups=None):
+    """
+    Group keys of every zone for a named level.
+
+    Parameters:
+    -----------
+    geoids : sequence of str
+        GEOIDs of the finest zone layer
+    level : str
+        'state', 'county', 'tract', 'region' or 'custom'
+    groups : dict, optional
+        GEOID -> group name for the 'custom' level
+
+    Returns:
+    --------
+    list : One key (or None) per zone
+    """
+    if level in PREFIX_LEVELS:
+        length = PREFIX_LEVELS[level]
+        if any(len(str(geoid)) < length for geoid in geoids):
+            raise ValueError(f"Zones are coarser than the '{level}' level")
+        return list(prefix_keys(geoids, length))
+    if level == 'region':
+        return list(region_keys(geoids))
+    if level == 'custom':
+        if groups is None:
+            raise ValueError("The 'custom' level needs a zone grouping (--groups)")
+        return [groups.get(str(geoid)) for geoid in geoids]
+    raise ValueError(f"Unknown level '{level}'")
+
+def rollup_levels(cube_path=COUNT_CUBE_PATH, levels=('state', 'region'), groups=None,
+                  output_dir=OUTPUT_DIR, reclassification_map=NLCD_RECLASSIFICATION):
+    """
+    Write a count cube and proportions CSV for every requested level.
+
+    Parameters:
+    -----------
+    cube_path : str
+        Count cube of the finest zone layer
+    levels : sequence of str
+        Levels to build (see ``level_keys``)
+    groups : dict, optional
+        GEOID -> group name for the 'custom' level
+    output_dir : str
+        Directory for the rolled-up files
+    reclassification_map : dict
+        Mapping from NLCD value to class name for the proportions
+    """
+    geoids, codes, counts = load_count_cube(cube_path)
+    print(f"Rolling up {len(geoids)} zones from {cube_path}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    for level in levels:
+        labels, rolled = rollup_counts(counts, level_keys(geoids, level, groups))
+        write_count_cube(os.path.join(output_dir, f'{level}_counts.npz'), labels, rolled)
+
+        df = cube_to_proportions(labels, codes, rolled, reclassification_map,
+                                 id_column=ID_COLUMNS[level])
+        output_path = os.path.join(output_dir, f'{level}_landcover_proportions.csv')
+        df.to_csv(output_path, index=False)
+        print(f"  {level:8}: {len(labels):6} zones -> {output_path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cube', default=COUNT_CUBE_PATH,
+                        help="Count cube of the finest zone layer (.npz)")
+    parser.add_argument('--levels', default='state,region',
+                        help="Comma-separated levels: tract, county, state, region, custom "
+                             "(default: state,region)")
+    parser.add_argument('--groups', default=None,
+                        help="CSV with geoid,group columns for the 'custom' level")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Output directory")
+    args = parser.parse_args()
+
+    groups = load_groups(args.groups) if args.groups else None
+    levels = args.levels.split(',')
+    if groups is not None and 'custom' not in levels:
+        levels.append('custom')
+    rollup_levels(args.cube, levels, groups, args.output_dir)
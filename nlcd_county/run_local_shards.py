@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Run a sharded county job on this machine, one process per shard.
+
+Each shard is launched as its own ``process_county_landcover --shard i/N``
+process, standing in for a separate node; once all have finished their
+partial count files are merged into the usual proportions CSV, count cube
+and Parquet dataset. This exercises exactly the multi-node path, including
+counties that straddle tile-shard strips. The county geometry cache is built
+(or checked) once before the shards start, so they only read it.
+
+Usage:
+    python -m nlcd_county.run_local_shards --shards 4 [--shard-by tile] [--engine raster]
+        [--raster PATH] [--counties PATH] [--output PATH] [--year YEAR] [--dataset DIR]
+
+Dependencies: geopandas, rasterio, rasterstats, pandas, numpy
+"""
+
+import argparse
+import subprocess
+import sys
+from .geometry_cache import read_counties
+from .landcover_dataset import raster_year
+from .process_county_landcover import (COUNTY_SHAPEFILE_PATH, NLCD_RASTER_PATH, OUTPUT_CSV_PATH,
+                                      merge_county_shards)
+from .sharding import SHARD_MODES, default_partial_path
+
+# Module run for each shard (under the same interpreter and sys.path as this one)
+SHARD_MODULE = f'{__package__}.process_county_landcover'
+
+def run_local_shards(shards, shard_by, engine, raster_path, shapefile_path, output_path,
+                     year=None, dataset_path=None):
+    """
+    Launch every shard as a subprocess, wait for all, then merge.
+
+    Parameters:
+    -----------
+    year : int, optional
+        NLCD year of the raster for the Parquet dataset (default: parsed
+        from the raster file name; the dataset is skipped when unknown)
+    dataset_path : str, optional
+        Parquet dataset directory (default: next to the output CSV)
+
+    Returns:
+    --------
+    bool : True when every shard succeeded and the outputs were merged
+    """
+    # Fill the geometry cache here rather than racing to build it in every shard
+    read_counties(shapefile_path)
+
+    processes = []
+    for index in range(1, shards + 1):
+        command = [sys.executable, '-m', SHARD_MODULE,
+                   '--shard', f'{index}/{shards}', '--shard-by', shard_by, '--engine', engine,
+                   '--raster', raster_path, '--counties', shapefile_path,
+                   '--output', output_path]
+        print(f"Starting shard {index}/{shards}...")
+        processes.append(subprocess.Popen(command, stdout=subprocess.DEVNULL))
+
+    failed = [index for index, process in enumerate(processes, start=1) if process.wait() != 0]
+    if failed:
+        print(f"Shards {', '.join(map(str, failed))} failed; not merging")
+        return False
+
+    merge_county_shards([default_partial_path(output_path, index, shards)
+                         for index in range(1, shards + 1)], output_path=output_path,
+                        dataset_path=dataset_path, year=year or raster_year(raster_path))
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--shards', type=int, default=4, help="Number of shards (default: 4)")
+    parser.add_argument('--shard-by', choices=SHARD_MODES, default='state',
+                        help="Shard by whole states or raster strips (default: state)")
+    parser.add_argument('--engine', default='zonal', help="County processing engine")
+    parser.add_argument('--raster', default=NLCD_RASTER_PATH, help="NLCD raster path")
+    parser.add_argument('--counties', default=COUNTY_SHAPEFILE_PATH, help="County shapefile path")
+    parser.add_argument('--output', default=OUTPUT_CSV_PATH, help="Merged output CSV path")
+    parser.add_argument('--year', type=int, default=None,
+                        help="NLCD year of --raster for the Parquet dataset (default: "
+                             "parsed from the raster file name)")
+    parser.add_argument('--dataset', default=None,
+                        help="Parquet dataset directory (default: next to the output CSV)")
+    args = parser.parse_args()
+
+    succeeded = run_local_shards(args.shards, args.shard_by, args.engine,
+                                 args.raster, args.counties, args.output, args.year,
+                                 args.dataset)
+    sys.exit(0 if succeeded else 1)
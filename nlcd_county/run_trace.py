@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Per-stage and per-county timing trace for county processing runs.
+
+Stages (shapefile load, reprojection, raster decode, zone rasterization,
+output writes, ...) and counties are recorded as spans with their wall time,
+the CPU time of the thread that ran them, the bytes the process read through
+read system calls (from /proc/self/io, so concurrent reader threads overlap)
+and the pixels they handled. Nothing is recorded unless a trace was started.
+
+Worker processes collect their own spans, which travel back to the parent
+with their results (see ``drain`` and ``merge``). Span start times come from
+``time.perf_counter``, a system-wide monotonic clock on Linux, so spans from
+different processes line up on one timeline.
+
+A trace path ending in ``.json`` is written in the Chrome trace event format
+(open it in chrome://tracing or https://ui.perfetto.dev); any other path gets
+one JSON object per span (JSON lines).
+
+Dependencies: none (standard library)
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Trace collecting spans in the current process, or None when not tracing
+_trace = None
+
+def bytes_read():
+    """Bytes this process has read through read system calls, or None off Linux."""
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+class RunTrace:
+    """
+    Spans recorded in one process.
+
+    Parameters:
+    -----------
+    path : str, optional
+        Trace file written by ``finish``; None for a worker process, whose
+        spans are sent to the parent instead
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def add(self, span):
+        """Record a finished span (thread-safe)."""
+        with self.lock:
+            self.spans.append(span)
+
+    def drain(self):
+        """Remove and return the spans recorded so far."""
+        with self.lock:
+            spans, self.spans = self.spans, []
+        return spans
+
+    def write(self):
+        """Write the spans as a Chrome trace (``.json``) or JSON lines."""
+        spans = sorted(self.spans, key=lambda span: span['start'])
+        if self.path.endswith('.json'):
+            events = [{
+                'name': span['name'], 'cat': span['kind'], 'ph': 'X',
+                'ts': (span['start'] - self.origin) * 1e6, 'dur': span['wall'] * 1e6,
+                'pid': span['pid'], 'tid': span['thread'],
+                'args': {key: span[key] for key in ('cpu', 'bytes_read', 'pixels')
+                         if span.get(key) is not None}
+            } for span in spans]
+            with open(self.path, 'w') as f:
+                json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        else:
+            with open(self.path, 'w') as f:
+                for span in spans:
+                    f.write(json.dumps({**span, 'start': span['start'] - self.origin}) + '\n')
+
+    def print_summary(self, top=10):
+        """Print per-stage totals and the slowest counties."""
+        totals = {}
+        for span in self.spans:
+            if span['kind'] != 'stage':
+                continue
+            total = totals.setdefault(span['name'], {'calls': 0, 'wall': 0.0, 'cpu': 0.0,
+                                                     'bytes_read': 0, 'pixels': 0})
+            total['calls'] += 1
+            for key in ('wall', 'cpu', 'bytes_read', 'pixels'):
+                total[key] += span.get(key) or 0
+
+        print("\nStage timings:")
+        print(f"  {'Stage':26} {'Calls':>7} {'Wall s':>9} {'CPU s':>9} {'Read MB':>9} "
+              f"{'Mpixels':>9}")
+        for name, total in sorted(totals.items(), key=lambda item: -item[1]['wall']):
+            print(f"  {name:26} {total['calls']:7,} {total['wall']:9.2f} {total['cpu']:9.2f} "
+                  f"{total['bytes_read'] / 1024 ** 2:9.1f} {total['pixels'] / 1e6:9.2f}")
+
+        counties = [span for span in self.spans if span['kind'] == 'county']
+        if not counties:
+            return
+        print(f"\nSlowest counties (of {len(counties):,}):")
+        print(f"  {'County':8} {'Wall ms':>9} {'CPU ms':>9} {'Read MB':>9} {'Pixels':>12} "
+              f"{'PID':>7}")
+        for span in sorted(counties, key=lambda span: -span['wall'])[:top]:
+            print(f"  {span['name']:8} {span['wall'] * 1000:9.1f} {span['cpu'] * 1000:9.1f} "
+                  f"{(span['bytes_read'] or 0) / 1024 ** 2:9.2f} {span['pixels'] or 0:12,} "
+                  f"{span['pid']:7}")
+
+def start(path=None):
+    """
+    Start tracing in this process.
+
+    Parameters:
+    -----------
+    path : str, optional
+        Trace file (``.json`` for Chrome trace format, otherwise JSON lines);
+        None in worker processes
+    """
+    global _trace
+    _trace = RunTrace(path)
+
+def enabled():
+    """Whether this process is tracing."""
+    return _trace is not None
+
+def drain():
+    """Spans recorded in this (worker) process since the last call."""
+    return _trace.drain() if _trace is not None else []
+
+def merge(spans):
+    """Add spans received from a worker process."""
+    if _trace is not None:
+        for span in spans:
+            _trace.add(span)
+
+def finish(top=10):
+    """Write the trace, print its summary and stop tracing."""
+    global _trace
+    if _trace is None:
+        return
+    trace, _trace = _trace, None
+    trace.write()
+    trace.print_summary(top)
+    print(f"\nTrace saved to: {trace.path}")
+
+@contextmanager
+def span(kind, name, **fields):
+    """
+    Record a span around a block of code.
+
+    Yields a dict whose 'pixels' entry the block can set.
+    """
+    if _trace is None:
+        yield {}
+        return
+    trace = _trace
+    record = {'kind': kind, 'name': name, 'pixels': None, **fields}
+    read_before = bytes_read()
+    cpu_before = time.thread_time()
+    start_time = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['wall'] = time.perf_counter() - start_time
+        record['cpu'] = time.thread_time() - cpu_before
+        read_after = bytes_read()
+        record['bytes_read'] = (read_after - read_before
+                                if read_before is not None and read_after is not None
+                                else None)
+        record['start'] = start_time
+        record['pid'] = os.getpid()
+        record['thread'] = threading.get_ident()
+        trace.add(record)
+
+def stage(name, **fields):
+    """Record a pipeline stage (see ``span``)."""
+    return span('stage', name, **fields)
+
+def county(county_fips, **fields):
+    """Record the processing of one county (see ``span``)."""
+    return span('county', county_fips, **fields)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Spatially sorted county scheduling for raster cache locality.
+
+Visiting counties in shapefile order jumps around the continent, so GDAL's
+block cache is mostly evicted before a neighbouring county needs the same
+blocks again. This module orders counties along a Hilbert curve of their
+centroids and greedily batches consecutive neighbours into one shared read
+window. A small LRU model of GDAL's block cache estimates the hit rate of a
+read sequence, so the expected I/O saving can be reported for a full run;
+these figures are simulated from the read windows, not measured from GDAL.
+
+Dependencies: numpy, shapely
+"""
+
+import os
+from collections import OrderedDict
+
+import numpy as np
+import shapely
+from rasterio.windows import Window
+from rasterstats.io import bounds_window
+
+# Bits per axis of the Hilbert curve grid
+HILBERT_ORDER = 16
+
+# Largest shared read window (pixels) a batch of counties may use
+MAX_BATCH_PIXELS = 4096 * 4096
+
+# A batch's shared window may be at most this many times the summed area of
+# its counties' own windows, to limit reading pixels no county needs
+MAX_BATCH_OVERREAD = 1.5
+
+def hilbert_index(x, y, order=HILBERT_ORDER):
+    """
+    Position of integer grid cells along a Hilbert curve.
+
+    Parameters:
+    -----------
+    x, y : numpy.ndarray
+        Integer cell coordinates in [0, 2**order)
+    order : int
+        Bits per axis
+
+    Returns:
+    --------
+    numpy.ndarray : int64 Hilbert distances
+    """
+    n = 1 << order
+    x = np.asarray(x, dtype=np.int64).copy()
+    y = np.asarray(y, dtype=np.int64).copy()
+    d = np.zeros_like(x)
+    s = n >> 1
+    while s > 0:
+        rx = ((x & s) > 0).astype(np.int64)
+        ry = ((y & s) > 0).astype(np.int64)
+        d += s * s * ((3 * rx) ^ ry)
+
+        # Rotate the quadrant so the sub-curve is in standard orientation
+        flip = (ry == 0) & (rx == 1)
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        swap = ry == 0
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        s >>= 1
+    return d
+
+def hilbert_order(geometries, order=HILBERT_ORDER):
+    """
+    Indices that sort geometries along a Hilbert curve of their centroids.
+    """
+    centroids = shapely.centroid(np.asarray(geometries, dtype=object))
+    x, y = shapely.get_x(centroids), shapely.get_y(centroids)
+
+    cells = (1 << order) - 1
+    span_x = max(x.max() - x.min(), 1e-9)
+    span_y = max(y.max() - y.min(), 1e-9)
+    grid_x = np.round((x - x.min()) / span_x * cells)
+    grid_y = np.round((y - y.min()) / span_y * cells)
+    return np.argsort(hilbert_index(grid_x, grid_y, order), kind='stable')
+
+def geometry_window(geometry, transform):
+    """Full-cover read window of a geometry (same rule as rasterstats)."""
+    (row_start, row_stop), (col_start, col_stop) = bounds_window(geometry.bounds, transform)
+    return Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+
+def union_window(windows):
+    """Smallest window containing every window in the list."""
+    row_start = min(int(w.row_off) for w in windows)
+    col_start = min(int(w.col_off) for w in windows)
+    row_stop = max(int(w.row_off + w.height) for w in windows)
+    col_stop = max(int(w.col_off + w.width) for w in windows)
+    return Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+
+def window_pixels(window):
+    """Number of pixels in a window."""
+    return int(window.width) * int(window.height)
+
+def batch_tasks(tasks, transform, max_pixels=MAX_BATCH_PIXELS, max_overread=MAX_BATCH_OVERREAD):
+    """
+    Order county tasks along a Hilbert curve and batch spatial neighbours.
+
+    Consecutive counties join the current batch while the batch's shared
+    window stays under ``max_pixels`` and does not read more than
+    ``max_overread`` times the pixels the counties need on their own.
+
+    Parameters:
+    -----------
+    tasks : list
+        (county_fips, geometry) tuples with geometries in the raster CRS
+    transform : affine.Affine
+        Raster transform
+
+    Returns:
+    --------
+    list : Batches, each a list of tasks sharing one read window
+    """
+    if not tasks:
+        return []
+    order = hilbert_order([geometry for _, geometry in tasks])
+
+    batches = []
+    batch, windows, needed = [], [], 0
+    for index in order:
+        task = tasks[index]
+        window = geometry_window(task[1], transform)
+        if batch:
+            shared = window_pixels(union_window(windows + [window]))
+            own = needed + window_pixels(window)
+            if shared <= max_pixels and shared <= max_overread * own:
+                batch.append(task)
+                windows.append(window)
+                needed = own
+                continue
+            batches.append(batch)
+        batch, windows, needed = [task], [window], window_pixels(window)
+    batches.append(batch)
+    return batches
+
+def default_block_cache_bytes():
+    """
+    GDAL block cache size: GDAL_CACHEMAX (MB, or bytes if large) when set,
+    otherwise GDAL's default of 5% of physical memory.
+    """
+    setting = os.environ.get('GDAL_CACHEMAX')
+    if setting:
+        if setting.endswith('%'):
+            return int(float(setting[:-1]) / 100 * physical_memory_bytes())
+        value = int(setting)
+        return value * 1024 ** 2 if value < 100000 else value
+    return int(0.05 * physical_memory_bytes())
+
+def physical_memory_bytes():
+    """Total physical memory of this machine."""
+    return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+
+class BlockCacheModel:
+    """
+    LRU model of GDAL's raster block cache.
+
+    GDAL does not expose cache statistics, so the hit rate of a read sequence
+    is estimated by replaying the blocks each window touches through an LRU
+    of the same capacity.
+
+    Parameters:
+    -----------
+    block_shape : tuple
+        (rows, cols) of the raster's internal blocks
+    cache_bytes : int
+        Cache capacity in bytes
+    bytes_per_pixel : int
+        Pixel size of the raster (1 for uint8 NLCD)
+    """
+
+    def __init__(self, block_shape, cache_bytes, bytes_per_pixel=1):
+        self.block_rows, self.block_cols = block_shape
+        block_bytes = self.block_rows * self.block_cols * bytes_per_pixel
+        self.capacity = max(1, cache_bytes // block_bytes)
+        self.blocks = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def read(self, window):
+        """Replay one windowed read."""
+        row_start = max(int(window.row_off), 0) // self.block_rows
+        col_start = max(int(window.col_off), 0) // self.block_cols
+        row_stop = (int(window.row_off + window.height) - 1) // self.block_rows
+        col_stop = (int(window.col_off + window.width) - 1) // self.block_cols
+        for block_row in range(row_start, row_stop + 1):
+            for block_col in range(col_start, col_stop + 1):
+                key = (block_row, block_col)
+                if key in self.blocks:
+                    self.hits += 1
+                    self.blocks.move_to_end(key)
+                else:
+                    self.misses += 1
+                    self.blocks[key] = True
+                    if len(self.blocks) > self.capacity:
+                        self.blocks.popitem(last=False)
+
+    @property
+    def hit_rate(self):
+        """Fraction of block accesses served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+def report_block_cache(tasks, batches, transform, block_shape, cache_bytes=None):
+    """
+    Print the estimated block-cache hit rate of shapefile-order per-county
+    reads against Hilbert-ordered batched reads.
+
+    The figures come from replaying the read windows through
+    ``BlockCacheModel``; GDAL's actual cache hits are not measured.
+
+    Returns:
+    --------
+    dict : Estimated hit rates and block decode (miss) counts for both
+        schedules
+    """
+    if cache_bytes is None:
+        cache_bytes = default_block_cache_bytes()
+
+    baseline = BlockCacheModel(block_shape, cache_bytes)
+    for _, geometry in tasks:
+        baseline.read(geometry_window(geometry, transform))
+
+    scheduled = BlockCacheModel(block_shape, cache_bytes)
+    for batch in batches:
+        scheduled.read(union_window([geometry_window(geometry, transform)
+                                     for _, geometry in batch]))
+
+    print(f"Estimated GDAL block cache use (LRU simulation of a "
+          f"{cache_bytes / 1024 ** 2:.0f} MB cache, not measured):")
+    print(f"  Shapefile order : {baseline.hit_rate:6.1%} estimated hit rate, "
+          f"~{baseline.misses:,} block decodes over {len(tasks):,} reads")
+    print(f"  Hilbert batches : {scheduled.hit_rate:6.1%} estimated hit rate, "
+          f"~{scheduled.misses:,} block decodes over {len(batches):,} reads")
+
+    return {
+        'baseline_hit_rate': baseline.hit_rate,
+        'baseline_block_decodes': baseline.misses,
+        'scheduled_hit_rate': scheduled.hit_rate,
+        'scheduled_block_decodes': scheduled.misses
+    }
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Split a county run into independent shards and merge their partial counts.
+
+A run can be divided N ways either by state (every county is counted whole
+by exactly one shard; states are balanced across shards by area) or by
+spatial tile (each shard streams one horizontal strip of raster rows, so a
+county straddling strips gets a partial count from each). Every shard writes
+a partial count file; merging sums the counts per GEOID, so the partials
+can be given in any order and straddling counties come out whole. A merge
+takes every available partial of the run at once and produces the final
+count cube, not another partial.
+
+Partials also record which shards each county depends on and which of the
+shard's counties failed, so a merge can mark counties as 'failed' or (when a
+shard they depend on is absent) 'missing' instead of passing them off as
+counties without data.
+
+Dependencies: numpy
+"""
+
+import numpy as np
+from .nlcd_classes import NLCD_CODES
+from .tile_cache import TILE_SIZE
+
+SHARD_MODES = ('state', 'tile')
+
+def parse_shard(spec):
+    """
+    Parse a shard spec such as '2/8' (shard 2 of 8, 1-based).
+
+    Returns:
+    --------
+    tuple : (index, count) with 1 <= index <= count
+    """
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {spec!r}")
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}, got {index}")
+    return index, count
+
+def state_shard_mask(state_fips, areas, index, count):
+    """
+    Counties belonging to one state shard.
+
+    States are assigned largest-first to the shard with the least total area
+    so far, which balances raster work without splitting any state.
+
+    Parameters:
+    -----------
+    state_fips : sequence of str
+        STATEFP of every county
+    areas : sequence of float
+        County areas (any unit)
+    index, count : int
+        1-based shard index and number of shards
+
+    Returns:
+    --------
+    numpy.ndarray : Boolean mask over the counties
+    """
+    state_fips = np.asarray(state_fips, dtype=str)
+    states, inverse = np.unique(state_fips, return_inverse=True)
+    state_areas = np.bincount(inverse, weights=np.asarray(areas, dtype=np.float64))
+
+    load = np.zeros(count)
+    assignment = np.empty(len(states), dtype=np.int64)
+    # Ties broken by FIPS so every node computes the same assignment
+    for state in sorted(range(len(states)), key=lambda i: (-state_areas[i], states[i])):
+        assignment[state] = np.argmin(load)
+        load[assignment[state]] += state_areas[state]
+    return assignment[inverse] == index - 1
+
+def tile_shard_rows(height, index, count):
+    """
+    Raster rows [start, stop) streamed by one tile shard.
+
+    Strip boundaries fall on tile_cache.TILE_SIZE rows so strips line up
+    with cached tiles.
+    """
+    n_tiles = -(-height // TILE_SIZE)
+    start = n_tiles * (index - 1) // count * TILE_SIZE
+    stop = min(n_tiles * index // count * TILE_SIZE, height)
+    return start, stop
+
+def default_partial_path(output_path, index, count):
+    """Partial count file for one shard, next to the output CSV."""
+    stem = output_path[:-4] if output_path.endswith('.csv') else output_path
+    return f"{stem}_shard{index}of{count}.npz"
+
+def write_partial_counts(path, geoids, counts, order, index, count, mode, coverage, failed=()):
+    """
+    Save one shard's partial count matrix.
+
+    Parameters:
+    -----------
+    path : str
+        Destination ``.npz`` path
+    geoids : sequence of str
+        Counties counted by this shard, one per row of ``counts``
+    counts : numpy.ndarray
+        Count matrix with columns ordered as NLCD_CODES
+    order : sequence of str
+        Every GEOID of the run in output (shapefile) order
+    index, count : int
+        1-based shard index and number of shards
+    mode : str
+        'state' or 'tile'
+    coverage : numpy.ndarray
+        Boolean matrix over ``order`` x shards, True where a shard counts
+        (part of) the county; identical for every shard of a run
+    failed : sequence of str
+        Counties of this shard whose engine failed (quarantined)
+    """
+    counts = np.asarray(counts)
+    dtype = np.float64 if np.issubdtype(counts.dtype, np.floating) else np.uint32
+    np.savez_compressed(
+        path,
+        geoids=np.asarray(geoids, dtype=str),
+        codes=np.asarray(NLCD_CODES, dtype=np.uint8),
+        counts=counts.astype(dtype),
+        order=np.asarray(order, dtype=str),
+        shard=np.asarray([index, count], dtype=np.int64),
+        mode=np.asarray(mode),
+        coverage=np.packbits(np.asarray(coverage, dtype=bool), axis=1),
+        failed=np.asarray(failed, dtype=str)
+    )
+
+def merge_partial_counts(paths):
+    """
+    Sum partial count files into one count matrix.
+
+    Parameters:
+    -----------
+    paths : sequence of str
+        Partial count files from the shards of a single run, in any order;
+        all available partials are merged in one call
+
+    Returns:
+    --------
+    tuple : (geoids, counts, missing, statuses) with geoids in output order,
+        the summed count matrix, the sorted list of shard indices that were
+        not among the partials and a GEOID -> 'failed' or 'missing' mapping
+        of the counties whose counts are incomplete; their rows of the count
+        matrix are zero
+    """
+    order, codes, mode, count, coverage = None, None, None, None, None
+    seen = set()
+    failed = set()
+    totals = None
+    is_float = False
+
+    for path in paths:
+        with np.load(path) as partial:
+            index, shard_count = (int(value) for value in partial['shard'])
+            if order is None:
+                order, codes = partial['order'], partial['codes']
+                mode, count = str(partial['mode']), shard_count
+                coverage = partial['coverage']
+                row_of = {county_fips: row for row, county_fips in enumerate(order)}
+                totals = np.zeros((len(order), len(codes)), dtype=np.float64)
+            elif (str(partial['mode']) != mode or shard_count != count
+                  or not np.array_equal(partial['order'], order)
+                  or not np.array_equal(partial['codes'], codes)
+                  or not np.array_equal(partial['coverage'], coverage)):
+                raise ValueError(f"{path} belongs to a different sharded run")
+            if index in seen:
+                # Summing a shard twice would double its counts
+                raise ValueError(f"Shard {index}/{count} was given more than once")
+            seen.add(index)
+
+            rows = [row_of[county_fips] for county_fips in partial['geoids']]
+            np.add.at(totals, rows, partial['counts'])
+            is_float = is_float or np.issubdtype(partial['counts'].dtype, np.floating)
+            failed.update(partial['failed'].tolist())
+
+    if order is None:
+        raise ValueError("No partial count files given")
+    missing = sorted(set(range(1, count + 1)) - seen)
+
+    # A county is incomplete when it failed in any shard or depends on a
+    # shard that was not given; a failure takes precedence
+    coverage = np.unpackbits(coverage, axis=1, count=count).astype(bool)
+    incomplete = coverage[:, [index - 1 for index in missing]].any(axis=1)
+    statuses = {}
+    for row, county_fips in enumerate(order.tolist()):
+        if county_fips in failed:
+            statuses[county_fips] = 'failed'
+        elif incomplete[row]:
+            statuses[county_fips] = 'missing'
+        else:
+            continue
+        totals[row] = 0
+
+    counts = totals if is_float else totals.astype(np.uint32)
+    return list(order), counts, missing, statuses
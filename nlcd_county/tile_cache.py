@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Local decoded-tile cache for the NLCD raster.
+
+The CONUS NLCD GeoTIFF is ~30 GB of compressed data, and every run used to
+re-decompress it. The cache materializes decoded 512 x 512 uint8 tiles as
+individual ``.npy`` files under a directory keyed by the raster's path and
+mtime, and serves later reads straight from memory-mapped tiles without going
+through the compression codec. Reads of exactly one tile return the memory map
+itself (zero copy); larger windows are assembled from tile memory maps.
+
+Total cache size is capped; the least recently used tiles are evicted first.
+Tile sizes and last-use times are tracked in memory, so a full cache does not
+rescan the directory on every insert: eviction runs once the cap is exceeded
+and frees tiles down to a low-water mark, and the index is refreshed from disk
+(to see tiles written or evicted by other processes) at most every
+INDEX_REFRESH_SECONDS.
+
+Dependencies: numpy, rasterio
+"""
+
+import hashlib
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+
+# Edge length (pixels) of cached tiles
+TILE_SIZE = 512
+
+# Defaults for --tile-cache
+DEFAULT_CACHE_DIR = os.path.expanduser('~/.cache/nlcd-county/tiles')
+DEFAULT_MAX_BYTES = 20 * 1024 ** 3
+
+# Eviction frees tiles until the cache is at this share of its cap
+LOW_WATER_FRACTION = 0.9
+
+# Minimum age of the in-memory index before eviction rescans the directory
+INDEX_REFRESH_SECONDS = 60
+
+# Where to cache and how much disk to use; picklable so it can reach workers
+TileCacheSettings = namedtuple('TileCacheSettings', ['directory', 'max_bytes'])
+
+def cache_key(raster_path):
+    """
+    Cache namespace for a raster: changes whenever the file is replaced.
+    """
+    stat = os.stat(raster_path)
+    identity = f"{os.path.abspath(raster_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return hashlib.sha1(identity.encode()).hexdigest()[:16]
+
+class TileCache:
+    """
+    Dataset wrapper that serves band-1 reads from decoded, memory-mapped tiles.
+
+    Attribute access other than ``read`` (transform, crs, shape, ...) is
+    passed through to the wrapped rasterio dataset, so engines can use it in
+    place of the dataset.
+
+    Parameters:
+    -----------
+    src : rasterio.io.DatasetReader
+        Open single-band raster
+    settings : TileCacheSettings
+        Cache directory and size cap
+    """
+
+    def __init__(self, src, settings):
+        self.src = src
+        self.root = settings.directory
+        self.max_bytes = settings.max_bytes
+        self.directory = os.path.join(self.root, cache_key(src.name))
+        os.makedirs(self.directory, exist_ok=True)
+        self._refresh_index()
+
+    def __getattr__(self, name):
+        return getattr(self.src, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the wrapped dataset."""
+        self.src.close()
+
+    def _cached_files(self):
+        """(path, mtime, size) of every tile under the cache root."""
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith('.npy'):
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue  # evicted by another process
+                    yield path, stat.st_mtime, stat.st_size
+
+    def _refresh_index(self):
+        """Rebuild the path -> (mtime, size) index from the cache directory."""
+        self.index = {path: (mtime, size) for path, mtime, size in self._cached_files()}
+        self.total_bytes = sum(size for _, size in self.index.values())
+        self.indexed_at = time.monotonic()
+
+    def _touch(self, path):
+        """Record a tile as just used, on disk and in the index."""
+        os.utime(path)
+        size = self.index[path][1] if path in self.index else os.path.getsize(path)
+        if path not in self.index:
+            self.total_bytes += size  # written by another process
+        self.index[path] = (time.time(), size)
+
+    def _evict(self):
+        """Delete least recently used tiles until the cache is at its low-water mark."""
+        if time.monotonic() - self.indexed_at > INDEX_REFRESH_SECONDS:
+            self._refresh_index()
+        target = self.max_bytes * LOW_WATER_FRACTION
+        for path, (_, size) in sorted(self.index.items(), key=lambda item: item[1][0]):
+            if self.total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # evicted by another process
+            del self.index[path]
+            self.total_bytes -= size
+
+    def tile(self, tile_row, tile_col):
+        """
+        Memory-mapped tile, decoding and caching it on first use.
+
+        Returns:
+        --------
+        numpy.memmap : Read-only uint8 array (edge tiles may be smaller than
+            TILE_SIZE)
+        """
+        path = os.path.join(self.directory, f'{tile_row}_{tile_col}.npy')
+        try:
+            array = np.load(path, mmap_mode='r')
+            self._touch(path)  # Mark as recently used
+            return array
+        except FileNotFoundError:
+            pass
+
+        window = Window(tile_col * TILE_SIZE, tile_row * TILE_SIZE,
+                        min(TILE_SIZE, self.src.width - tile_col * TILE_SIZE),
+                        min(TILE_SIZE, self.src.height - tile_row * TILE_SIZE))
+        data = self.src.read(1, window=window)
+
+        # Write-then-rename so concurrent workers never see a partial tile
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            np.save(f, data)
+        os.replace(temporary, path)
+
+        self._touch(path)
+        if self.total_bytes > self.max_bytes:
+            self._evict()
+        return np.load(path, mmap_mode='r')
+
+    def read(self, indexes=1, window=None, boundless=False, fill_value=0, **kwargs):
+        """
+        Read a window of band 1, mirroring ``DatasetReader.read``.
+
+        Parameters:
+        -----------
+        indexes : int
+            Band index; only band 1 is cached
+        window : rasterio.windows.Window
+            Window to read (whole raster when None)
+        boundless : bool
+            Allow windows extending beyond the raster; outside pixels are
+            set to ``fill_value``
+        fill_value : int
+            Value for pixels outside the raster in boundless reads
+
+        Returns:
+        --------
+        numpy.ndarray : 2-D uint8 array
+        """
+        if indexes != 1 or kwargs:
+            return self.src.read(indexes, window=window, boundless=boundless,
+                                 fill_value=fill_value, **kwargs)
+        if window is None:
+            window = Window(0, 0, self.src.width, self.src.height)
+
+        row_off, col_off = int(window.row_off), int(window.col_off)
+        height, width = int(window.height), int(window.width)
+
+        # Zero-copy path: the window is exactly one cached tile
+        if (row_off % TILE_SIZE == 0 and col_off % TILE_SIZE == 0
+                and 0 <= row_off < self.src.height and 0 <= col_off < self.src.width):
+            tile = self.tile(row_off // TILE_SIZE, col_off // TILE_SIZE)
+            if tile.shape == (height, width):
+                return tile
+
+        row_start, row_stop = max(row_off, 0), min(row_off + height, self.src.height)
+        col_start, col_stop = max(col_off, 0), min(col_off + width, self.src.width)
+        if not boundless and (row_start != row_off or col_start != col_off
+                              or row_stop != row_off + height or col_stop != col_off + width):
+            raise ValueError("Window extends beyond the raster; use boundless=True")
+
+        out = np.full((height, width), fill_value, dtype=self.src.dtypes[0])
+        if row_start >= row_stop or col_start >= col_stop:
+            return out  # Entirely outside the raster
+
+        for tile_row in range(row_start // TILE_SIZE, (row_stop - 1) // TILE_SIZE + 1):
+            for tile_col in range(col_start // TILE_SIZE, (col_stop - 1) // TILE_SIZE + 1):
+                tile = self.tile(tile_row, tile_col)
+                top, left = tile_row * TILE_SIZE, tile_col * TILE_SIZE
+                r0, r1 = max(row_start, top), min(row_stop, top + tile.shape[0])
+                c0, c1 = max(col_start, left), min(col_stop, left + tile.shape[1])
+                out[r0 - row_off:r1 - row_off, c0 - col_off:c1 - col_off] = \
+                    tile[r0 - top:r1 - top, c0 - left:c1 - left]
+        return out
+
+def open_raster(raster_path, tile_cache=None):
+    """
+    Open a raster, optionally behind the decoded-tile cache.
+
+    Parameters:
+    -----------
+    raster_path : str
+        Path to the raster
+    tile_cache : TileCacheSettings, optional
+        Cache settings; None opens the raster directly
+
+    Returns:
+    --------
+    rasterio.io.DatasetReader or TileCache
+    """
+    src = rasterio.open(raster_path)
+    if tile_cache is None:
+        return src
+    return TileCache(src, tile_cache)
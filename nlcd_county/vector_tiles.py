@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Export county land cover to an MBTiles vector-tile archive and serve it.
+
+The interactive map embeds every county polygon in its HTML as GeoJSON, so
+the browser downloads and parses the whole country before drawing anything.
+This exporter cuts the counties into Mapbox Vector Tiles (one 'counties'
+layer) and stores them gzip-compressed in an MBTiles SQLite file. Each zoom
+uses the matching level of the shared-edge simplified geometry cache (see
+geometry_cache.py), and the land cover proportions are stored as whole
+percents (0-100), which MVT encodes as one-byte varints. The serve command
+hosts the archive and a Leaflet map that requests only the tiles in view,
+zoom by zoom.
+
+Usage:
+    python -m nlcd_county.vector_tiles export [--counties PATH] [--results PATH]
+                                  [--mbtiles PATH] [--min-zoom 3] [--max-zoom 8]
+    python -m nlcd_county.vector_tiles serve [--mbtiles PATH] [--port 8000]
+
+Dependencies: geopandas, shapely, mapbox-vector-tile, mercantile, folium
+"""
+
+import argparse
+import gzip
+import json
+import sqlite3
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import folium
+import mapbox_vector_tile
+import mercantile
+import numpy as np
+import shapely
+from folium import plugins
+from tqdm import tqdm
+from .config import PATHS
+from .geometry_cache import COUNTY_SHAPEFILE_PATH, read_counties
+from .landcover_dataset import read_landcover
+
+# File paths (see config.py)
+MBTILES_PATH = PATHS['mbtiles']
+
+LAYER_NAME = 'counties'
+TILE_EXTENT = 4096
+# Geometry kept beyond each tile edge (in tile units) so strokes do not show seams
+TILE_BUFFER = 64
+
+LAND_COVER_CLASSES = ['forest', 'agriculture', 'developed', 'wetland', 'other']
+
+DOMINANT_COLORS = {
+    'Forest': '#2E7D32',
+    'Agriculture': '#F57C00',
+    'Developed': '#616161',
+    'Wetland': '#1976D2',
+    'Other': '#E65100',
+    'No Data': '#E0E0E0'
+}
+
+# States and territories left out of the continental map
+NON_CONTINENTAL_STATES = ['02', '15', '72', '78', '60', '66', '69']
+
+def geometry_level(zoom):
+    """Geometry cache level whose simplification suits a zoom level."""
+    if zoom <= 5:
+        return 'coarse'
+    if zoom <= 7:
+        return 'medium'
+    if zoom <= 9:
+        return 'fine'
+    return 'full'
+
+def tile_properties(counties):
+    """
+    MVT feature properties of each county.
+
+    Proportions become whole percents; counties without data carry only
+    their name and a 'No Data' dominant class.
+
+    Returns:
+    --------
+    list of dict : One property dict per county
+    """
+    proportion_cols = [f'{name}_proportion' for name in LAND_COVER_CLASSES]
+    proportions = counties[proportion_cols].to_numpy(dtype=np.float64)
+    has_data = np.nan_to_num(proportions).sum(axis=1) > 0
+    percents = np.rint(np.nan_to_num(proportions) * 100).astype(np.uint8)
+    dominant = np.asarray(LAND_COVER_CLASSES)[np.nan_to_num(proportions).argmax(axis=1)]
+
+    properties = []
+    for i, (geoid, name, state) in enumerate(zip(counties['GEOID'], counties['NAME'],
+                                                 counties['STATEFP'])):
+        feature = {'GEOID': geoid, 'NAME': name, 'STATEFP': state}
+        if has_data[i]:
+            feature['dominant'] = dominant[i].capitalize()
+            feature.update({name: int(percent)
+                            for name, percent in zip(LAND_COVER_CLASSES, percents[i])})
+        else:
+            feature['dominant'] = 'No Data'
+        properties.append(feature)
+    return properties
+
+def load_tile_counties(shapefile_path, level, results_source=None):
+    """Continental counties at one geometry level, joined to the results, in Web Mercator."""
+    counties = read_counties(shapefile_path, level, columns=['GEOID', 'NAME', 'STATEFP'])
+    counties = counties[~counties['STATEFP'].isin(NON_CONTINENTAL_STATES)]
+    landcover_df = read_landcover(results_source,
+                                  columns=[f'{name}_proportion' for name in LAND_COVER_CLASSES])
+    counties = counties.merge(landcover_df.astype({'county_fips': str}), how='left',
+                              left_on='GEOID', right_on='county_fips')
+    return counties.to_crs('EPSG:3857')
+
+def encode_zoom(counties, zoom):
+    """
+    Yield (tile, tile bytes) for every tile at a zoom that touches a county.
+
+    Counties are matched to tiles with one spatial-index query and clipped
+    to their buffered tile bounds in a single vectorized intersection.
+    """
+    geometries = counties.geometry.values
+    properties = tile_properties(counties)
+    west, south, east, north = counties.to_crs('EPSG:4326').total_bounds
+    tiles = list(mercantile.tiles(west, south, east, north, zooms=zoom))
+    bounds = np.array([mercantile.xy_bounds(tile) for tile in tiles])
+
+    margin = (bounds[:, 2] - bounds[:, 0]) * TILE_BUFFER / TILE_EXTENT
+    clip_boxes = shapely.box(bounds[:, 0] - margin, bounds[:, 1] - margin,
+                             bounds[:, 2] + margin, bounds[:, 3] + margin)
+    tile_index, county_index = shapely.STRtree(geometries).query(clip_boxes,
+                                                                 predicate='intersects')
+    order = np.argsort(tile_index, kind='stable')
+    tile_index, county_index = tile_index[order], county_index[order]
+    clipped = shapely.intersection(geometries[county_index], clip_boxes[tile_index])
+
+    # Pairs are sorted by tile; split them into one run per tile
+    starts = np.flatnonzero(np.r_[True, tile_index[1:] != tile_index[:-1]])
+    for run in np.split(np.arange(len(tile_index)), starts[1:]):
+        if len(run) == 0:
+            continue
+        features = [{'geometry': clipped[i], 'properties': properties[county_index[i]],
+                     'id': int(county_index[i])}
+                    for i in run if not shapely.is_empty(clipped[i])]
+        if not features:
+            continue
+        tile = tiles[tile_index[run[0]]]
+        data = mapbox_vector_tile.encode(
+            [{'name': LAYER_NAME, 'features': features}],
+            default_options={'quantize_bounds': tuple(bounds[tile_index[run[0]]]),
+                             'extents': TILE_EXTENT})
+        yield tile, gzip.compress(data)
+
+def write_mbtiles_metadata(conn, min_zoom, max_zoom, lonlat_bounds):
+    """MBTiles 1.3 metadata describing the 'counties' vector layer."""
+    west, south, east, north = lonlat_bounds
+    fields = {'GEOID': 'String', 'NAME': 'String', 'STATEFP': 'String', 'dominant': 'String',
+              **{name: 'Number' for name in LAND_COVER_CLASSES}}
+    metadata = {
+        'name': 'County land cover',
+        'format': 'pbf',
+        'type': 'overlay',
+        'minzoom': str(min_zoom),
+        'maxzoom': str(max_zoom),
+        'bounds': f'{west},{south},{east},{north}',
+        'center': f'{(west + east) / 2},{(south + north) / 2},{min_zoom}',
+        'json': json.dumps({'vector_layers': [{'id': LAYER_NAME, 'fields': fields,
+                                               'minzoom': min_zoom, 'maxzoom': max_zoom}]})
+    }
+    conn.executemany("INSERT INTO metadata (name, value) VALUES (?, ?)", metadata.items())
+
+def export_mbtiles(mbtiles_path=MBTILES_PATH, shapefile_path=COUNTY_SHAPEFILE_PATH,
+                   results_source=None, min_zoom=3, max_zoom=8):
+    """
+    Write the continental counties and their land cover to an MBTiles file.
+
+    Parameters:
+    -----------
+    mbtiles_path : str
+        Destination archive (replaced if it exists)
+    shapefile_path : str
+        County shapefile (read through the geometry cache)
+    results_source : str, optional
+        Results dataset or CSV (see landcover_dataset.read_landcover)
+    min_zoom, max_zoom : int
+        Zoom range to cut
+    """
+    conn = sqlite3.connect(mbtiles_path)
+    conn.executescript("""
+        DROP TABLE IF EXISTS metadata;
+        DROP TABLE IF EXISTS tiles;
+        CREATE TABLE metadata (name TEXT, value TEXT);
+        CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER,
+                            tile_data BLOB);
+    """)
+
+    levels = {}
+    tile_count = 0
+    for zoom in tqdm(range(min_zoom, max_zoom + 1), desc="Cutting vector tiles"):
+        level = geometry_level(zoom)
+        if level not in levels:
+            levels[level] = load_tile_counties(shapefile_path, level, results_source)
+        # MBTiles rows count from the bottom (TMS scheme)
+        rows = [(tile.z, tile.x, (1 << tile.z) - 1 - tile.y, data)
+                for tile, data in encode_zoom(levels[level], zoom)]
+        conn.executemany("INSERT INTO tiles VALUES (?, ?, ?, ?)", rows)
+        tile_count += len(rows)
+
+    lonlat_bounds = next(iter(levels.values())).to_crs('EPSG:4326').total_bounds
+    write_mbtiles_metadata(conn, min_zoom, max_zoom, lonlat_bounds)
+    conn.execute("CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row)")
+    conn.commit()
+    conn.close()
+    print(f"Wrote {tile_count:,} tiles (zoom {min_zoom}-{max_zoom}) to {mbtiles_path}")
+
+def tile_map(tile_url, min_zoom=3, max_zoom=8):
+    """
+    Leaflet map drawing the county tiles, coloured by dominant land cover.
+
+    Parameters:
+    -----------
+    tile_url : str
+        Tile URL template with {z}/{x}/{y} placeholders
+    min_zoom, max_zoom : int
+        Zoom range held in the archive; deeper zooms overzoom the last level
+
+    Returns:
+    --------
+    folium.Map
+    """
+    m = folium.Map(location=[39.5, -98.35], zoom_start=5, min_zoom=min_zoom,
+                   tiles='OpenStreetMap')
+    colors = json.dumps(DOMINANT_COLORS)
+    options = f"""{{
+        maxNativeZoom: {max_zoom},
+        interactive: true,
+        getFeatureId: function(f) {{ return f.properties.GEOID; }},
+        vectorTileLayerStyles: {{
+            {LAYER_NAME}: function(properties) {{
+                return {{
+                    fill: true,
+                    fillColor: ({colors})[properties.dominant] || '#E0E0E0',
+                    fillOpacity: 0.7,
+                    color: 'black',
+                    weight: 0.2
+                }};
+            }}
+        }}
+    }}"""
+    layer = plugins.VectorGridProtobuf(tile_url, 'County Land Cover', options)
+    layer.add_to(m)
+    # Show the county's percents on click
+    popup = folium.Element(f"""
+    <script>
+    document.addEventListener('DOMContentLoaded', function() {{
+        var grid = {layer.get_name()};
+        grid.on('click', function(e) {{
+            var p = e.layer.properties;
+            var rows = ['forest', 'agriculture', 'developed', 'wetland', 'other']
+                .filter(function(k) {{ return k in p; }})
+                .map(function(k) {{ return k + ': ' + p[k] + '%'; }});
+            L.popup().setLatLng(e.latlng)
+                .setContent('<b>' + p.NAME + ', ' + p.STATEFP + '</b><br>Dominant: '
+                            + p.dominant + '<br>' + rows.join('<br>'))
+                .openOn(grid._map);
+        }});
+    }});
+    </script>
+    """)
+    m.get_root().html.add_child(popup)
+    folium.LayerControl().add_to(m)
+    return m
+
+def archive_zoom_range(mbtiles_path):
+    """(min_zoom, max_zoom) recorded in an MBTiles file."""
+    with sqlite3.connect(mbtiles_path) as conn:
+        metadata = dict(conn.execute("SELECT name, value FROM metadata"))
+    return int(metadata['minzoom']), int(metadata['maxzoom'])
+
+def serve(mbtiles_path=MBTILES_PATH, port=8000):
+    """
+    Serve the tile map at / and tiles at /tiles/{z}/{x}/{y}.pbf.
+
+    Parameters:
+    -----------
+    mbtiles_path : str
+        Archive written by ``export_mbtiles``
+    port : int
+        Local HTTP port
+    """
+    min_zoom, max_zoom = archive_zoom_range(mbtiles_path)
+    page = tile_map('tiles/{z}/{x}/{y}.pbf', min_zoom, max_zoom).get_root().render().encode()
+
+    class TileHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path in ('/', '/index.html'):
+                self.respond(200, 'text/html; charset=utf-8', page)
+                return
+            parts = self.path.strip('/').removesuffix('.pbf').split('/')
+            if len(parts) != 4 or parts[0] != 'tiles' or not all(p.isdigit() for p in parts[1:]):
+                self.respond(404, 'text/plain', b'Not found')
+                return
+            z, x, y = (int(p) for p in parts[1:])
+            with sqlite3.connect(mbtiles_path) as conn:
+                row = conn.execute("SELECT tile_data FROM tiles WHERE zoom_level = ? AND "
+                                   "tile_column = ? AND tile_row = ?",
+                                   (z, x, (1 << z) - 1 - y)).fetchone()
+            if row is None:
+                # Empty tile (no counties there)
+                self.respond(204, 'application/x-protobuf', b'')
+            else:
+                self.respond(200, 'application/x-protobuf', row[0], encoding='gzip')
+
+        def respond(self, status, content_type, body, encoding=None):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), TileHandler)
+    print(f"Serving {mbtiles_path} at http://127.0.0.1:{port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['export', 'serve'])
+    parser.add_argument('--counties', default=COUNTY_SHAPEFILE_PATH, help="County shapefile path")
+    parser.add_argument('--results', default=None,
+                        help="Results dataset or CSV (default: county_landcover.parquet, "
+                             "else county_landcover_proportions.csv)")
+    parser.add_argument('--mbtiles', default=MBTILES_PATH, help="MBTiles archive path")
+    parser.add_argument('--min-zoom', type=int, default=3, help="Lowest zoom to cut (default: 3)")
+    parser.add_argument('--max-zoom', type=int, default=8,
+                        help="Highest zoom to cut; the map overzooms beyond it (default: 8)")
+    parser.add_argument('--port', type=int, default=8000, help="HTTP port for serve (default: 8000)")
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        export_mbtiles(args.mbtiles, args.counties, args.results, args.min_zoom, args.max_zoom)
+    else:
+        serve(args.mbtiles, args.port)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Quick verification script to spot-check the results.
+
+Reads the proportions CSV with the standard library only, so it starts in a
+fraction of a second.
+
+Usage:
+    nlcd-county verify [--results PATH]
+"""
+
+import argparse
+import csv
+from .config import PATHS
+
+proportion_cols = ['forest_proportion', 'agriculture_proportion', 'developed_proportion', 'wetland_proportion', 'other_proportion']
+
+def load_results(path):
+    """Rows of the proportions CSV with the proportion columns as floats."""
+    with open(path, newline='') as f:
+        results = list(csv.DictReader(f))
+    for row in results:
+        for col in proportion_cols:
+            row[col] = float(row[col]) if row[col] else 0.0
+        row['total_proportion'] = sum(row[col] for col in proportion_cols)
+    return results
+
+def top_counties(results, col, n=5):
+    """The n counties with the largest value of col (first occurrence wins ties)."""
+    return sorted(results, key=lambda row: row[col], reverse=True)[:n]
+
+def verify_results(results_path=PATHS['output_csv']):
+    """Print the spot-check report for a proportions CSV."""
+    results = load_results(results_path)
+
+    print("=== NLCD County Land Cover Analysis Results ===\n")
+
+    with_data = sum(1 for row in results if row['total_proportion'] > 0)
+    print("1. Dataset Overview:")
+    print(f"   - Total counties processed: {len(results)}")
+    print(f"   - Counties with land cover data: {with_data}")
+    print(f"   - Counties with no data: {len(results) - with_data}")
+    if results and 'status' in results[0]:
+        failed = sum(1 for row in results if row['status'] == 'failed')
+        print(f"   - Counties failed (quarantined): {failed}")
+
+    print("\n2. Data Quality Check:")
+    valid_counties = sum(1 for row in results if 0.99 <= row['total_proportion'] <= 1.01)
+    print(f"   - Counties with valid proportions (sum ≈ 1.0): {valid_counties}/{len(results)} ({valid_counties/len(results)*100:.1f}%)")
+
+    print("\n3. National Land Cover Summary (Mean Proportions):")
+    for col in proportion_cols:
+        mean_val = sum(row[col] for row in results) / len(results)
+        class_name = col.replace('_proportion', '').title()
+        print(f"   - {class_name:12}: {mean_val:.4f} ({mean_val*100:.1f}%)")
+
+    print("\n4. Sample Counties (Top 5 by different land cover types):")
+    for title, col, label in [('Most Forested Counties', 'forest_proportion', 'forest'),
+                              ('Most Agricultural Counties', 'agriculture_proportion', 'agriculture'),
+                              ('Most Developed Counties', 'developed_proportion', 'developed')]:
+        print(f"\n   {title}:")
+        for row in top_counties(results, col):
+            print(f"     County {row['county_fips']}: {row[col]:.3f} {label}")
+
+    print("\n5. File Location:")
+    print(f"   Results saved to: {results_path}")
+
+    print("\n=== Analysis Complete ===")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--results', default=PATHS['output_csv'],
+                        help=f"Proportions CSV to check (default: {PATHS['output_csv']})")
+    args = parser.parse_args()
+    verify_results(args.results)
@@ -1,23 +1,39 @@
 #!/usr/bin/env python3
 """
 Create visualizations of county land cover proportions.
+
+The figure is saved in the reports directory of the config file (config.py)
+unless --output-dir is given.
+
+Usage:
+    python -m nlcd_county.visualize_landcover [--output-dir DIR]
 """
 
+import argparse
+import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.gridspec import GridSpec
+from .config import PATHS
+from .landcover_dataset import read_landcover
+
+parser = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--output-dir', default=PATHS['reports'],
+                    help="Directory for the figure (default: %(default)s)")
+args = parser.parse_args()
+os.makedirs(args.output_dir, exist_ok=True)
+figure_path = os.path.join(args.output_dir, 'landcover_analysis_visualization.png')
 
 # Set up plotting style
 plt.style.use('seaborn-v0_8-whitegrid')
 sns.set_palette("husl")
 
-# Load the data
-df = pd.read_csv('county_landcover_proportions.csv')
-
-# Add state FIPS code
-df['state_fips'] = df['county_fips'].astype(str).str.zfill(5).str[:2]
+# Load the data (Parquet dataset if present, else the CSV)
+df = read_landcover(columns=['forest_proportion', 'agriculture_proportion', 'developed_proportion',
+                             'wetland_proportion', 'other_proportion'])
 
 # Filter out counties with no data
 df_valid = df[(df[['forest_proportion', 'agriculture_proportion', 'developed_proportion', 
@@ -195,7 +211,7 @@ fig.suptitle('US County Land Cover Analysis - NLCD 2024', fontsize=16, fontweigh
 
 # Save figure
 plt.tight_layout()
-plt.savefig('landcover_analysis_visualization.png', dpi=150, bbox_inches='tight')
-print("Visualization saved as: landcover_analysis_visualization.png")
+plt.savefig(figure_path, dpi=150, bbox_inches='tight')
+print(f"Visualization saved as: {figure_path}")
 
 plt.show()
\ No newline at end of file
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Per-county zonal_stats engine with optional process-pool parallelism.
+
+Each worker process keeps a single rasterio dataset handle open for its whole
+lifetime and, for every county, reads only the window covering the county's
+bounds before handing that array to zonal_stats. The serial path runs the very
+same functions in-process, so serial and parallel runs produce identical
+counts. Results are returned in input order regardless of which worker
+finished first.
+
+An opt-in exact mode replaces the pixel-center rule with each pixel's exact
+fractional overlap with the county polygon; interior pixels take a fast
+integer path and only pixels crossed by the boundary are intersected.
+
+With the 'hilbert' schedule, counties are visited along a Hilbert curve of
+their centroids and neighbours share one read window (see scheduling.py).
+
+When a run is traced, every county is recorded as a span in the process that
+counted it; workers send their spans back with each batch (see run_trace.py).
+
+Dependencies: rasterio, rasterstats, shapely, numpy, tqdm
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import rasterio
+import shapely
+from rasterio import features
+from rasterio.windows import transform as window_transform
+from rasterstats import zonal_stats
+from tqdm import tqdm
+from . import run_trace
+from .scheduling import batch_tasks, geometry_window, report_block_cache, union_window
+from .tile_cache import open_raster
+
+# Batches handed to a worker per task; large enough to amortize IPC overhead
+CHUNK_SIZE = 8
+
+# Edge length (pixels) of the tiles the geometry is clipped to in exact mode
+EDGE_TILE_SIZE = 64
+
+# Dataset handle owned by the current (worker) process
+_dataset = None
+
+def open_worker_dataset(raster_path, tile_cache=None, trace=False):
+    """
+    Pool initializer: open the NLCD raster once for the worker's lifetime.
+
+    Parameters:
+    -----------
+    raster_path : str
+        Path to the NLCD raster
+    tile_cache : TileCacheSettings, optional
+        Serve reads from the decoded-tile cache (see tile_cache.py)
+    trace : bool
+        Collect county spans in the worker (the parent is tracing)
+    """
+    global _dataset
+    if _dataset is not None:
+        _dataset.close()
+    _dataset = open_raster(raster_path, tile_cache)
+    if trace:
+        run_trace.start()
+
+def close_worker_dataset():
+    """Close the dataset handle opened by ``open_worker_dataset``."""
+    global _dataset
+    if _dataset is not None:
+        _dataset.close()
+        _dataset = None
+
+def read_county_window(geometry, shared=None):
+    """
+    Read the raster window covering a geometry's bounds.
+
+    Uses the same full-cover window rule as rasterstats, so the array and
+    transform are exactly what zonal_stats would read from the file itself.
+
+    Parameters:
+    -----------
+    geometry : shapely geometry
+        County polygon in the raster CRS
+    shared : tuple, optional
+        (window, array) of a batch read containing this county's window;
+        the county's pixels are sliced from it instead of read again
+
+    Returns:
+    --------
+    tuple : (array, affine) for the window
+    """
+    window = geometry_window(geometry, _dataset.transform)
+    if shared is None:
+        array = _dataset.read(1, window=window, boundless=True, fill_value=0)
+    else:
+        shared_window, shared_array = shared
+        row = int(window.row_off - shared_window.row_off)
+        col = int(window.col_off - shared_window.col_off)
+        array = shared_array[row:row + int(window.height), col:col + int(window.width)]
+    return array, window_transform(window, _dataset.transform)
+
+def edge_pixel_fractions(geometry, rows, cols, affine):
+    """
+    Exact fraction of each listed pixel covered by a geometry.
+
+    The geometry is first clipped to one EDGE_TILE_SIZE tile at a time, so
+    each pixel/polygon intersection only involves the few vertices near that
+    pixel instead of the whole county outline.
+
+    Parameters:
+    -----------
+    geometry : shapely geometry
+        Polygon in the raster CRS
+    rows, cols : numpy.ndarray
+        Pixel indices within the window described by ``affine``
+    affine : affine.Affine
+        Window transform (north-up)
+
+    Returns:
+    --------
+    numpy.ndarray : float64 coverage fractions in [0, 1]
+    """
+    fractions = np.zeros(len(rows), dtype=np.float64)
+    pixel_area = abs(affine.a * affine.e)
+    tile_ids = (rows // EDGE_TILE_SIZE) * (cols.max() // EDGE_TILE_SIZE + 1) + cols // EDGE_TILE_SIZE
+
+    for tile_id in np.unique(tile_ids):
+        in_tile = np.flatnonzero(tile_ids == tile_id)
+        r, c = rows[in_tile], cols[in_tile]
+        west = affine.c + c * affine.a
+        north = affine.f + r * affine.e
+        east, south = west + affine.a, north + affine.e
+
+        part = shapely.clip_by_rect(geometry, west.min(), south.min(), east.max(), north.max())
+        pixels = shapely.box(west, south, east, north)
+        fractions[in_tile] = shapely.area(shapely.intersection(pixels, part)) / pixel_area
+
+    return np.clip(fractions, 0.0, 1.0)
+
+def exact_pixel_counts(geometry, array, affine):
+    """
+    Coverage-weighted pixel counts for one geometry.
+
+    Interior pixels (center inside, not crossed by the boundary) count as 1
+    and take a fast bincount path; only pixels touched by the boundary pay
+    for an exact polygon/pixel intersection.
+
+    Parameters:
+    -----------
+    geometry : shapely geometry
+        Polygon in the raster CRS
+    array : numpy.ndarray
+        NLCD values covering the geometry's bounds
+    affine : affine.Affine
+        Transform of ``array``
+
+    Returns:
+    --------
+    dict : NLCD value -> coverage-weighted pixel count (float); 0 excluded
+    """
+    shape = array.shape
+    inside = features.rasterize([(geometry, 1)], out_shape=shape, transform=affine,
+                                fill=0, dtype='uint8').astype(bool)
+    edge = features.rasterize([(geometry.boundary, 1)], out_shape=shape, transform=affine,
+                              fill=0, all_touched=True, dtype='uint8').astype(bool)
+
+    counts = np.bincount(array[inside & ~edge], minlength=256).astype(np.float64)
+    rows, cols = np.nonzero(edge)
+    if len(rows):
+        fractions = edge_pixel_fractions(geometry, rows, cols, affine)
+        counts += np.bincount(array[rows, cols], weights=fractions, minlength=256)
+
+    return {int(value): float(counts[value]) for value in np.flatnonzero(counts) if value != 0}
+
+def county_pixel_counts(task, exact=False, shared=None):
+    """
+    Categorical pixel counts for one county from the worker's open dataset.
+
+    Parameters:
+    -----------
+    task : tuple
+        (county_fips, geometry) with the geometry in the raster CRS
+    exact : bool
+        Weight pixels by their exact fractional overlap with the county
+        instead of the zonal_stats pixel-center rule
+    shared : tuple, optional
+        (window, array) of a batch read covering this county
+
+    Returns:
+    --------
+    tuple : (county_fips, pixel_counts, error) where pixel_counts maps NLCD
+        value to pixel count and error is None or the exception message
+    """
+    county_fips, geometry = task
+    try:
+        array, affine = read_county_window(geometry, shared)
+        if exact:
+            return county_fips, exact_pixel_counts(geometry, array, affine), None
+        stats = zonal_stats(
+            geometry,
+            array,
+            affine=affine,
+            categorical=True,
+            nodata=0  # Treat 0 as nodata for processing
+        )
+        pixel_counts = stats[0] if stats else {}
+        return county_fips, pixel_counts, None
+    except Exception as e:
+        return county_fips, {}, str(e)
+
+def batch_pixel_counts(batch, exact=False):
+    """
+    Pixel counts for a batch of neighbouring counties sharing one read.
+
+    Parameters:
+    -----------
+    batch : list
+        (county_fips, geometry) tasks
+    exact : bool
+        Use exact fractional coverage weighting
+
+    Returns:
+    --------
+    list : (county_fips, pixel_counts, error) for every task in the batch
+    """
+    shared = None
+    errors = [None] * len(batch)
+    if len(batch) > 1:
+        # A county whose window cannot be computed fails alone and is left
+        # out of the shared read
+        windows = []
+        for i, (_, geometry) in enumerate(batch):
+            try:
+                windows.append(geometry_window(geometry, _dataset.transform))
+            except Exception as e:
+                errors[i] = str(e)
+        if windows:
+            try:
+                shared_window = union_window(windows)
+                with run_trace.stage('shared window read') as span:
+                    shared = (shared_window,
+                              _dataset.read(1, window=shared_window, boundless=True,
+                                            fill_value=0))
+                    span['pixels'] = shared[1].size
+            except Exception:
+                shared = None  # Fall back to one read per county
+
+    results = []
+    for task, error in zip(batch, errors):
+        with run_trace.county(task[0]) as span:
+            if error is not None:
+                result = (task[0], {}, error)
+            else:
+                result = county_pixel_counts(task, exact, shared)
+            span['pixels'] = int(sum(result[1].values()))
+        results.append(result)
+    return results
+
+def traced_batch_pixel_counts(batch, exact=False):
+    """``batch_pixel_counts`` in a worker, returning the batch's spans too."""
+    return batch_pixel_counts(batch, exact), run_trace.drain()
+
+def iter_county_pixel_counts(tasks, raster_path, workers=1, exact=False, tile_cache=None,
+                             schedule='shapefile'):
+    """
+    Compute pixel counts for every county, serially or across a process pool.
+
+    Parameters:
+    -----------
+    tasks : list
+        (county_fips, geometry) tuples in output order
+    raster_path : str
+        Path to the NLCD raster
+    workers : int
+        Number of worker processes; 1 runs in the current process
+    exact : bool
+        Use exact fractional coverage weighting (see ``exact_pixel_counts``)
+    tile_cache : TileCacheSettings, optional
+        Read through the decoded-tile cache
+    schedule : str
+        'shapefile' reads each county on its own in input order; 'hilbert'
+        visits counties along a Hilbert curve of their centroids, reads
+        batches of neighbours through one shared window and prints the
+        block-cache hit rates estimated by scheduling.BlockCacheModel
+
+    Yields:
+    -------
+    tuple : (county_fips, pixel_counts, error), in input order for the
+        'shapefile' schedule and in Hilbert order otherwise
+    """
+    if schedule == 'hilbert':
+        with rasterio.open(raster_path) as src:
+            transform, block_shape = src.transform, src.block_shapes[0]
+        batches = batch_tasks(tasks, transform)
+        report_block_cache(tasks, batches, transform, block_shape)
+    else:
+        batches = [[task] for task in tasks]
+
+    progress = tqdm(total=len(tasks), desc="Processing counties")
+    process_batch = partial(batch_pixel_counts, exact=exact)
+
+    if workers <= 1:
+        open_worker_dataset(raster_path, tile_cache)
+        try:
+            for results in map(process_batch, batches):
+                progress.update(len(results))
+                yield from results
+        finally:
+            close_worker_dataset()
+            progress.close()
+        return
+
+    trace = run_trace.enabled()
+    if trace:
+        process_batch = partial(traced_batch_pixel_counts, exact=exact)
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=open_worker_dataset,
+                             initargs=(raster_path, tile_cache, trace)) as executor:
+        # executor.map preserves input order, which keeps the merge deterministic
+        for results in executor.map(process_batch, batches, chunksize=CHUNK_SIZE):
+            if trace:
+                results, spans = results
+                run_trace.merge(spans)
+            progress.update(len(results))
+            yield from results
+    progress.close()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Precomputed county-ID raster aligned to the NLCD grid.
+
+Reprojecting the TIGER county shapefile and rasterizing every polygon is the
+same work on every run. This module burns the county zone IDs once into a
+tiled GeoTIFF on the NLCD grid, next to a JSON manifest holding the zone ID ->
+GEOID table and a hash over the shapefile's files, the raster CRS, transform
+and shape. Runs read zone blocks straight from the GeoTIFF and only rebuild
+it when the manifest hash no longer matches. The manifest also records the
+path, size and mtime of the shapefile's files, which are only hashed again
+when those change (see ``current_zone_hash``).
+
+Zone IDs are 1-based positions in the shapefile; 0 marks pixels outside
+every county, exactly as in raster_engine.py (which writes the GeoTIFF, see
+``write_zone_raster``). Nearest-neighbour overviews let map scripts read a
+coarse zone grid quickly.
+
+Dependencies: rasterio, numpy
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+
+# Bumped whenever the zone raster layout changes, forcing a rebuild
+ZONE_RASTER_VERSION = 1
+
+# Shapefile components that affect the zones
+SHAPEFILE_SIDECARS = ('.shp', '.shx', '.dbf', '.prj', '.cpg')
+
+def manifest_path(zone_path):
+    """JSON manifest stored next to the zone raster."""
+    return os.path.splitext(zone_path)[0] + '.json'
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def grid_signature(src):
+    """CRS, transform and shape of a raster in JSON-friendly form."""
+    return {
+        'crs': src.crs.to_wkt(),
+        'transform': list(src.transform)[:6],
+        'shape': [src.height, src.width]
+    }
+
+def shapefile_stats(shapefile_path):
+    """Absolute path, size and mtime_ns of every shapefile component present."""
+    stem = os.path.abspath(os.path.splitext(shapefile_path)[0])
+    stats = {}
+    for suffix in SHAPEFILE_SIDECARS:
+        if os.path.exists(stem + suffix):
+            stat = os.stat(stem + suffix)
+            stats[suffix] = [stem + suffix, stat.st_size, stat.st_mtime_ns]
+    return stats
+
+def shapefile_digests(shapefile_path):
+    """SHA-256 of every shapefile component present, keyed by suffix."""
+    stem = os.path.splitext(shapefile_path)[0]
+    return {suffix: file_digest(stem + suffix) for suffix in SHAPEFILE_SIDECARS
+            if os.path.exists(stem + suffix)}
+
+def zone_hash(shapefile_path, raster_path):
+    """
+    Hash identifying the zones a shapefile produces on a raster's grid.
+
+    Parameters:
+    -----------
+    shapefile_path : str
+        County shapefile (all sidecar files present are hashed)
+    raster_path : str
+        NLCD raster defining the grid
+
+    Returns:
+    --------
+    str : Hex digest
+    """
+    parts = {'version': ZONE_RASTER_VERSION, **shapefile_digests(shapefile_path)}
+    with rasterio.open(raster_path) as src:
+        parts['grid'] = grid_signature(src)
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+def current_zone_hash(zone_path, shapefile_path, raster_path):
+    """
+    ``zone_hash`` of the inputs, hashing the shapefile only when needed.
+
+    When the shapefile's file stats and the raster grid are those recorded in
+    the zone raster's manifest, the recorded hash is returned as is. Otherwise
+    the full hash is computed, and if it still matches (e.g. after a copy or
+    touch) the manifest is updated with the new stats.
+
+    Returns:
+    --------
+    str : Hex digest
+    """
+    stats = shapefile_stats(shapefile_path)
+    with rasterio.open(raster_path) as src:
+        grid = grid_signature(src)
+    manifest = read_manifest(zone_path)
+    if (manifest is not None and manifest.get('version') == ZONE_RASTER_VERSION
+            and manifest.get('stats') == stats and manifest.get('grid') == grid):
+        return manifest['hash']
+
+    digest = zone_hash(shapefile_path, raster_path)
+    if manifest is not None and manifest.get('hash') == digest:
+        save_manifest(zone_path, {**manifest, 'stats': stats})
+    return digest
+
+def read_manifest(zone_path):
+    """Manifest of a zone raster, or None when it has not been built."""
+    try:
+        with open(manifest_path(zone_path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def is_current(zone_path, digest):
+    """True when the zone raster exists and was built for ``digest``."""
+    manifest = read_manifest(zone_path)
+    return (manifest is not None and manifest.get('hash') == digest
+            and os.path.exists(zone_path))
+
+def save_manifest(zone_path, manifest):
+    """Write a manifest through a temporary file, so readers never see it partial."""
+    path = manifest_path(zone_path)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(temporary, path)
+
+def write_manifest(zone_path, digest, grid, geoids, last_rows, zone_pixels, stats=None):
+    """
+    Record what a freshly written zone raster was built from.
+
+    Parameters:
+    -----------
+    zone_path : str
+        Zone GeoTIFF
+    digest : str
+        Hash from ``zone_hash``
+    grid : dict
+        ``grid_signature`` of the NLCD raster
+    geoids : sequence of str
+        County GEOIDs; zone ID i + 1 is geoids[i]
+    last_rows : sequence of int
+        Last raster row touched by each county's bounding box
+    zone_pixels : sequence of int
+        Pixels burned for each county
+    stats : dict, optional
+        ``shapefile_stats`` of the shapefile the zones were built from
+    """
+    manifest = {
+        'hash': digest,
+        'version': ZONE_RASTER_VERSION,
+        'grid': grid,
+        'geoids': [str(county_fips) for county_fips in geoids],
+        'last_rows': [int(row) for row in last_rows],
+        'zone_pixels': [int(count) for count in zone_pixels],
+        'stats': stats
+    }
+    save_manifest(zone_path, manifest)
+
+class ZoneRaster:
+    """
+    Read handle on a precomputed zone raster.
+
+    Parameters:
+    -----------
+    zone_path : str
+        Zone GeoTIFF written by ``raster_engine.write_zone_raster``
+    """
+
+    def __init__(self, zone_path):
+        manifest = read_manifest(zone_path)
+        if manifest is None:
+            raise FileNotFoundError(f"No manifest for zone raster {zone_path}")
+        self.src = rasterio.open(zone_path)
+        self.geoids = manifest['geoids']
+        self.last_rows = np.asarray(manifest['last_rows'], dtype=np.int64)
+        self.zone_pixels = np.asarray(manifest['zone_pixels'], dtype=np.int64)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def check_grid(self, src):
+        """Raise ValueError unless ``src`` is on the zone raster's grid."""
+        if (src.crs != self.src.crs or src.transform != self.src.transform
+                or src.shape != self.src.shape):
+            raise ValueError(f"{src.name} is not on the grid of zone raster {self.src.name}")
+
+    def read(self, window):
+        """
+        Zone-ID block for a window, or None when it lies outside every county
+        (mirrors ``raster_engine.rasterize_zone_block``).
+        """
+        zones = self.src.read(1, window=window)
+        return zones if zones.any() else None
+
+    def read_overview(self, out_shape):
+        """Coarse zone grid for maps, served from the nearest overview."""
+        return self.src.read(1, out_shape=out_shape, resampling=Resampling.nearest)
+
+    def close(self):
+        """Close the zone raster."""
+        self.src.close()
@@ -0,0 +1,82 @@
+"""
+Smoke test of the county engines on the synthetic data of benchmark_pipeline.py.
+
+Every engine must count the same pixels per county as the zonal engine, the
+exact engine's coverage-weighted totals must stay close to them, and the
+chunked engine's peak memory must stay within its budget.
+"""
+
+import pytest
+
+from nlcd_county.benchmark_chunked_memory import measure_chunked_run
+from nlcd_county.benchmark_pipeline import generate_data
+from nlcd_county.process_county_landcover import ENGINES, load_counties
+
+# Small enough to run in seconds, large enough for several chunked blocks
+SIZE = 1024
+GRID = 6
+
+# Peak-memory budget for the chunked engine runs
+MEMORY_BUDGET = 16 * 1024 ** 2
+
+# Largest relative difference between exact and zonal county totals
+EXACT_TOLERANCE = 0.02
+
+@pytest.fixture(scope='module')
+def synthetic_data(tmp_path_factory):
+    data = generate_data(str(tmp_path_factory.mktemp('synthetic')), SIZE, GRID)
+    data['raster_path'] = data['raster_paths'][-1]
+    return data
+
+@pytest.fixture(scope='module')
+def tasks(synthetic_data):
+    counties = load_counties(synthetic_data['counties_path'], synthetic_data['raster_path'])
+    return list(zip(counties['GEOID'], counties.geometry))
+
+def engine_counts(engine, tasks, raster_path, workers=1, **options):
+    """GEOID -> pixel counts from one engine, failing on any county error."""
+    counts = {}
+    for county_fips, pixel_counts, error in ENGINES[engine](tasks, raster_path, workers,
+                                                            **options):
+        assert error is None, f"{engine} failed on county {county_fips}: {error}"
+        counts[county_fips] = {int(value): count for value, count in pixel_counts.items()}
+    return counts
+
+def test_engines_count_identical_pixels(synthetic_data, tasks):
+    raster_path = synthetic_data['raster_path']
+    reference = engine_counts('zonal', tasks, raster_path)
+    assert len(reference) == synthetic_data['counties']
+    assert sum(sum(counts.values()) for counts in reference.values()) > 0
+
+    runs = {
+        'raster': engine_counts('raster', tasks, raster_path),
+        'chunked': engine_counts('chunked', tasks, raster_path,
+                                 memory_budget=MEMORY_BUDGET),
+        # Each reader thread holds its own block and count matrices
+        'chunked, 2 threads': engine_counts('chunked', tasks, raster_path, workers=2,
+                                            memory_budget=2 * MEMORY_BUDGET),
+        'zonal, hilbert': engine_counts('zonal', tasks, raster_path, schedule='hilbert'),
+        'zonal, 2 workers': engine_counts('zonal', tasks, raster_path, workers=2)
+    }
+    for name, counts in runs.items():
+        assert counts == reference, f"{name} counts differ from the zonal engine"
+
+def test_exact_totals_close_to_zonal(synthetic_data, tasks):
+    raster_path = synthetic_data['raster_path']
+    zonal = engine_counts('zonal', tasks, raster_path)
+    exact = engine_counts('exact', tasks, raster_path)
+    assert exact.keys() == zonal.keys()
+
+    for county_fips, counts in zonal.items():
+        zonal_total = sum(counts.values())
+        exact_total = sum(exact[county_fips].values())
+        assert exact_total == pytest.approx(zonal_total, rel=EXACT_TOLERANCE), county_fips
+
+def test_chunked_peak_within_budget(synthetic_data):
+    try:
+        result = measure_chunked_run(synthetic_data['raster_path'],
+                                     synthetic_data['counties_path'], MEMORY_BUDGET)
+    except OSError as e:
+        pytest.skip(str(e))
+    assert result['zones'] == synthetic_data['counties']
+    assert result['peak'] <= result['budget']